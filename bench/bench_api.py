@@ -0,0 +1,149 @@
+"""Benchmark FenixAPI degree loading against the local mock server.
+
+    python bench/bench_api.py --degrees 3 --courses 40 --latency-ms 30 --jitter-ms 10
+    python bench/bench_api.py --fixtures leic.json --json
+    python bench/bench_api.py --tail-rate 0.03 --tail-ms 3000 --no-hedge
+
+Reports wall time for the degree list and each enriched degree load, the
+requests the server saw per endpoint and peak memory.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_mock(args) -> tuple:
+    """Run mock_fenix.py in its own process so its threads do not skew the client numbers."""
+    cmd = [sys.executable, os.path.join(ROOT, "bench", "mock_fenix.py"), "serve",
+           "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+           "--error-rate", str(args.error_rate), "--seed", str(args.seed),
+           "--tail-rate", str(args.tail_rate), "--tail-ms", str(args.tail_ms)]
+    if args.fixtures:
+        cmd += ["--fixtures", args.fixtures]
+    else:
+        cmd += ["--degrees", str(args.degrees), "--courses", str(args.courses), "--shifts", str(args.shifts)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().strip()
+    if not line.startswith("Mock Fenix listening on "):
+        proc.kill()
+        raise RuntimeError(f"mock server failed to start: {line!r}")
+    return proc, line.rsplit(" ", 1)[-1]
+
+
+def run(args, url: str) -> dict:
+    # The endpoints are read from config at import time
+    os.environ["FENIX_BASE_URL"] = url
+    os.environ.pop("FENIX_API_URL", None)
+    sys.path.insert(0, ROOT)
+    from src.api import FenixAPI
+
+    def server_stats(reset: bool = False) -> dict:
+        stats = requests.get(f"{url}/__stats", timeout=5).json()
+        if reset:
+            requests.get(f"{url}/__reset", timeout=5)
+        return stats
+
+    report = {"url": url, "lang": args.lang, "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+              "error_rate": args.error_rate, "tail_rate": args.tail_rate, "tail_ms": args.tail_ms,
+              "hedge": not args.no_hedge, "degrees": []}
+    tracemalloc.start()
+    api = FenixAPI(lang=args.lang, transport={"hedge_percentile": None} if args.no_hedge else None)
+
+    started = time.perf_counter()
+    degrees = api.get_degrees_all()
+    report["degrees_all_seconds"] = round(time.perf_counter() - started, 4)
+    server_stats(reset=True)
+
+    for degree in degrees[:args.limit] if args.limit else degrees:
+        started = time.perf_counter()
+        courses = api.get_degree_courses(degree["id"], enrich=True, degree_acronym=degree.get("acronym", ""))
+        seconds = time.perf_counter() - started
+        stats = server_stats(reset=True)
+        report["degrees"].append({
+            "acronym": degree.get("acronym", ""),
+            "courses": len(courses),
+            "seconds": round(seconds, 4),
+            "requests": stats["total"],
+            "by_endpoint": stats["requests"],
+            "errors": stats["errors"],
+        })
+
+    report["client_metrics"] = api.metrics.snapshot()
+    report["client_report"] = api.metrics.report_lines()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    loads = report["degrees"]
+    report["total_seconds"] = round(sum(d["seconds"] for d in loads), 4)
+    report["total_requests"] = sum(d["requests"] for d in loads)
+    report["python_peak_kib"] = peak // 1024
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["max_rss_kib"] = maxrss // 1024 if sys.platform == "darwin" else maxrss
+    return report
+
+
+def print_report(report: dict):
+    print(f"Mock Fenix at {report['url']} (latency {report['latency_ms']}ms ±{report['jitter_ms']}ms, "
+          f"errors {report['error_rate']:.0%}, tail {report['tail_rate']:.0%} +{report['tail_ms']}ms, "
+          f"lang {report['lang']}, hedging {'on' if report['hedge'] else 'off'})")
+    print(f"degrees/all: {report['degrees_all_seconds'] * 1000:.1f} ms")
+    for d in report["degrees"]:
+        print(f"{d['acronym']:<10} {d['courses']:>4} courses  {d['seconds'] * 1000:>9.1f} ms  "
+              f"{d['requests']:>5} requests")
+        for endpoint, count in sorted(d["by_endpoint"].items(), key=lambda kv: -kv[1]):
+            errors = d["errors"].get(endpoint, 0)
+            print(f"    {count:>5}  {endpoint}" + (f"  ({errors} errors)" if errors else ""))
+    print("Client side:")
+    for line in report["client_report"]:
+        print(f"  {line}")
+    print(f"Total: {report['total_seconds'] * 1000:.1f} ms, {report['total_requests']} requests, "
+          f"peak Python heap {report['python_peak_kib']} KiB, max RSS {report['max_rss_kib']} KiB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark FenixAPI against the mock Fenix server")
+    parser.add_argument("--url", help="use an already running mock server instead of starting one")
+    parser.add_argument("--fixtures", help="recorded fixtures JSON (default: synthetic data)")
+    parser.add_argument("--degrees", type=int, default=3)
+    parser.add_argument("--courses", type=int, default=20, help="courses per degree")
+    parser.add_argument("--shifts", type=int, default=6, help="shifts per course")
+    parser.add_argument("--limit", type=int, default=0, help="only load the first N degrees")
+    parser.add_argument("--lang", default="en-GB", help="en-GB also exercises the pt-PT name lookups")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="fraction of requests that hang")
+    parser.add_argument("--tail-ms", type=float, default=0, help="how long the slow tail hangs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-hedge", action="store_true", help="disable hedged requests in the client")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    proc = None
+    url = args.url
+    if not url:
+        proc, url = start_mock(args)
+    try:
+        report = run(args, url)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
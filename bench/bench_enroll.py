@@ -0,0 +1,284 @@
+"""Time-to-enrolled benchmark against the local mock enrollment portal.
+
+    python bench/bench_enroll.py --mode http --mode parallel --mode browser --runs 3 --latency-ms 60
+    python bench/bench_enroll.py --scenario scenario.json --json
+
+Modes:
+  browser   EnrollmentRunner through Selenium, course by course (the default GUI path)
+  parallel  EnrollmentRunner with parallel HTTP requests after resolving links in Chrome
+  http      plain requests, no browser at all: a lower bound for the HTTP path
+
+For every queued shift the portal records when the booking landed; the
+report gives that time measured from the start of the run (or from the
+moment the period opened, if later), plus login time and requests per
+endpoint. Browser modes need Chrome and chromedriver.
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urljoin
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("browser", "parallel", "http")
+
+
+def start_portal(args) -> tuple:
+    cmd = [sys.executable, os.path.join(ROOT, "bench", "mock_portal.py"),
+           "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+           "--error-rate", str(args.error_rate), "--seed", str(args.seed),
+           "--user", f"{args.username}:{args.password}"]
+    if args.scenario:
+        cmd += ["--scenario", args.scenario]
+    else:
+        cmd += ["--courses", str(args.courses), "--seats", str(args.seats)]
+    if args.confirm:
+        cmd.append("--confirm")
+    if args.portal_lang:
+        cmd += ["--lang", args.portal_lang]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().strip()
+    if not line.startswith("Mock portal listening on "):
+        proc.kill()
+        raise RuntimeError(f"mock portal failed to start: {line!r}")
+    return proc, line.rsplit(" ", 1)[-1]
+
+
+class PortalControl:
+    def __init__(self, url: str):
+        self.url = url
+
+    def _get(self, path: str, **params) -> dict:
+        return requests.get(f"{self.url}{path}", params=params, timeout=10).json()
+
+    def reset(self, opens_in: float):
+        self._get("/__reset")
+        return self._get("/__portal/reset", opens_in=opens_in)
+
+    def state(self) -> dict:
+        return self._get("/__portal/state")
+
+    def stats(self) -> dict:
+        return self._get("/__stats")
+
+
+def build_queue(state: dict, shift_names=None) -> list:
+    """The named shifts, or the first shift of every type in every course."""
+    queue = []
+    for course in state["courses"]:
+        seen = set()
+        for shift in course["shifts"]:
+            wanted = shift["name"] in shift_names if shift_names else shift["type"] not in seen
+            if wanted:
+                seen.add(shift["type"])
+                queue.append({"course": course["name"], "shift_type": shift["type"], "shift_name": shift["name"]})
+    return queue
+
+
+def describe_links(soup) -> dict:
+    """BeautifulSoup version of dom.EXTRACT_COURSE_LINKS_JS (links only) for find_course_link."""
+    page = {"links": [], "headers": []}
+    for i, a in enumerate(soup.find_all("a", href=True)):
+        row = a.find_parent("tr")
+        page["links"].append({"i": i, "text": a.get_text(" ", strip=True), "href": a["href"],
+                              "row": row.get_text(" ", strip=True) if row else ""})
+    return page
+
+
+def run_http(url: str, args, queue: list, log):
+    """Log in and enroll with requests only.
+
+    A generator, like run_browser: it yields the login time once logged in,
+    then the run's Tracer once every request has been answered.
+    """
+    from src.dom import find_course_link
+    from src.parallel import ParallelEnroller
+    from src.snapshot import PageSnapshot, normalize_text
+    from src.tracing import Tracer
+
+    tracer = Tracer("bench http")
+    session = requests.Session()
+    started = time.perf_counter()
+    resp = session.post(f"{url}/cas/login", data={"username": args.username, "password": args.password})
+    if "/cas/login" in resp.url:
+        raise RuntimeError("login failed")
+    login_seconds = time.perf_counter() - started
+    yield login_seconds
+
+    enroller = ParallelEnroller(session, url, args.workers, tracer=tracer)
+    while True:
+        session.get(f"{url}/student/enroll/shift-enrollment")
+        resp = session.post(f"{url}/student/studentShiftEnrollmentManager.do")
+        manager = PageSnapshot(resp.text, url, url=resp.url)
+        if "periodo de inscricoes fechado" not in normalize_text(manager.html):
+            break
+        time.sleep(args.poll)
+
+    course_links = describe_links(manager.soup)
+    course_urls = {}
+    for entry in queue:
+        link, _reason = find_course_link(course_links, entry["course"])
+        if link:
+            course_urls[entry["course"]] = urljoin(manager.url, link["href"])
+    snapshots = enroller.fetch_snapshots(course_urls)
+
+    jobs = {}
+    for entry in queue:
+        snapshot = snapshots.get(entry["course"])
+        links = snapshot.find_shift_links(entry["shift_name"], links=snapshot.enrollment_links()) if snapshot else []
+        link = next((e for e in links if e["params"].get("_request_checksum_")), None)
+        if link:
+            jobs[(entry["course"], entry["shift_type"], entry["shift_name"])] = (link["url"], entry["shift_name"])
+        else:
+            log(f"no enrollment link for {entry['shift_name']}")
+    enroller.enroll_all(jobs)
+    yield tracer
+
+
+def run_browser(url: str, args, queue: list, log, parallel: bool):
+    from src.bot import FenixBot
+    from src.runner import EnrollmentRunner
+
+    bot = FenixBot(args.username, args.password, headless=not args.show_browser)
+    try:
+        started = time.perf_counter()
+        bot.init_driver()
+        if not bot.login():
+            raise RuntimeError("login failed")
+        yield time.perf_counter() - started
+
+        if not bot.navigate_to_enrollments() or not bot.wait_for_enrollment_window():
+            raise RuntimeError("enrollment period did not open")
+        EnrollmentRunner(bot, queue, parallel=parallel, on_log=lambda message, level="INFO": log(message)).run()
+        yield bot.tracer
+    finally:
+        bot.close()
+
+
+def run_once(mode: str, url: str, args, control: PortalControl, log, run_number: int = 1) -> dict:
+    state = control.state()
+    queue = build_queue(state, args.shift)
+    steps = run_http(url, args, queue, log) if mode == "http" else run_browser(url, args, queue, log,
+                                                                               mode == "parallel")
+    login_seconds = next(steps)
+    # Login is timed separately; the clock for time-to-enrolled starts here
+    opened = control.reset(args.opens_in)
+    started = time.time()
+    tracer = next(steps, None)
+    wall = time.time() - started
+    if args.trace and tracer:
+        os.makedirs(args.trace, exist_ok=True)
+        tracer.export(os.path.join(args.trace, f"{mode}-{run_number}.trace.json"))
+    steps.close()
+
+    stats = control.stats()
+    booked = {b["shift"]: b["at"] for b in control.state()["bookings"] if b["user"] == args.username}
+    origin = max(started, opened["opens_at"])
+    shifts = {e["shift_name"]: (round((booked[e["shift_name"]] - origin) * 1000, 1)
+                                if e["shift_name"] in booked else None) for e in queue}
+    return {
+        "mode": mode,
+        "login_seconds": round(login_seconds, 3),
+        "wall_seconds": round(wall, 3),
+        "enrolled": sum(1 for v in shifts.values() if v is not None),
+        "queued": len(queue),
+        "time_to_enrolled_ms": shifts,
+        "requests": stats["total"],
+        "by_endpoint": stats["requests"],
+        "errors": stats["errors"],
+    }
+
+
+def summarize(runs: list) -> dict:
+    times = [t for run in runs for t in run["time_to_enrolled_ms"].values() if t is not None]
+    last = [max(v for v in run["time_to_enrolled_ms"].values() if v is not None)
+            for run in runs if any(v is not None for v in run["time_to_enrolled_ms"].values())]
+    return {
+        "runs": len(runs),
+        "enrolled": f"{sum(r['enrolled'] for r in runs)}/{sum(r['queued'] for r in runs)}",
+        "login_seconds": round(statistics.median(r["login_seconds"] for r in runs), 3),
+        "median_ms": round(statistics.median(times), 1) if times else None,
+        "p95_ms": round(sorted(times)[int(0.95 * (len(times) - 1))], 1) if times else None,
+        "last_shift_ms": round(statistics.median(last), 1) if last else None,
+        "requests": round(statistics.mean(r["requests"] for r in runs), 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark time-to-enrolled against the mock enrollment portal")
+    parser.add_argument("--mode", action="append", choices=MODES,
+                        help="path to measure, repeatable (default: http, plus the browser modes "
+                             "when chromedriver is on PATH)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--url", help="use an already running mock portal instead of starting one")
+    parser.add_argument("--scenario", help="portal scenario JSON (default: synthetic courses)")
+    parser.add_argument("--courses", type=int, default=3)
+    parser.add_argument("--seats", type=int, default=50, help="free seats per synthetic shift")
+    parser.add_argument("--shift", action="append", help="shift to queue, repeatable (default: one per type)")
+    parser.add_argument("--opens-in", type=float, default=0, help="seconds after login until the period opens")
+    parser.add_argument("--poll", type=float, default=0.5, help="http mode: seconds between checks while closed")
+    parser.add_argument("--confirm", action="store_true", help="portal asks for confirmation")
+    parser.add_argument("--portal-lang", choices=["pt", "en"], help="language of the portal's result messages")
+    parser.add_argument("--workers", type=int, default=4, help="http mode: parallel requests")
+    parser.add_argument("--username", default="student")
+    parser.add_argument("--password", default="student")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--show-browser", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="show bot output")
+    parser.add_argument("--trace", metavar="DIR", help="save a Chrome trace of every run in DIR")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    modes = args.mode or (["http", "parallel", "browser"]
+                          if os.environ.get("CHROMEDRIVER_PATH") or shutil.which("chromedriver") else ["http"])
+
+    proc = None
+    url = args.url
+    if not url:
+        proc, url = start_portal(args)
+    # Before src is imported: endpoints come from the environment and
+    # saved sessions must not touch the real ones
+    os.environ["FENIX_BASE_URL"] = url
+    os.environ["XDG_STATE_HOME"] = tempfile.mkdtemp(prefix="fenix-bench-")
+    sys.path.insert(0, ROOT)
+
+    control = PortalControl(url)
+    report = {"url": url, "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "modes": {}}
+    log = (lambda message: print(f"  {message}", file=sys.stderr)) if args.verbose else (lambda message: None)
+    try:
+        for mode in modes:
+            runs = []
+            for run_number in range(1, args.runs + 1):
+                quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+                with quiet:
+                    runs.append(run_once(mode, url, args, control, log, run_number))
+            report["modes"][mode] = {"summary": summarize(runs), "runs": runs}
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+        shutil.rmtree(os.environ["XDG_STATE_HOME"], ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"Mock portal at {url} (latency {args.latency_ms}ms ±{args.jitter_ms}ms), {args.runs} runs per mode")
+    print(f"{'mode':<9} {'enrolled':>9} {'login s':>8} {'median ms':>10} {'p95 ms':>9} {'last ms':>9} {'requests':>9}")
+    for mode, result in report["modes"].items():
+        s = result["summary"]
+        print(f"{mode:<9} {s['enrolled']:>9} {s['login_seconds']:>8} {s['median_ms'] or '-':>10} "
+              f"{s['p95_ms'] or '-':>9} {s['last_shift_ms'] or '-':>9} {s['requests']:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""Local stand-in for the public Fenix API and the pages FenixAPI scrapes.
+
+    python bench/mock_fenix.py serve --degrees 3 --latency-ms 40 --jitter-ms 20
+    python bench/mock_fenix.py record --degree-id 2761663971474 --acronym LEIC-A --out leic.json
+    python bench/mock_fenix.py serve --fixtures leic.json
+
+Point the app at it with FENIX_BASE_URL=http://127.0.0.1:<port>.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.mock_http import MockHTTPServer, Response, add_server_arguments  # noqa: E402
+
+API_PREFIX = "/api/fenix/v1"
+
+ENDPOINT_PATTERNS = [
+    (re.compile(r"^/api/fenix/v1/degrees/all$"), "/degrees/all"),
+    (re.compile(r"^/api/fenix/v1/degrees/[^/]+/courses$"), "/degrees/{id}/courses"),
+    (re.compile(r"^/api/fenix/v1/courses/[^/]+/schedule$"), "/courses/{id}/schedule"),
+    (re.compile(r"^/api/fenix/v1/courses/[^/]+$"), "/courses/{id}"),
+    (re.compile(r"^/api/fenix/v1/spaces/[^/]+$"), "/spaces/{id}"),
+    (re.compile(r"^/cursos/[^/]+/curriculo$"), "/cursos/{acronym}/curriculo"),
+    (re.compile(r"^/disciplinas/.+/turnos$"), "/disciplinas/{acronym}/{term}/{semester}/turnos"),
+]
+
+CAMPUSES = ["Alameda", "Taguspark"]
+DAYS = ["2025-09-15", "2025-09-16", "2025-09-17", "2025-09-18", "2025-09-19"]
+SHIFT_KINDS = [("T", "TEORICA"), ("PB", "PROBLEMS"), ("L", "LABORATORIAL")]
+
+
+class FixtureApp:
+    """Serve responses keyed by path from a fixture map.
+
+    Fixture values are ``{"status", "content_type", "body"}``; JSON bodies
+    may be stored as objects. Responses carry an ETag and honour
+    ``If-None-Match`` like the real API.
+    """
+
+    def __init__(self, fixtures: dict):
+        self.fixtures = {}
+        for path, entry in fixtures.items():
+            body = entry.get("body", "")
+            content_type = entry.get("content_type") or ("application/json" if isinstance(body, (dict, list))
+                                                         else "text/html; charset=utf-8")
+            if isinstance(body, (dict, list)):
+                body = json.dumps(body, ensure_ascii=False)
+            self.fixtures[path.rstrip("/") or "/"] = (entry.get("status", 200), content_type, body)
+
+    def endpoint(self, path: str) -> str:
+        for pattern, name in ENDPOINT_PATTERNS:
+            if pattern.match(path):
+                return name
+        return path
+
+    def __call__(self, method, path, query, form, headers):
+        entry = self.fixtures.get(path)
+        if entry is None:
+            return None
+        status, content_type, body = entry
+        etag = '"' + hashlib.sha1(body.encode("utf-8")).hexdigest()[:16] + '"'
+        if headers.get("If-None-Match") == etag:
+            return Response(b"", status=304, content_type=content_type, headers={"ETag": etag})
+        return Response(body, status=status, content_type=content_type, headers={"ETag": etag})
+
+
+def synthetic_fixtures(degrees: int = 3, courses: int = 12, shifts: int = 6, seed: int = 1,
+                       term: str = "2025/2026") -> dict:
+    """A deterministic fake catalog exercising every FenixAPI code path.
+
+    Every few courses lack a period in their schedule (so the curriculum
+    page is fetched), rooms without a top-level space (so /spaces is
+    queried) and, for some courses, no rooms at all (so the turnos page is
+    scraped).
+    """
+    rng = random.Random(seed)
+    fixtures = {}
+    degree_list = []
+    space_ids = []
+    next_id = 1000
+
+    def new_id():
+        nonlocal next_id
+        next_id += 1
+        return str(next_id)
+
+    for space in range(8):
+        space_id = str(9000 + space)
+        space_ids.append(space_id)
+        fixtures[f"{API_PREFIX}/spaces/{space_id}"] = {"body": {
+            "id": space_id, "name": f"Room {space}", "topLevelSpace": {"name": CAMPUSES[space % 2]}}}
+
+    for d in range(degrees):
+        degree_id = new_id()
+        acronym = f"DEG{d}"
+        degree_list.append({"id": degree_id, "acronym": acronym, "name": f"Licenciatura em Teste {d}",
+                            "degreeType": "Licenciatura", "academicTerms": [term]})
+        course_list = []
+        curriculum_rows = []
+        for c in range(courses):
+            course_id = new_id()
+            semester = 1 + (c % 2)
+            period = f"P{1 + (c % 2) * 2 + rng.randint(0, 1)}"
+            name = f"Disciplina {d}-{c}"
+            course_acronym = f"D{d}C{c}"
+            course_list.append({"id": course_id, "acronym": course_acronym, "name": name,
+                                "academicTerm": f"{semester} Semestre {term}"})
+            fixtures[f"{API_PREFIX}/courses/{course_id}"] = {"body": {
+                "id": course_id, "name": name, "url": f"/disciplinas/{course_acronym.lower()}"}}
+            curriculum_rows.append(f'<a href="#">{name}</a><div>Semestre {semester}, {period}</div>')
+
+            no_rooms = c % 5 == 4
+            shift_list = []
+            for s in range(shifts):
+                kind, type_name = SHIFT_KINDS[s % len(SHIFT_KINDS)]
+                start_hour = rng.choice([8, 9, 10, 11, 13, 14, 15, 16, 17])
+                day = rng.choice(DAYS)
+                room = {}
+                if not no_rooms:
+                    space_id = rng.choice(space_ids)
+                    room = {"id": space_id, "name": f"Room {space_id}"}
+                    if s % 3 != 2:
+                        room["topLevelSpace"] = {"name": CAMPUSES[int(space_id) % 2]}
+                capacity = rng.choice([20, 30, 60])
+                shift_list.append({
+                    "name": f"{course_acronym}{kind}{s // len(SHIFT_KINDS) + 1:02d}",
+                    "types": [type_name],
+                    "lessons": [{
+                        "start": f"{day} {start_hour:02d}:00:00",
+                        "end": f"{day} {start_hour + 1 + (kind == 'L'):02d}:30:00",
+                        "room": room,
+                    }],
+                    "occupation": {"current": rng.randint(capacity // 2, capacity), "max": capacity},
+                })
+            schedule = {"courseLoads": [{"type": t} for _k, t in SHIFT_KINDS], "shifts": shift_list}
+            if c % 3 == 0:
+                schedule["courseLoads"][0]["executionPeriod"] = {"name": period}
+            fixtures[f"{API_PREFIX}/courses/{course_id}/schedule"] = {"body": schedule}
+
+            if no_rooms:
+                term_slug = term.replace("/", "-")
+                rows = "".join(
+                    f'<tr><td>{sh["name"]}</td><td>-</td><td>-</td>'
+                    f'<td><a href="/spaces/{rng.choice(space_ids)}">Room</a></td></tr>'
+                    for sh in shift_list)
+                fixtures[f"/disciplinas/{course_acronym.lower()}/{term_slug}/{semester}-semestre/turnos"] = {
+                    "body": f"<html><body><table><tbody>{rows}</tbody></table></body></html>"}
+
+        fixtures[f"{API_PREFIX}/degrees/{degree_id}/courses"] = {"body": course_list}
+        fixtures[f"/cursos/{acronym.lower()}/curriculo"] = {"body": (
+            '<html><body><div id="content-block"><ul class="dropdown-menu">'
+            f'<li><a href="?year=77">{term}</a></li></ul>'
+            f'{"".join(curriculum_rows)}</div></body></html>')}
+
+    fixtures[f"{API_PREFIX}/degrees/all"] = {"body": degree_list}
+    return fixtures
+
+
+def record_fixtures(degree_id: str, acronym: str = "", out: str = "fixtures.json"):
+    """Load one degree through FenixAPI against the real server and save every response."""
+    from src.api import FenixAPI
+
+    api = FenixAPI()
+    fixtures = {}
+
+    def keep(resp, *args, **kwargs):
+        path = urlsplit(resp.url).path.rstrip("/")
+        if resp.ok and path not in fixtures:
+            fixtures[path] = {"status": resp.status_code,
+                              "content_type": resp.headers.get("Content-Type", ""), "body": resp.text}
+
+    api.session.hooks["response"].append(keep)
+    api.get_degrees_all()
+    courses = api.get_degree_courses(degree_id, enrich=True, degree_acronym=acronym)
+    with open(out, "w") as f:
+        json.dump(fixtures, f, ensure_ascii=False)
+    print(f"Recorded {len(fixtures)} responses for {len(courses)} courses to {out}")
+
+
+def build_server(args) -> MockHTTPServer:
+    if args.fixtures:
+        with open(args.fixtures, "r") as f:
+            fixtures = json.load(f)
+    else:
+        fixtures = synthetic_fixtures(args.degrees, args.courses, args.shifts, args.seed)
+    return MockHTTPServer(FixtureApp(fixtures), port=args.port, latency_ms=args.latency_ms,
+                          jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=args.seed,
+                          tail_rate=args.tail_rate, tail_ms=args.tail_ms)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local mock of the Fenix API")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="serve recorded or synthetic fixtures")
+    add_server_arguments(serve)
+    serve.add_argument("--fixtures", help="recorded fixtures JSON (default: synthetic data)")
+    serve.add_argument("--degrees", type=int, default=3)
+    serve.add_argument("--courses", type=int, default=12, help="courses per degree")
+    serve.add_argument("--shifts", type=int, default=6, help="shifts per course")
+
+    record = sub.add_parser("record", help="record fixtures from the real Fenix")
+    record.add_argument("--degree-id", required=True)
+    record.add_argument("--acronym", default="")
+    record.add_argument("--out", default="fixtures.json")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        record_fixtures(args.degree_id, args.acronym, args.out)
+        return 0
+
+    server = build_server(args)
+    print(f"Mock Fenix listening on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Numeric path segments are ids, collapsed so stats group by endpoint
+ID_SEGMENT_RE = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_of(path: str) -> str:
+    return ID_SEGMENT_RE.sub("/{id}", path)
+
+
+class Response:
+    def __init__(self, body="", status: int = 200, content_type: str = "text/html; charset=utf-8",
+                 headers: dict = None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, ensure_ascii=False)
+            content_type = "application/json; charset=utf-8"
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.status = status
+        self.content_type = content_type
+        self.headers = headers or {}
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    """Threaded local server with injected latency, jitter, slow tail and errors.
+
+    ``app(method, path, query, form, headers)`` returns a Response (or
+    None for 404). Every request is counted per endpoint (``app.endpoint``
+    names it when present); ``/__stats`` returns the counters and
+    ``/__reset`` clears them. Other ``/__`` paths go to the app without
+    latency or counting, for its own control endpoints.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, app, port: int = 0, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, seed: int = None, quiet: bool = True,
+                 tail_rate: float = 0.0, tail_ms: float = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.app = app
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+        self.quiet = quiet
+        self.random = random.Random(seed)
+        self.stats = Counter()
+        self.errors = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def delay(self) -> float:
+        with self._lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            # A few requests hang, like the real server under enrollment load
+            if self.tail_rate > 0 and self.random.random() < self.tail_rate:
+                jitter += self.tail_ms
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def inject_error(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self.random.random() < self.error_rate
+
+    def count(self, method: str, path: str, error: bool = False):
+        name = getattr(self.app, "endpoint", endpoint_of)
+        key = f"{method} {name(path)}"
+        with self._lock:
+            self.stats[key] += 1
+            if error:
+                self.errors[key] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"requests": dict(self.stats), "errors": dict(self.errors), "total": sum(self.stats.values())}
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.errors.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body in one segment, otherwise delayed ACKs add ~40ms per request
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        if not self.server.quiet:
+            super().log_message(fmt, *args)
+
+    def _send(self, response: Response):
+        self.send_response(response.status)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(response.body)))
+        for name, value in response.headers.items():
+            if isinstance(value, (list, tuple)):
+                for v in value:
+                    self.send_header(name, v)
+            else:
+                self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(response.body)
+
+    def _handle(self):
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/") or "/"
+        query = {k: v[-1] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+        form = {}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            raw = self.rfile.read(length).decode("utf-8", "replace")
+            form = {k: v[-1] for k, v in parse_qs(raw, keep_blank_values=True).items()}
+
+        if path == "/__stats":
+            return self._send(Response(self.server.snapshot()))
+        if path == "/__reset":
+            self.server.reset()
+            return self._send(Response({"ok": True}))
+        if path.startswith("/__"):
+            # Control endpoints of the app itself: no latency, not counted
+            response = self.server.app(self.command, path, query, form, self.headers)
+            return self._send(response or Response("Not Found", status=404, content_type="text/plain"))
+
+        time.sleep(self.server.delay())
+        if self.server.inject_error():
+            self.server.count(self.command, path, error=True)
+            return self._send(Response("Service Unavailable", status=503, content_type="text/plain"))
+
+        self.server.count(self.command, path)
+        response = self.server.app(self.command, path, query, form, self.headers)
+        self._send(response or Response("Not Found", status=404, content_type="text/plain"))
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_HEAD(self):
+        self._handle()
+
+
+def add_server_arguments(parser):
+    parser.add_argument("--port", type=int, default=0, help="port to listen on (0 picks a free one)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="+/- random jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="fraction of requests delayed by --tail-ms")
+    parser.add_argument("--tail-ms", type=float, default=0, help="extra latency of the slow tail")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for jitter, errors and data")
@@ -0,0 +1,425 @@
+"""Local stand-in for the Fenix shift enrollment portal.
+
+Serves the CAS login form, the enrollment landing page and its Continue
+form, the enrollment manager, course pages with checksummed
+enrollStudentInShifts.do links and the success / full / already enrolled
+/ closed responses, so every FenixBot path can run outside a real window.
+
+    python bench/mock_portal.py --scenario scenario.json --latency-ms 80
+    python bench/mock_portal.py --courses 4 --seats 1 --opens-in 30
+
+A scenario file scripts the portal:
+
+    {
+      "users": {"ist1100000": "secret"},
+      "opens_in": 30, "closes_in": 3600,
+      "confirm": false, "lang": "en",
+      "courses": [{"name": "Análise Matemática I", "acronym": "AMI",
+                   "shifts": [{"name": "AMI1T01", "type": "T", "seats": 50},
+                              {"name": "AMI1PB02", "type": "PB", "seats": 0}]}],
+      "events": [{"after": 60, "shift": "AMI1PB02", "seats": 1}]
+    }
+
+``lang`` ("pt" by default, or "en") picks the language of the result
+messages. ``opens_in``/``closes_in``/``after`` are seconds from startup (or from the
+last ``/__portal/reset``). Control endpoints, exempt from latency:
+``/__portal/state``, ``/__portal/reset[?opens_in=S]`` and
+``/__portal/set?shift=NAME&seats=N`` or ``?open=0|1``.
+"""
+import argparse
+import hashlib
+import hmac
+import html
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.mock_http import MockHTTPServer, Response, add_server_arguments  # noqa: E402
+
+SESSION_COOKIE = "JSESSIONID"
+REGISTRATION_OID = "1127428915298134"
+EXECUTION_SEMESTER_ID = "1127598031618785"
+TERM = "1st Semester 2025/2026"
+MANAGER_PATH = "/student/studentShiftEnrollmentManager.do"
+ENROLL_PATH = "/student/enrollStudentInShifts.do"
+
+SYNTHETIC_COURSES = [
+    ("Análise Matemática I", "AMI"),
+    ("Introdução aos Algoritmos e Estruturas de Dados", "IAED"),
+    ("Sistemas Digitais", "SD"),
+    ("Fundamentos da Programação", "FP"),
+    ("Álgebra Linear", "AL"),
+    ("Física I", "FI"),
+]
+
+
+def synthetic_scenario(courses: int = 3, seats: int = 2, opens_in: float = 0) -> dict:
+    """Courses with one theory, two problem and two lab shifts each."""
+    scenario = {"opens_in": opens_in, "courses": []}
+    for i in range(courses):
+        name, acronym = SYNTHETIC_COURSES[i % len(SYNTHETIC_COURSES)]
+        if i >= len(SYNTHETIC_COURSES):
+            name, acronym = f"{name} {i // len(SYNTHETIC_COURSES) + 1}", f"{acronym}{i // len(SYNTHETIC_COURSES) + 1}"
+        scenario["courses"].append({"name": name, "acronym": acronym, "shifts": [
+            {"name": f"{acronym}1T01", "type": "T", "seats": 200},
+            {"name": f"{acronym}1PB01", "type": "PB", "seats": seats},
+            {"name": f"{acronym}1PB02", "type": "PB", "seats": seats},
+            {"name": f"{acronym}1L01", "type": "L", "seats": seats},
+            {"name": f"{acronym}1L02", "type": "L", "seats": seats},
+        ]})
+    return scenario
+
+
+# Result messages as Fenix words them in each interface language
+MESSAGES = {
+    "pt": {
+        "closed": "Período de inscrições fechado.",
+        "already": "Já está inscrito no turno {shift}.",
+        "full": "O turno {shift} está lotado.",
+        "enrolled": "Inscrito com sucesso no turno {shift}.",
+        "cancelled": "Reserva cancelada.",
+        "invalid": "Pedido inválido.",
+        "no_course": "Disciplina inexistente.",
+    },
+    "en": {
+        "closed": "Enrollment period closed.",
+        "already": "You are already enrolled in shift {shift}.",
+        "full": "The shift {shift} is full.",
+        "enrolled": "You have successfully enrolled in shift {shift}.",
+        "cancelled": "Booking cancelled.",
+        "invalid": "Invalid request.",
+        "no_course": "Course not found.",
+    },
+}
+
+
+def _page(title: str, body: str, logged_in: bool = True) -> str:
+    header = ('<div id="user"><a href="/logout">Logout</a></div>' if logged_in else "")
+    return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title></head>"
+            f"<body>{header}<div id=\"content\"><h2>{title}</h2>{body}</div></body></html>")
+
+
+class Portal:
+    """The portal state and its request handler (a MockHTTPServer app)."""
+
+    def __init__(self, scenario: dict):
+        self.scenario = scenario
+        self.users = scenario.get("users") or {"student": "student"}
+        self.confirm = bool(scenario.get("confirm"))
+        self.messages = MESSAGES.get(scenario.get("lang") or "pt", MESSAGES["pt"])
+        self.secret = secrets.token_bytes(16)
+        self.sessions = {}
+        self._lock = threading.Lock()
+        self.courses = {}
+        self.shifts = {}
+        for n, course in enumerate(scenario.get("courses") or []):
+            course_id = str(1610612000000 + n)
+            self.courses[course_id] = {"id": course_id, "name": course["name"],
+                                       "acronym": course.get("acronym", ""), "shifts": []}
+            for m, shift in enumerate(course.get("shifts") or []):
+                shift_id = str(1129576052400000 + n * 100 + m)
+                self.shifts[shift_id] = {"id": shift_id, "name": shift["name"], "type": shift.get("type", ""),
+                                         "course_id": course_id, "initial_seats": int(shift.get("seats", 1))}
+                self.courses[course_id]["shifts"].append(shift_id)
+        self.reset(scenario.get("opens_in", 0))
+
+    # -- state -------------------------------------------------------------
+
+    def reset(self, opens_in: float = None):
+        with self._lock:
+            self.started = time.time()
+            if opens_in is None:
+                opens_in = self.scenario.get("opens_in", 0)
+            self.opens_at = self.started + float(opens_in)
+            self.closes_at = self.started + float(self.scenario.get("closes_in", 4 * 3600))
+            self.forced_open = None
+            self.seats = {sid: s["initial_seats"] for sid, s in self.shifts.items()}
+            self.bookings = {}
+            self.events = sorted(self.scenario.get("events") or [], key=lambda e: e.get("after", 0))
+
+    def _apply_events(self):
+        now = time.time()
+        while self.events and self.started + self.events[0].get("after", 0) <= now:
+            event = self.events.pop(0)
+            for sid, shift in self.shifts.items():
+                if shift["name"] == event.get("shift"):
+                    self.seats[sid] = int(event.get("seats", 0))
+            if "open" in event:
+                self.forced_open = bool(event["open"])
+
+    def is_open(self) -> bool:
+        if self.forced_open is not None:
+            return self.forced_open
+        return self.opens_at <= time.time() < self.closes_at
+
+    def state(self) -> dict:
+        with self._lock:
+            self._apply_events()
+            return {
+                "open": self.is_open(),
+                "opens_at": self.opens_at,
+                "closes_at": self.closes_at,
+                "users": sorted(self.users),
+                "courses": [{"name": c["name"], "acronym": c["acronym"],
+                             "shifts": [{"name": self.shifts[sid]["name"], "type": self.shifts[sid]["type"],
+                                         "seats": self.seats[sid]} for sid in c["shifts"]]}
+                            for c in self.courses.values()],
+                "bookings": [{"user": user, "shift": self.shifts[sid]["name"],
+                              "course": self.courses[self.shifts[sid]["course_id"]]["name"], "at": at}
+                             for user, booked in self.bookings.items() for sid, at in booked.items()],
+            }
+
+    def checksum(self, session: str, shift_id: str) -> str:
+        return hmac.new(self.secret, f"{session}:{shift_id}".encode(), hashlib.sha1).hexdigest()[:20]
+
+    # -- request handling ----------------------------------------------------
+
+    def endpoint(self, path: str) -> str:
+        return path
+
+    def __call__(self, method, path, query, form, headers):
+        if path.startswith("/__portal"):
+            return self._control(path, query)
+
+        session = self._session_of(headers)
+        user = self.sessions.get(session)
+
+        if path == "/cas/login":
+            return self._login(method, form)
+        if path == "/logout":
+            self.sessions.pop(session, None)
+            return self._redirect("/cas/login")
+        if path in ("", "/"):
+            return self._redirect("/student" if user else "/cas/login")
+        if path == "/robots.txt":
+            return Response("User-agent: *\nDisallow:\n", content_type="text/plain")
+        if not (path.startswith("/student") or path.startswith("/messaging")):
+            return None
+        if not user:
+            return self._redirect("/cas/login")
+
+        if path == "/student/enroll/shift-enrollment":
+            return Response(self._landing())
+        if path == MANAGER_PATH:
+            action = query.get("method") or form.get("method") or ""
+            if action == "proceedToShiftEnrolment":
+                return Response(self._course_page(session, user, query.get("executionCourseID", "")))
+            if action == "removeStudentFromShifts":
+                with self._lock:
+                    self._unbook(user, query.get("shiftId", ""))
+                return Response(self._manager(session, user, ("success", self.messages["cancelled"])))
+            return Response(self._manager(session, user))
+        if path == ENROLL_PATH:
+            params = dict(query)
+            params.update(form)
+            return Response(self._enroll(method, session, user, params))
+        return Response(_page("Portal do Estudante", "<p>Bem-vindo, student.</p>"))
+
+    def _control(self, path: str, query: dict):
+        if path == "/__portal/reset":
+            self.reset(float(query["opens_in"]) if query.get("opens_in") else None)
+        elif path == "/__portal/set":
+            with self._lock:
+                if "open" in query:
+                    self.forced_open = query["open"] in ("1", "true", "yes")
+                if query.get("shift"):
+                    for sid, shift in self.shifts.items():
+                        if shift["name"] == query["shift"]:
+                            self.seats[sid] = int(query.get("seats", 0))
+        elif path != "/__portal/state":
+            return None
+        return Response(self.state())
+
+    @staticmethod
+    def _session_of(headers) -> str:
+        for part in (headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE:
+                return value
+        return ""
+
+    @staticmethod
+    def _redirect(location: str, cookie: str = None):
+        headers = {"Location": location}
+        if cookie:
+            headers["Set-Cookie"] = cookie
+        return Response("", status=302, headers=headers)
+
+    def _login(self, method: str, form: dict):
+        error = ""
+        if method == "POST":
+            username = form.get("username", "")
+            if username in self.users and self.users[username] == form.get("password"):
+                session = secrets.token_hex(16)
+                self.sessions[session] = username
+                return self._redirect("/student", f"{SESSION_COOKIE}={session}; Path=/; HttpOnly")
+            error = '<div class="alert alert-danger error">Credenciais inválidas.</div>'
+        # No "student" anywhere on this page: the bot takes that word as a sign of being logged in
+        return Response(_page("Central Authentication Service", (
+            f'{error}<form method="post" action="/cas/login" id="fm1">'
+            '<input id="username" name="username" type="text" autocomplete="off">'
+            '<input id="password" name="password" type="password">'
+            '<button type="submit" name="submit" class="btn">Entrar</button></form>'), logged_in=False))
+
+    def _landing(self) -> str:
+        return _page("Inscrição em Turnos", (
+            "<p>Leia as regras de inscrição antes de continuar.</p>"
+            f'<form method="post" action="{MANAGER_PATH}">'
+            f'<input type="hidden" name="registrationOID" value="{REGISTRATION_OID}">'
+            '<input type="submit" value="Continuar"></form>'))
+
+    def _common_params(self, shift_id: str) -> dict:
+        return {"registrationOID": REGISTRATION_OID, "shiftId": shift_id,
+                "executionSemesterID": EXECUTION_SEMESTER_ID}
+
+    def _message(self, message) -> str:
+        if not message:
+            return ""
+        kind, text = message
+        css = "success0" if kind == "success" else "error0"
+        return f'<div class="{css}"><span>{html.escape(text)}</span></div>'
+
+    def _window_text(self) -> str:
+        start = datetime.fromtimestamp(self.opens_at).strftime("%d/%m/%Y %H:%M")
+        end = datetime.fromtimestamp(self.closes_at).strftime("%d/%m/%Y %H:%M")
+        return f"Período de inscrições fechado: {start} - {end} ({TERM})"
+
+    def _manager(self, session: str, user: str, message=None) -> str:
+        with self._lock:
+            self._apply_events()
+            if not self.is_open():
+                return _page("Inscrição em Turnos", f'<div class="infoop2">{self._window_text()}</div>')
+            booked = dict(self.bookings.get(user) or {})
+        rows = []
+        for course in self.courses.values():
+            link = f"{MANAGER_PATH}?" + urlencode({"method": "proceedToShiftEnrolment",
+                                                   "registrationOID": REGISTRATION_OID,
+                                                   "executionCourseID": course["id"]})
+            rows.append(f'<tr><td>{html.escape(course["name"])}</td><td>{course["acronym"]}</td>'
+                        f'<td><a href="{html.escape(link)}">Reservar</a></td></tr>')
+        booked_rows = []
+        for sid in booked:
+            shift = self.shifts[sid]
+            cancel = f"{MANAGER_PATH}?" + urlencode({"method": "removeStudentFromShifts",
+                                                     **self._common_params(sid)})
+            booked_rows.append(f'<tr><td>{html.escape(self.courses[shift["course_id"]]["name"])}</td>'
+                               f'<td>{shift["name"]}</td><td>{shift["type"]}</td>'
+                               f'<td><a href="{html.escape(cancel)}">Cancelar</a></td></tr>')
+        return _page("Inscrição em Turnos", (
+            f"{self._message(message)}<p>{TERM}</p>"
+            '<h3>Disciplinas</h3><table class="tstyle4"><tbody>' + "".join(rows) + "</tbody></table>"
+            '<h3>Turnos reservados</h3><table class="tstyle4"><tbody>' + "".join(booked_rows) +
+            "</tbody></table>"))
+
+    def _course_page(self, session: str, user: str, course_id: str, message=None) -> str:
+        course = self.courses.get(course_id)
+        if not course:
+            return _page("Inscrição em Turnos", self._message(("error", self.messages["no_course"])))
+        with self._lock:
+            self._apply_events()
+            seats = dict(self.seats)
+            booked = set(self.bookings.get(user) or {})
+        rows = []
+        for sid in course["shifts"]:
+            shift = self.shifts[sid]
+            params = self._common_params(sid)
+            params.update({"classId": "", "executionCourseID": course_id, "weekStart": "null", "weekEnd": "null",
+                           "_request_checksum_": self.checksum(session, sid)})
+            action = ("Reservado" if sid in booked else
+                      f'<a href="{html.escape(ENROLL_PATH + "?" + urlencode(params))}">Reservar</a>')
+            rows.append(f'<tr><td>{shift["name"]}</td><td>{shift["type"]}</td>'
+                        f'<td>{seats[sid]} vagas</td><td>{action}</td></tr>')
+        return _page(html.escape(course["name"]), (
+            f'{self._message(message)}<table class="tstyle4"><thead><tr><th>Turno</th><th>Tipo</th>'
+            f'<th>Vagas</th><th></th></tr></thead><tbody>{"".join(rows)}</tbody></table>'))
+
+    def _unbook(self, user: str, shift_id: str):
+        if shift_id in (self.bookings.get(user) or {}):
+            del self.bookings[user][shift_id]
+            self.seats[shift_id] += 1
+
+    def _enroll(self, method: str, session: str, user: str, params: dict) -> str:
+        shift_id = params.get("shiftId", "")
+        shift = self.shifts.get(shift_id)
+        if not shift or not hmac.compare_digest(params.get("_request_checksum_", ""), self.checksum(session, shift_id)):
+            return _page("Inscrição em Turnos", self._message(("error", self.messages["invalid"])))
+        course_id = shift["course_id"]
+
+        if self.confirm and method != "POST":
+            hidden = "".join(f'<input type="hidden" name="{html.escape(k)}" value="{html.escape(v)}">'
+                             for k, v in params.items())
+            return _page("Confirmar inscrição", (
+                f"<p>Confirma a inscrição no turno {shift['name']}?</p>"
+                f'<form method="post" action="{ENROLL_PATH}">{hidden}'
+                '<input type="submit" value="Confirmar"></form>'))
+
+        with self._lock:
+            self._apply_events()
+            booked = self.bookings.setdefault(user, {})
+            if not self.is_open():
+                message = ("error", self.messages["closed"])
+            elif shift_id in booked:
+                message = ("error", self.messages["already"].format(shift=shift["name"]))
+            elif self.seats[shift_id] <= 0:
+                message = ("error", self.messages["full"].format(shift=shift["name"]))
+            else:
+                # One shift per course and type: booking another swaps it
+                for other in [sid for sid in booked if sid != shift_id
+                              and self.shifts[sid]["course_id"] == course_id
+                              and self.shifts[sid]["type"] == shift["type"]]:
+                    self._unbook(user, other)
+                self.seats[shift_id] -= 1
+                booked[shift_id] = time.time()
+                message = ("success", self.messages["enrolled"].format(shift=shift["name"]))
+        return self._course_page(session, user, course_id, message)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local mock of the Fenix shift enrollment portal")
+    add_server_arguments(parser)
+    parser.add_argument("--scenario", help="scenario JSON (default: synthetic courses)")
+    parser.add_argument("--courses", type=int, default=3, help="synthetic courses")
+    parser.add_argument("--seats", type=int, default=2, help="free seats per synthetic PB/L shift")
+    parser.add_argument("--opens-in", type=float, default=None, help="seconds until the period opens")
+    parser.add_argument("--confirm", action="store_true", help="ask for confirmation before enrolling")
+    parser.add_argument("--lang", choices=sorted(MESSAGES), help="language of the result messages (default pt)")
+    parser.add_argument("--user", action="append", default=[], metavar="NAME:PASSWORD",
+                        help="accepted login (default student:student)")
+    args = parser.parse_args(argv)
+
+    if args.scenario:
+        with open(args.scenario, "r") as f:
+            scenario = json.load(f)
+    else:
+        scenario = synthetic_scenario(args.courses, args.seats)
+    if args.opens_in is not None:
+        scenario["opens_in"] = args.opens_in
+    if args.confirm:
+        scenario["confirm"] = True
+    if args.lang:
+        scenario["lang"] = args.lang
+    if args.user:
+        scenario["users"] = dict(u.split(":", 1) for u in args.user)
+
+    server = MockHTTPServer(Portal(scenario), port=args.port, latency_ms=args.latency_ms,
+                            jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=args.seed,
+                            tail_rate=args.tail_rate, tail_ms=args.tail_ms)
+    print(f"Mock portal listening on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
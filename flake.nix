@@ -21,6 +21,7 @@
             tkinter
             requests
             beautifulsoup4
+            cryptography
           ]);
 
           desktopItem = pkgs.makeDesktopItem {
@@ -101,6 +102,7 @@
             tkinter
             requests
             beautifulsoup4
+            cryptography
           ]);
         in
         pkgs.mkShell {
@@ -1,8 +1,16 @@
-import tkinter as tk
-from src.gui import GUI
+import sys
 
 
 def main():
+    # Any command-line argument selects the headless runner, which must not
+    # import tkinter (servers and containers usually lack it)
+    if len(sys.argv) > 1:
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    import tkinter as tk
+    from src.gui import GUI
+
     root = tk.Tk()
     app = GUI(root)
     root.mainloop()
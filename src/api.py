@@ -1,18 +1,118 @@
-import requests
+import threading
+import time
 import re
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from bs4 import BeautifulSoup
-from .config import BASE_URL, DEFAULT_LANG, DEFAULT_ACADEMIC_TERM, DEFAULT_SESSION_TIMEOUT
+from .config import BASE_URL, FENIX_BASE_URL, DEFAULT_LANG, DEFAULT_ACADEMIC_TERM
+from .metrics import RequestMetrics
+from .singleflight import SingleFlight
+from .transport import create_session, load_transport
 
 
 class FenixAPI:
-    def __init__(self, lang: str = DEFAULT_LANG, academic_term: str = DEFAULT_ACADEMIC_TERM):
-        self.session = requests.Session()
-        self.session.timeout = DEFAULT_SESSION_TIMEOUT
+    def __init__(self, lang: str = DEFAULT_LANG, academic_term: str = DEFAULT_ACADEMIC_TERM,
+                 transport: dict = None, catalog=None):
+        # Pooled connections, timeouts, retries, rate limit and hedging (API_TRANSPORT)
+        self.transport = load_transport(transport)
+        self.session = create_session(self.transport)
+        # The TransportAdapter mounted for both schemes, for its rate budget
+        self._adapter = self.session.get_adapter("https://")
+        self._hedge_pool = None
         self.lang = lang
         self.academic_term = academic_term
         self._curriculum_cache = {}
         self._course_pt_cache = {}
         self._space_cache = {}
+        # Guards the caches above; concurrent misses share one request through _flights
+        self._cache_lock = threading.Lock()
+        self._flights = SingleFlight()
+        # CatalogDB that fetched degrees and enriched courses are written to, if any
+        self.catalog = catalog
+        self.metrics = RequestMetrics()
+
+    def _get(self, endpoint: str, url: str, **kwargs):
+        """``session.get`` with a timeout and hedging adapted to the endpoint's recent latency."""
+        policy = self.transport
+        min_samples = policy["adaptive_min_samples"]
+        if "timeout" not in kwargs:
+            p99 = self.metrics.latency(endpoint, 0.99, min_samples)
+            if p99 is not None:
+                read = min(policy["read_timeout"], max(policy["min_read_timeout"], policy["timeout_factor"] * p99))
+                kwargs["timeout"] = (policy["connect_timeout"], read)
+        if policy["hedge_percentile"]:
+            after = self.metrics.latency(endpoint, policy["hedge_percentile"], min_samples)
+            if after is not None:
+                return self._hedged_get(endpoint, url, max(after, policy["hedge_min_delay"]), **kwargs)
+        return self._attempt(endpoint, url, **kwargs)
+
+    def _hedged_get(self, endpoint: str, url: str, after: float, **kwargs):
+        """Send a duplicate request if the first one takes longer than ``after`` seconds; first answer wins.
+
+        The slower request is left to finish in the background and only
+        shows up in the metrics.
+        """
+        if self._hedge_pool is None:
+            with self._cache_lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(max_workers=2 * self.transport["pool_maxsize"],
+                                                          thread_name_prefix="fenix-hedge")
+        first = self._hedge_pool.submit(self._attempt, endpoint, url, **kwargs)
+        done, _ = wait([first], timeout=after)
+        if done or not self._adapter.has_token():
+            # A duplicate would only queue behind our own rate limit
+            return first.result()
+        second = self._hedge_pool.submit(self._attempt, endpoint, url, **kwargs)
+        futures = (first, second)
+        wait(futures, return_when=FIRST_COMPLETED)
+        winner = next((f for f in futures if f.done() and f.exception() is None), None)
+        if winner is None:
+            # The first to finish failed; the other one may still succeed
+            wait(futures)
+            winner = next((f for f in futures if f.exception() is None), first)
+        self.metrics.hedge(endpoint, won=winner is second)
+        return winner.result()
+
+    def _attempt(self, endpoint: str, url: str, **kwargs):
+        """``session.get`` recorded in ``self.metrics`` under the endpoint template.
+
+        The time spent waiting for the rate budget is left out, so hedging
+        and adaptive timeouts follow the server rather than our own limit.
+        """
+        self._adapter.take_wait()
+        started = time.perf_counter()
+        try:
+            resp = self.session.get(url, **kwargs)
+        except Exception:
+            self.metrics.record(endpoint, time.perf_counter() - started - self._adapter.take_wait(), error=True)
+            raise
+        self.metrics.record(endpoint, time.perf_counter() - started - self._adapter.take_wait(),
+                            resp.status_code, len(resp.content))
+        return resp
+
+    def _cached(self, cache: dict, name: str, key, fetch):
+        """Return ``cache[key]``, calling ``fetch()`` on a miss.
+
+        Concurrent misses for the same key wait for a single fetch and count
+        as hits. A ``None`` result is returned but not cached.
+        """
+        with self._cache_lock:
+            if key in cache:
+                self.metrics.cache(name, True)
+                return cache[key]
+
+        def fill():
+            with self._cache_lock:
+                if key in cache:
+                    return cache[key]
+            value = fetch()
+            if value is not None:
+                with self._cache_lock:
+                    cache[key] = value
+            return value
+
+        value, shared = self._flights.do((name, key), fill)
+        self.metrics.cache(name, shared)
+        return value
         
     def set_lang(self, lang: str):
         if lang:
@@ -24,11 +124,15 @@ class FenixAPI:
         
     def get_degrees_all(self):
         try:
-            resp = self.session.get(
+            resp = self._get(
+                "/degrees/all",
                 f"{BASE_URL}/degrees/all",
                 params={"lang": self.lang}
             )
-            return resp.json() if resp.ok else []
+            degrees = resp.json() if resp.ok else []
+            if self.catalog and degrees:
+                self.catalog.store_degrees(degrees, self.lang)
+            return degrees
         except Exception as e:
             print(f"Error getting degrees: {e}")
             return []
@@ -36,7 +140,8 @@ class FenixAPI:
     def get_degree_courses(self, degree_id: str, academic_term: str = None, enrich: bool = True, degree_acronym: str = ""):
         try:
             term = academic_term or self.academic_term
-            resp = self.session.get(
+            resp = self._get(
+                "/degrees/{id}/courses",
                 f"{BASE_URL}/degrees/{degree_id}/courses",
                 params={"academicTerm": term, "lang": self.lang}
             )
@@ -83,6 +188,8 @@ class FenixAPI:
                         "period_hint": period_hint,
                         "campus": campuses
                     })
+                if self.catalog and enriched_courses:
+                    self.catalog.store_courses(degree_id, term, self.lang, enriched_courses)
                 return enriched_courses
             
             return courses
@@ -144,31 +251,31 @@ class FenixAPI:
         return ""
 
     def _get_course_pt_name_url(self, course_id: str):
-        if course_id in self._course_pt_cache:
-            return self._course_pt_cache[course_id]
+        return self._cached(self._course_pt_cache, "course_pt", course_id,
+                            lambda: self._fetch_course_pt_name_url(course_id))
+
+    def _fetch_course_pt_name_url(self, course_id: str):
         try:
-            resp = self.session.get(
+            resp = self._get(
+                "/courses/{id}",
                 f"{BASE_URL}/courses/{course_id}",
                 params={"lang": "pt-PT"}
             )
             if resp.ok:
                 data = resp.json()
-                name = data.get("name", "")
-                url = data.get("url", "")
-                self._course_pt_cache[course_id] = (name, url)
-                return name, url
+                return data.get("name", ""), data.get("url", "")
         except Exception:
             pass
-        self._course_pt_cache[course_id] = ("", "")
         return "", ""
 
     def _get_degree_curriculum_html(self, degree_acronym: str, academic_term: str):
-        key = (degree_acronym, academic_term)
-        if key in self._curriculum_cache:
-            return self._curriculum_cache[key]
+        return self._cached(self._curriculum_cache, "curriculum", (degree_acronym, academic_term),
+                            lambda: self._fetch_degree_curriculum_html(degree_acronym, academic_term))
+
+    def _fetch_degree_curriculum_html(self, degree_acronym: str, academic_term: str):
         try:
-            base_url = f"https://fenix.tecnico.ulisboa.pt/cursos/{degree_acronym.lower()}/curriculo"
-            resp = self.session.get(base_url)
+            base_url = f"{FENIX_BASE_URL}/cursos/{degree_acronym.lower()}/curriculo"
+            resp = self._get("/cursos/{acronym}/curriculo", base_url)
             if not resp.ok:
                 return None
             html = resp.text
@@ -184,10 +291,9 @@ class FenixAPI:
                         year_param = match.group(1)
                         break
             if year_param:
-                resp = self.session.get(f"{base_url}?year={year_param}")
+                resp = self._get("/cursos/{acronym}/curriculo?year", f"{base_url}?year={year_param}")
                 if resp.ok:
                     html = resp.text
-            self._curriculum_cache[key] = html
             return html
         except Exception:
             return None
@@ -254,7 +360,10 @@ class FenixAPI:
                     campuses.add(name)
         if not campuses:
             acronym = course.get("acronym") or course.get("code") or ""
-            campuses.update(self._extract_campus_from_course_page(acronym, academic_term, semester_hint))
+            page_campuses, _ = self._flights.do(
+                ("turnos", acronym, academic_term, semester_hint, self.lang),
+                lambda: self._extract_campus_from_course_page(acronym, academic_term, semester_hint))
+            campuses.update(page_campuses)
         return sorted(campuses)
 
     def _extract_campus_from_course_page(self, acronym: str, academic_term: str, semester_hint: str):
@@ -265,8 +374,8 @@ class FenixAPI:
             if sem not in {"1", "2"}:
                 sem = "1"
             term = academic_term.replace("/", "-")
-            url = f"https://fenix.tecnico.ulisboa.pt/disciplinas/{acronym.lower()}/{term}/{sem}-semestre/turnos"
-            resp = self.session.get(url, params={"lang": self.lang})
+            url = f"{FENIX_BASE_URL}/disciplinas/{acronym.lower()}/{term}/{sem}-semestre/turnos"
+            resp = self._get("/disciplinas/{acronym}/{term}/{semester}/turnos", url, params={"lang": self.lang})
             if not resp.ok:
                 return set()
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -291,27 +400,35 @@ class FenixAPI:
             return set()
 
     def _get_space_top_level_name(self, space_id: str):
-        if space_id in self._space_cache:
-            return self._space_cache[space_id]
+        return self._cached(self._space_cache, "space", space_id,
+                            lambda: self._fetch_space_top_level_name(space_id))
+
+    def _fetch_space_top_level_name(self, space_id: str):
         try:
-            resp = self.session.get(
+            resp = self._get(
+                "/spaces/{id}",
                 f"{BASE_URL}/spaces/{space_id}",
                 params={"lang": self.lang}
             )
             if resp.ok:
                 data = resp.json() or {}
                 top = data.get("topLevelSpace") or {}
-                name = top.get("name") or data.get("name") or ""
-                self._space_cache[space_id] = name
-                return name
+                return top.get("name") or data.get("name") or ""
         except Exception:
             pass
-        self._space_cache[space_id] = ""
         return ""
     
     def get_course_schedule(self, course_id: str):
+        # Not cached (shift data changes), but concurrent callers share one request
+        schedule, shared = self._flights.do(("schedule", course_id, self.lang),
+                                            lambda: self._fetch_course_schedule(course_id))
+        self.metrics.cache("schedule_inflight", shared)
+        return schedule
+
+    def _fetch_course_schedule(self, course_id: str):
         try:
-            resp = self.session.get(
+            resp = self._get(
+                "/courses/{id}/schedule",
                 f"{BASE_URL}/courses/{course_id}/schedule",
                 params={"lang": self.lang}
             )
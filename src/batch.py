@@ -0,0 +1,313 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+import requests
+
+from .config import BATCH_CONCURRENCY, BATCH_WINDOW_LEAD_SECONDS, DEFAULT_LANG, FENIX_BASE_URL, HTTP_ENROLL_TIMEOUT
+from .outcome import is_success
+from .runner import EnrollmentRunner, queue_key
+from .session_store import SessionKeepalive
+
+
+def server_time_offset(url: str = FENIX_BASE_URL, samples: int = 5) -> float:
+    """Seconds to add to the local clock to get the Fenix server clock.
+
+    Uses the HTTP Date header of the request with the shortest round
+    trip, assuming the server stamped it halfway through.
+    """
+    best = None
+    with requests.Session() as session:
+        for _ in range(samples):
+            try:
+                sent = time.time()
+                resp = session.head(url, timeout=HTTP_ENROLL_TIMEOUT, allow_redirects=False)
+                received = time.time()
+                server = parsedate_to_datetime(resp.headers["Date"]).timestamp()
+            except Exception as e:
+                print(f"[BATCH] Time sync sample failed: {e}")
+                continue
+            rtt = received - sent
+            # Date has whole-second resolution: the mid-second is the best guess
+            offset = server + 0.5 - (sent + rtt / 2)
+            if best is None or rtt < best[0]:
+                best = (rtt, offset)
+    return best[1] if best else 0.0
+
+
+def parse_start(value: str):
+    """Manifest start time: ISO datetime or HH:MM[:SS] today. None starts right away."""
+    if not value:
+        return None
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.combine(datetime.now().date(), datetime.strptime(value, fmt).time())
+        except ValueError:
+            continue
+    return datetime.fromisoformat(value)
+
+
+def load_manifest(path: str) -> dict:
+    """Read a batch manifest and resolve every account's queue.
+
+    Account ``config`` paths are relative to the manifest; passwords come
+    from ``password`` or, preferably, the environment variable named by
+    ``password_env``.
+    """
+    base = Path(path).resolve().parent
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    defaults = manifest.get("defaults") or {}
+    accounts = []
+    for raw in manifest.get("accounts") or []:
+        account = dict(defaults)
+        account.update(raw)
+        if account.get("config"):
+            with open(base / account["config"], "r") as f:
+                saved = json.load(f)
+            account.setdefault("enrollments", saved.get("enrollments") or [])
+            account.setdefault("lang", saved.get("lang"))
+            account.setdefault("scheduler_policy", saved.get("scheduler_policy"))
+        if account.get("password_env"):
+            account["password"] = os.environ.get(account["password_env"], "")
+        if not account.get("username") or not account.get("password"):
+            raise ValueError(f"account {account.get('username') or '?'} has no username/password")
+        accounts.append(account)
+    if not accounts:
+        raise ValueError("manifest has no accounts")
+    manifest["accounts"] = accounts
+    return manifest
+
+
+class BatchWorker:
+    """One account: its own bot, Chrome profile and session.
+
+    Chrome is only held while it is needed. Before the start the worker
+    logs in, resolves every enrollment URL it can and releases the
+    browser, keeping the session alive over plain HTTP. At the start the
+    resolved requests are fired over HTTP; only shifts that could not be
+    resolved or did not go through get a browser again. Neither waiting
+    for a later enrollment opening nor the seat watch holds a browser
+    slot.
+    """
+
+    def __init__(self, account: dict, browsers: threading.Semaphore, log):
+        self.account = account
+        self.username = account["username"]
+        self.browsers = browsers
+        self.log = log
+        self.bot = None
+        self.enroller = None
+        self.jobs = {}
+        self.keepalive = None
+        self.result = {"username": self.username, "total": len(account.get("enrollments") or []),
+                       "enrolled": 0, "pending": [], "http_enrolled": 0, "browser_used": False, "error": ""}
+
+    def _say(self, message: str, level: str = "INFO"):
+        self.log(self.username, message, level)
+
+    def prepare(self):
+        from .bot import FenixBot
+
+        self.bot = FenixBot(self.username, self.account["password"], headless=True)
+        keys = [queue_key(e) for e in self.account.get("enrollments") or [] if e.get("shift_name")]
+        with self.browsers:
+            try:
+                self.bot.init_driver()
+                if not self.bot.login():
+                    raise RuntimeError("login failed")
+                self._say("Restored saved session" if self.bot.session_restored else "Logged in", "SUCCESS")
+                if self.bot.navigate_to_enrollments() and self.bot.is_enrollment_open():
+                    self.enroller, self.jobs = self.bot.prepare_http_jobs(keys)
+                    self._say(f"Resolved {len(self.jobs)}/{len(keys)} enrollment requests")
+            finally:
+                self.bot.release_driver()
+        if self.enroller is None:
+            self._say("Enrollment period not open yet, will use the browser at the start")
+        self.keepalive = SessionKeepalive(self.bot.session_cookies, store=self.bot.session_store,
+                                          on_expired=lambda: self._say("Session expired while waiting", "WARNING"))
+        self.keepalive.start()
+
+    def run(self):
+        started = time.monotonic()
+        if self.keepalive:
+            self.keepalive.stop()
+        enrollments = list(self.account.get("enrollments") or [])
+        dry_run = bool(self.account.get("dry_run"))
+
+        if self.jobs and not dry_run:
+            outcomes = self.enroller.enroll_all(self.jobs)
+            done = {key for key, outcome in outcomes.items() if is_success(outcome)}
+            self.result["http_enrolled"] = len(done)
+            self._say(f"HTTP requests enrolled {len(done)}/{len(self.jobs)} shifts")
+            enrollments = [e for e in enrollments if not e.get("shift_name") or queue_key(e) not in done]
+            self.result["enrolled"] += len(done)
+
+        if enrollments:
+            self.result["browser_used"] = True
+            self._acquire_browser_near_opening()
+            holding = True
+
+            def release_browser():
+                # The seat watch is plain HTTP: free the slot for other accounts
+                nonlocal holding
+                self.bot.release_driver()
+                if holding:
+                    holding = False
+                    self.browsers.release()
+
+            try:
+                if not self.bot.wait_for_enrollment_window():
+                    raise RuntimeError("enrollment period is not open")
+                runner = EnrollmentRunner(
+                    self.bot,
+                    enrollments,
+                    dry_run=dry_run,
+                    watch_full=bool(self.account.get("watch")),
+                    scheduler_policy=self.account.get("scheduler_policy") or {},
+                    lang=self.account.get("lang") or DEFAULT_LANG,
+                    on_log=lambda message, level="INFO": self._say(message, level),
+                    before_watch=release_browser,
+                )
+                summary = runner.run()
+                self.result["enrolled"] += summary["enrolled"]
+                self.result["pending"] = [list(key) for key in summary["pending"]]
+                self.result["session_expired"] = summary["session_expired"]
+            finally:
+                self.bot.close()
+                if holding:
+                    self.browsers.release()
+        self.result["seconds"] = round(time.monotonic() - started, 1)
+
+    def _acquire_browser_near_opening(self):
+        """Take a browser slot with the bot on the enrollment page, once the period is (nearly) open.
+
+        A short visit reads the opening time off the closed page. If it is
+        more than BATCH_WINDOW_LEAD_SECONDS away, the browser and its slot
+        are given back and the session is kept alive over HTTP until then,
+        so accounts waiting for a later opening don't hold up the others.
+        """
+        while True:
+            self.browsers.acquire()
+            try:
+                if not self.bot.resume_session():
+                    raise RuntimeError("could not resume session")
+                if not self.bot.navigate_to_enrollments():
+                    raise RuntimeError("could not reach the enrollment page")
+                opens_at = self.bot.enrollment_opens_at()
+                if opens_at is None or (opens_at - datetime.now()).total_seconds() <= BATCH_WINDOW_LEAD_SECONDS:
+                    return
+                self.bot.release_driver()
+            except BaseException:
+                self.bot.close()
+                self.browsers.release()
+                raise
+            self.browsers.release()
+            self._say(f"Enrollment period opens at {opens_at.strftime('%H:%M')}, waiting without a browser")
+            keepalive = SessionKeepalive(self.bot.session_cookies, store=self.bot.session_store,
+                                         on_expired=lambda: self._say("Session expired while waiting", "WARNING"))
+            keepalive.start()
+            try:
+                wake = opens_at - timedelta(seconds=BATCH_WINDOW_LEAD_SECONDS)
+                while datetime.now() < wake:
+                    time.sleep(max(0.1, min(30.0, (wake - datetime.now()).total_seconds())))
+            finally:
+                keepalive.stop()
+
+    def fail(self, error: Exception):
+        self.result["error"] = str(error)
+        self._say(f"Error: {error}", "ERROR")
+        if self.keepalive:
+            self.keepalive.stop()
+        if self.bot:
+            self.bot.close()
+
+
+def run_batch(manifest: dict, log=None) -> dict:
+    """Prepare every account, start them all together and return the aggregated report."""
+    log = log or (lambda user, message, level="INFO": print(f"[{level}] {user}: {message}"))
+    accounts = manifest["accounts"]
+    concurrency = max(1, int(manifest.get("concurrency") or BATCH_CONCURRENCY))
+    browsers = threading.Semaphore(concurrency)
+    workers = [BatchWorker(account, browsers, log) for account in accounts]
+
+    start_at = parse_start(manifest.get("start_at"))
+    offset = server_time_offset() if start_at else 0.0
+    if start_at:
+        log("batch", f"Server clock offset {offset:+.2f}s; starting at {start_at.strftime('%H:%M:%S')} server time")
+    ready = threading.Event()
+
+    def work(worker: BatchWorker):
+        try:
+            worker.prepare()
+            ready.wait()
+            worker.run()
+        except Exception as e:
+            worker.fail(e)
+        return worker.result
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+        futures = [pool.submit(work, w) for w in workers]
+        if start_at:
+            # Shared start on the server's clock, not each machine's own
+            while time.time() + offset < start_at.timestamp():
+                time.sleep(max(0.001, min(1.0, start_at.timestamp() - time.time() - offset)))
+        ready.set()
+        results = [f.result() for f in futures]
+
+    return {
+        "started": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+        "server_offset_seconds": round(offset, 3),
+        "concurrency": concurrency,
+        "accounts": results,
+        "enrolled": sum(r["enrolled"] for r in results),
+        "total": sum(r["total"] for r in results),
+        "failed_accounts": [r["username"] for r in results if r["error"]],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="ist-fenix-auto-enroller batch",
+        description="Enroll several accounts at once from a manifest of accounts and plans.",
+    )
+    parser.add_argument("manifest", help="batch manifest (JSON)")
+    parser.add_argument("--report", help="write the aggregated report to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        manifest = load_manifest(args.manifest)
+    except Exception as e:
+        print(f"Could not load manifest: {e}", file=sys.stderr)
+        return 2
+
+    out = sys.stdout
+    lock = threading.Lock()
+
+    def log(user, message, level="INFO"):
+        with lock:
+            print(f"{datetime.now().strftime('%H:%M:%S')} {level:<7} {user}: {message}", file=out, flush=True)
+
+    # Bot output goes to stderr so stdout only carries batch progress
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run_batch(manifest, log)
+
+    report_path = args.report or manifest.get("report")
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+    for r in report["accounts"]:
+        status = r["error"] or f"{r['enrolled']}/{r['total']} enrolled"
+        print(f"{r['username']:<16} {status}", file=out)
+    print(f"Total: {report['enrolled']}/{report['total']} enrolled across {len(report['accounts'])} accounts", file=out)
+    if report["failed_accounts"]:
+        return 2
+    return 0 if report["enrolled"] == report["total"] else 1
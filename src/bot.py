@@ -1,152 +1,78 @@
 import time
 import re
-import os
 import json
-import unicodedata
 from datetime import datetime, timedelta
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from urllib.parse import urljoin
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from .config import FENIX_BASE_URL, BROWSER_TIMEOUT, PAGE_LOAD_TIMEOUT
+from .config import FENIX_BASE_URL, BROWSER_TIMEOUT, PAGE_LOAD_TIMEOUT, PARALLEL_ENROLL_WORKERS
+from .paths import get_logs_dir
+from .snapshot import PageSnapshot, EnrollmentState, normalize_text
+from .dom import EXTRACT_COURSE_LINKS_JS, CLICK_LINK_JS, find_course_link
+from .parallel import ParallelEnroller, session_from_driver
+from .outcome import EnrollmentOutcome, classify, is_success, is_retryable
+from .driver_pool import create_driver, driver_alive, quit_driver, lightweight_default
+from .session_store import SessionStore, SessionKeepalive, normalize_cookie, requests_session, session_is_valid
+from .tracing import Tracer, traced
 
 
 class FenixBot:
-    def __init__(self, username: str, password: str, headless: bool = False):
+    def __init__(self, username: str, password: str, headless: bool = False, lightweight: bool = None,
+                 driver_pool=None):
         self.username = username
         self.password = password
         self.base_url = FENIX_BASE_URL
         self.driver = None
         self.wait = None
         self.headless = headless
+        self.lightweight = lightweight_default() if lightweight is None else lightweight
+        self.driver_pool = driver_pool
+        self._session_cookies = None
         self.logged_in = False
         self.capture_dir = None
         self.on_enrollment_wait = None
+        self._snapshot = None
+        self.session_store = SessionStore(username, password)
+        self.session_restored = False
+        self._keepalive = None
+        self.tracer = Tracer(f"fenix-bot {username}")
         
+    @traced()
     def init_driver(self, retries=5):
-        import os
-        import shutil
-        
-        chrome_options = Options()
-        if self.headless:
-            chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--disable-gpu")
-        
-        # Try to find chromedriver from environment or PATH
-        chromedriver_path = None
-        if os.environ.get("CHROMEDRIVER_PATH"):
-            chromedriver_path = os.environ.get("CHROMEDRIVER_PATH")
+        if self.driver_pool:
+            # A warm browser from the pool is ready instantly
+            self.driver = self.driver_pool.acquire()
         else:
-            chromedriver_path = shutil.which("chromedriver")
-        
-        # Set chromium binary if available
-        chrome_bin = os.environ.get("CHROME_BIN")
-        if chrome_bin:
-            chrome_options.binary_location = chrome_bin
-        
-        # Enable performance logging for network requests
-        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
-
-        for attempt in range(retries):
-            try:
-                if chromedriver_path:
-                    service = Service(chromedriver_path)
-                    self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                else:
-                    self.driver = webdriver.Chrome(options=chrome_options)
-                
-                self.wait = WebDriverWait(self.driver, BROWSER_TIMEOUT)
-                self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
-                return True
-            except Exception as e:
-                if attempt == retries - 1:
-                    raise Exception(f"Failed to initialize browser: {e}")
-                time.sleep(2)
-        return False
+            self.driver = create_driver(self.headless, self.lightweight, retries)
+        self.wait = WebDriverWait(self.driver, BROWSER_TIMEOUT)
+        self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        return True
+
+    def ensure_driver(self) -> bool:
+        """Swap a crashed browser for a healthy one, keeping the logged-in session."""
+        if self.driver and driver_alive(self.driver):
+            return True
+        print("[BOT] Browser is not responding, replacing it...")
+        old = self.driver
+        self.driver = None
+        self._snapshot = None
+        if self.driver_pool:
+            self.driver_pool.discard(old)
+        else:
+            quit_driver(old)
+        self.init_driver()
+        if self._session_cookies:
+            self._inject_cookies(self._session_cookies)
+            return True
+        return self.login()
 
     def _find_writable_logs_dir(self) -> Path:
-        """Find writable logs directory using same logic as config.json saving."""
-        # Use specific markers that uniquely identify the ist-fenix-auto-enroller project
-        required_markers = ["src/gui/main_window.py", "main.py"]
-        optional_markers = ["flake.nix", "README.md"]
-        
-        def is_nix_store(path: Path) -> bool:
-            try:
-                return str(path).startswith("/nix/store/")
-            except Exception:
-                return False
-        
-        def is_project_root(path: Path) -> bool:
-            """Check if path has the required markers for ist-fenix-auto-enroller."""
-            return all((path / marker).exists() for marker in required_markers)
-        
-        def is_writable(path: Path) -> bool:
-            try:
-                if not path.exists():
-                    path.mkdir(parents=True, exist_ok=True)
-                test_file = path / ".write_test"
-                test_file.touch()
-                test_file.unlink()
-                return True
-            except (OSError, PermissionError):
-                return False
-        
-        # Try FENIX_PROJECT_ROOT first
-        env_root = os.environ.get("FENIX_PROJECT_ROOT")
-        if env_root:
-            root_path = Path(env_root).resolve()
-            if root_path.exists() and not is_nix_store(root_path) and is_project_root(root_path):
-                logs_path = root_path / "logs"
-                if is_writable(logs_path):
-                    return logs_path
-        
-        # Try PWD and cwd
-        candidates = []
-        env_pwd = os.environ.get("PWD")
-        if env_pwd:
-            candidates.append(Path(env_pwd).resolve())
-        candidates.append(Path.cwd().resolve())
-        
-        for base in candidates:
-            if is_nix_store(base):
-                continue
-            # Walk up to find project root
-            for parent in [base, *base.parents]:
-                if is_project_root(parent):
-                    logs_path = parent / "logs"
-                    if is_writable(logs_path):
-                        return logs_path
-        
-        # Last resort: search in home directory for project
-        home = Path.home()
-        
-        for root, dirs, files in os.walk(home):
-            root_path = Path(root)
-            
-            if is_nix_store(root_path):
-                dirs[:] = []
-                continue
-            
-            dirs[:] = [
-                d for d in dirs
-                if not d.startswith(".") and d not in {".git", "node_modules", "__pycache__"}
-            ]
-            
-            if is_project_root(root_path):
-                logs_path = root_path / "logs"
-                if is_writable(logs_path):
-                    return logs_path
-        
-        return None
+        """Find writable logs directory (resolved once per process, see paths.py)."""
+        return get_logs_dir()
     
     def start_capture(self):
         try:
@@ -191,12 +117,35 @@ class FenixBot:
         except Exception as e:
             print(f"[CAPTURE] ERROR saving network log {label}: {e}")
 
-    def close(self):
+    def export_trace(self, path=None):
+        """Write the recorded spans as Chrome trace JSON, by default next to the capture directory."""
+        if path is None:
+            if not self.capture_dir:
+                return None
+            path = self.capture_dir.parent / f"{self.capture_dir.name}.trace.json"
         try:
-            if self.driver:
-                self.driver.quit()
-        except Exception:
-            pass
+            written = self.tracer.export(path)
+            print(f"[TRACE] Saved trace: {written}")
+            return written
+        except Exception as e:
+            print(f"[TRACE] ERROR saving trace: {e}")
+            return None
+
+    def _load(self, url: str):
+        """driver.get, traced."""
+        with self.tracer.span("driver.get", url=url.split("?")[0]):
+            self.driver.get(url)
+
+    def _pause(self, seconds: float, reason: str = ""):
+        with self.tracer.span("sleep", reason=reason, seconds=seconds):
+            time.sleep(seconds)
+
+    def close(self):
+        self.stop_keepalive()
+        if self.driver_pool:
+            self.driver_pool.discard(self.driver)
+        else:
+            quit_driver(self.driver)
         self.driver = None
         self.wait = None
         self.logged_in = False
@@ -213,10 +162,138 @@ class FenixBot:
         except Exception:
             pass
         
+    def _browser_cookies(self) -> list:
+        """All cookies of the browser, CAS included, not just the current domain's."""
+        try:
+            cookies = self.driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies") or []
+        except Exception:
+            cookies = self.driver.get_cookies()
+        return [normalize_cookie(c) for c in cookies]
+
+    def save_session(self):
+        if not self.driver:
+            return
+        self._session_cookies = self._browser_cookies()
+        if self.session_store.enabled:
+            self.session_store.save(self._session_cookies)
+
+    @traced()
+    def restore_session(self) -> bool:
+        """Load saved cookies into the browser if one request shows they still work."""
+        cookies = self.session_store.load()
+        if not cookies:
+            return False
+        if not session_is_valid(requests_session(cookies)):
+            print("[SESSION] Saved session has expired, logging in again")
+            self.session_store.clear()
+            return False
+
+        if not self._inject_cookies(cookies):
+            return False
+        print("[SESSION] Restored saved session, skipping CAS login")
+        self._session_cookies = cookies
+        self.logged_in = True
+        self.session_restored = True
+        return True
+
+    def _inject_cookies(self, cookies) -> bool:
+        by_host = {}
+        for cookie in cookies:
+            by_host.setdefault((cookie.get("domain") or "").lstrip("."), []).append(cookie)
+        try:
+            for host, host_cookies in by_host.items():
+                if not host:
+                    continue
+                # Cookies can only be added for the domain currently loaded
+                self._load(f"https://{host}/robots.txt")
+                for cookie in host_cookies:
+                    try:
+                        self.driver.add_cookie(cookie)
+                    except Exception as e:
+                        print(f"[SESSION] Skipping cookie {cookie.get('name')}: {e}")
+        except WebDriverException as e:
+            print(f"[SESSION] Could not restore session into the browser: {e}")
+            return False
+        return True
+
+    def release_driver(self):
+        """Quit the browser but keep the session cookies so it can be resumed."""
+        if not self.driver:
+            return
+        try:
+            self._session_cookies = self._browser_cookies()
+        except Exception:
+            pass
+        if self.driver_pool:
+            self.driver_pool.discard(self.driver)
+        else:
+            quit_driver(self.driver)
+        self.driver = None
+        self.wait = None
+        self._snapshot = None
+
+    @property
+    def session_cookies(self) -> list:
+        return list(self._session_cookies or [])
+
+    @traced()
+    def resume_session(self) -> bool:
+        """Start a browser again after release_driver, logging in only if the session died."""
+        if not self.driver:
+            self.init_driver()
+        cookies = self._session_cookies
+        if cookies and session_is_valid(requests_session(cookies)) and self._inject_cookies(cookies):
+            self.logged_in = True
+            return True
+        return self.login()
+
+    def start_keepalive(self, on_expired=None):
+        """Keep the logged-in session warm until the enrollment window opens."""
+        self.stop_keepalive()
+        if not self.driver:
+            return
+        self._keepalive = SessionKeepalive(self._browser_cookies(), store=self.session_store, on_expired=on_expired)
+        self._keepalive.start()
+
+    def stop_keepalive(self):
+        if self._keepalive:
+            self._keepalive.stop()
+            self._keepalive = None
+
+    @traced()
+    def refresh_session(self) -> bool:
+        """Make sure the session is alive right now, logging in again if it is not."""
+        alive = self._keepalive.ping() if self._keepalive else session_is_valid(requests_session(self._browser_cookies()))
+        if alive:
+            return True
+        print("[SESSION] Session lost, logging in again")
+        self.logged_in = False
+        if not self._login_with_form():
+            return False
+        self.save_session()
+        if self._keepalive:
+            self.start_keepalive(self._keepalive.on_expired)
+        return True
+
+    @traced()
     def login(self, max_retries=5) -> bool:
         if not self.driver:
             self.init_driver()
-        
+
+        try:
+            self.ensure_single_window()
+            if self.restore_session():
+                return True
+        except Exception as e:
+            print(f"[SESSION] Session restore failed: {e}")
+
+        if not self._login_with_form(max_retries):
+            return False
+        self.save_session()
+        return True
+
+    @traced()
+    def _login_with_form(self, max_retries=5) -> bool:
         for attempt in range(max_retries):
             try:
                 # Check if driver is still valid
@@ -227,8 +304,8 @@ class FenixBot:
 
                 self.ensure_single_window()
                 
-                self.driver.get(self.base_url)
-                time.sleep(2)
+                self._load(self.base_url)
+                self._pause(2, "login page")
                 
                 username_field = self.wait.until(
                     EC.presence_of_element_located((By.ID, "username"))
@@ -343,14 +420,15 @@ class FenixBot:
         
         return False
 
+    @traced()
     def check_logged_in(self, url: str = None) -> bool:
         if not self.driver:
             return False
         try:
             self.ensure_single_window()
             target = url or f"{self.base_url}/messaging/news/cms-news"
-            self.driver.get(target)
-            time.sleep(2)
+            self._load(target)
+            self._pause(2, "check login")
 
             current_url = (self.driver.current_url or "").lower()
             page_source = (self.driver.page_source or "").lower()
@@ -379,20 +457,22 @@ class FenixBot:
         except Exception:
             return False
     
+    @traced()
     def navigate_to_enrollments(self, max_retries=5) -> bool:
         for attempt in range(max_retries):
             try:
+                self.ensure_driver()
                 self.ensure_single_window()
                 # First navigate to the enrollment landing page
-                self.driver.get(f"{self.base_url}/student/enroll/shift-enrollment")
-                time.sleep(2)
+                self._load(f"{self.base_url}/student/enroll/shift-enrollment")
+                self._pause(2, "enrollment landing")
 
                 self._save_page("shift_enrollment_landing")
                 self._save_requests("shift_enrollment_landing")
 
                 # Click the Continue button to proceed to enrollment manager
                 if self._submit_continue_if_present():
-                    time.sleep(2)
+                    self._pause(2, "after continue")
 
                 self._save_page("shift_enrollment_after_continue")
                 self._save_requests("shift_enrollment_after_continue")
@@ -450,7 +530,37 @@ class FenixBot:
         except Exception:
             return None, None
 
-    def _wait_if_enrollment_closed(self) -> bool:
+    def is_enrollment_open(self) -> bool:
+        return not self._is_enrollment_closed()
+
+    def enrollment_opens_at(self):
+        """Opening time shown on the closed enrollment page, or None."""
+        if not self._is_enrollment_closed():
+            return None
+        return self._get_enrollment_window_datetimes()[0]
+
+    @traced()
+    def wait_for_enrollment_window(self, should_cancel=None) -> bool:
+        """Block on the enrollment manager page until the period opens.
+
+        ``should_cancel()`` is polled about once a second while waiting;
+        once it returns True the wait gives up and returns False.
+        """
+        return self._wait_if_enrollment_closed(should_cancel)
+
+    @staticmethod
+    def _sleep_unless_cancelled(seconds: float, should_cancel) -> bool:
+        """Sleep ``seconds`` in short steps; True if ``should_cancel()`` turned true meanwhile."""
+        end = time.monotonic() + seconds
+        while not should_cancel():
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(1.0, remaining))
+        return True
+
+    def _wait_if_enrollment_closed(self, should_cancel=None) -> bool:
+        should_cancel = should_cancel or (lambda: False)
         try:
             if not self._is_enrollment_closed():
                 return True
@@ -466,7 +576,9 @@ class FenixBot:
             # If start is in the future, wait until the start time
             if start_dt and datetime.now() < start_dt:
                 while datetime.now() < start_dt:
-                    time.sleep(min(30, max(1, int((start_dt - datetime.now()).total_seconds()))))
+                    if self._sleep_unless_cancelled(
+                            min(30, max(1, int((start_dt - datetime.now()).total_seconds()))), should_cancel):
+                        return False
 
             # After the start time (or if start time already passed), keep checking for opening
             if start_dt:
@@ -474,10 +586,12 @@ class FenixBot:
                 deadline = datetime.now() + timedelta(seconds=max_wait_seconds)
                 while datetime.now() < deadline:
                     self.driver.refresh()
-                    time.sleep(2)
+                    if self._sleep_unless_cancelled(2, should_cancel):
+                        return False
                     if not self._is_enrollment_closed():
                         return True
-                    time.sleep(30)
+                    if self._sleep_unless_cancelled(30, should_cancel):
+                        return False
                 return False
 
             # Closed but no parsable start time
@@ -504,6 +618,7 @@ class FenixBot:
         except Exception:
             return None
 
+    @traced()
     def _submit_continue_if_present(self) -> bool:
         try:
             # First, try to find "Continue" or "Continuar" link/button
@@ -513,7 +628,7 @@ class FenixBot:
                     "//a[contains(text(), 'Continue') or contains(text(), 'Continuar')]")
                 print(f"[BOT] Found Continue link, clicking...")
                 continue_link.click()
-                time.sleep(2)
+                self._pause(2, "continue link")
                 return True
             except:
                 pass
@@ -533,103 +648,43 @@ class FenixBot:
             print(f"[BOT] No continue button/link found: {e}")
             return False
     
+    def _extract_course_links(self) -> dict:
+        """Describe all links/course headers of the current page in one round trip."""
+        raw = self.driver.execute_script(EXTRACT_COURSE_LINKS_JS)
+        return json.loads(raw) if raw else {}
+
+    def _wait_for_navigation(self, previous_key, timeout: float = PAGE_LOAD_TIMEOUT) -> bool:
+        """Wait until a new document has replaced ``previous_key`` and finished loading."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            key = self._navigation_key()
+            if key and key != previous_key:
+                try:
+                    if self.driver.execute_script("return document.readyState") != "loading":
+                        return True
+                except Exception:
+                    pass
+            time.sleep(0.1)
+        return False
+
+    @traced()
     def navigate_to_course_enrollment(self, course_name: str, max_retries=3) -> bool:
         """Navigate to the specific course's enrollment page from the main enrollment page."""
         for attempt in range(max_retries):
             try:
                 print(f"[BOT] Searching for course: {course_name}")
 
-                # Look for course name in the page
-                page_source = self.driver.page_source.lower()
-                course_lower = course_name.lower()
-
-                # Primary path: on the enrollment manager the "Book" links have the
-                # generic text "Book" (href=proceedToShiftEnrolment) and the course
-                # name lives in a sibling cell of the SAME table row. Locate the row
-                # by the course name, then click the Book link inside that row.
-                normalized_course = self._normalize_text(course_name)
-                cells = self.driver.find_elements(By.XPATH, "//td | //th")
-                for cell in cells:
-                    try:
-                        cell_text = cell.text or ""
-                        if not cell_text.strip():
-                            continue
-                        if course_lower in cell_text.lower() or normalized_course in self._normalize_text(cell_text):
-                            row = cell.find_element(By.XPATH, "./ancestor::tr[1]")
-                            book_links = row.find_elements(
-                                By.XPATH, ".//a[contains(@href, 'proceedToShiftEnrolment')]"
-                            )
-                            if book_links:
-                                print(f"[BOT] Found Book link for {course_name} in course row")
-                                self.driver.execute_script("arguments[0].scrollIntoView(true);", book_links[0])
-                                time.sleep(0.5)
-                                book_links[0].click()
-                                time.sleep(2)
-                                print(f"[BOT] Navigated to course enrollment page for {course_name}")
-                                return True
-                    except:
-                        continue
+                # One script call returns every link with its row/header context;
+                # matching happens in Python, followed by a single click.
+                link, reason = find_course_link(self._extract_course_links(), course_name)
+                if link:
+                    print(f"[BOT] Found {reason} for {course_name}: {(link.get('text') or '').strip()[:50]}")
+                    previous_key = self._navigation_key()
+                    if self.driver.execute_script(CLICK_LINK_JS, link["i"]):
+                        self._wait_for_navigation(previous_key)
+                        print(f"[BOT] Navigated to course enrollment page for {course_name}")
+                        return True
 
-                # Try to find a link containing the course name
-                # These could be in forms, links, or table cells
-                all_links = self.driver.find_elements(By.TAG_NAME, "a")
-                
-                for link in all_links:
-                    try:
-                        link_text = (link.text or "").lower()
-                        href = link.get_attribute("href") or ""
-                        
-                        # Check if this link is related to our course
-                        # Match course name or course code
-                        if course_lower in link_text or course_lower in href.lower():
-                            # Also check if it's a navigation link (not just informational)
-                            if "proceedToShiftEnrolment" in href or "executionCourse" in href:
-                                print(f"[BOT] Found course link: {link_text[:50]}")
-                                self.driver.execute_script("arguments[0].scrollIntoView(true);", link)
-                                time.sleep(0.5)
-                                link.click()
-                                time.sleep(2)
-                                print(f"[BOT] Navigated to course enrollment page for {course_name}")
-                                return True
-                        
-                        # Also try matching without accents or special chars
-                        # (e.g., "Producao" matches "Produção")
-                        import unicodedata
-                        def normalize(s):
-                            return ''.join(c for c in unicodedata.normalize('NFD', s) 
-                                         if unicodedata.category(c) != 'Mn').lower()
-                        
-                        if normalize(course_name) in normalize(link_text):
-                            if "proceedToShiftEnrolment" in href or "executionCourse" in href:
-                                print(f"[BOT] Found course link (normalized match): {link_text[:50]}")
-                                self.driver.execute_script("arguments[0].scrollIntoView(true);", link)
-                                time.sleep(0.5)
-                                link.click()
-                                time.sleep(2)
-                                print(f"[BOT] Navigated to course enrollment page for {course_name}")
-                                return True
-                    except:
-                        continue
-                
-                # If not found, try looking in headers or other text elements
-                headers = self.driver.find_elements(By.XPATH, "//h2 | //h3 | //h4 | //td[@class='disciplina']")
-                for header in headers:
-                    try:
-                        header_text = (header.text or "").lower()
-                        if course_lower in header_text:
-                            # Found the course, now look for nearby enrollment links
-                            parent = header.find_element(By.XPATH, "..//..")
-                            nearby_links = parent.find_elements(By.TAG_NAME, "a")
-                            for link in nearby_links:
-                                href = link.get_attribute("href") or ""
-                                if "proceedToShiftEnrolment" in href or "executionCourse" in href:
-                                    print(f"[BOT] Found nearby enrollment link for {course_name}")
-                                    link.click()
-                                    time.sleep(2)
-                                    return True
-                    except:
-                        continue
-                
                 print(f"[BOT] Course {course_name} not found on this page (attempt {attempt + 1}/{max_retries})")
                 if attempt < max_retries - 1:
                     time.sleep(1)
@@ -644,72 +699,41 @@ class FenixBot:
         
         return False
 
+    def _navigation_key(self):
+        """Identify the currently loaded document; changes on every navigation/reload."""
+        try:
+            return tuple(self.driver.execute_script(
+                "return [String(performance.timeOrigin), location.href];"
+            ) or ())
+        except Exception:
+            return None
+
+    def _page_snapshot(self) -> PageSnapshot:
+        """Return the parsed snapshot of the current page, parsing it at most once per navigation."""
+        nav_key = self._navigation_key()
+        if self._snapshot is None or nav_key is None or self._snapshot.nav_key != nav_key:
+            with self.tracer.span("parse_page"):
+                self._snapshot = PageSnapshot(
+                    self.driver.page_source or "",
+                    self.base_url,
+                    nav_key=nav_key,
+                    url=self.driver.current_url or "",
+                )
+        return self._snapshot
+
     def _extract_shift_enrollment_urls(self, shift_name: str = "", shift_type: str = "") -> list:
         """Extract all enrollStudentInShifts URLs from current page and match by shift name/type."""
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            
-            enrollment_links = []
-            
-            # Find all links with enrollStudentInShifts
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '')
-                if 'enrollStudentInShifts' in href:
-                    # Get the parent context to extract shift info
-                    parent_text = ""
-                    parent = link.parent
-                    for _ in range(5):
-                        if parent:
-                            parent_text += " " + parent.get_text(strip=True)
-                            parent = parent.parent
-                        else:
-                            break
-                    
-                    parent_text = parent_text.lower()
-                    
-                    # Try to extract shiftId from URL for better matching
-                    shift_id_match = re.search(r'shiftId=(\d+)', href)
-                    shift_id = shift_id_match.group(1) if shift_id_match else None
-                    
-                    enrollment_links.append({
-                        'url': href if href.startswith('http') else f"{self.base_url}{href}",
-                        'shiftId': shift_id,
-                        'context': parent_text,
-                        'link_text': link.get_text(strip=True).lower()
-                    })
-            
+            enrollment_links = self._page_snapshot().enrollment_links()
             print(f"[BOT] Found {len(enrollment_links)} enrollment URLs on page")
-            
-            # Filter by shift name or type
-            if shift_name:
-                # Try different variations of the shift name
-                search_names = [
-                    shift_name.lower(),
-                    shift_name.lower().replace(" ", ""),
-                    shift_name.split("(")[0].strip().lower(),
-                ]
-                
-                matched = []
-                for link_info in enrollment_links:
-                    context = link_info['context'] + " " + link_info['link_text']
-                    if any(name in context for name in search_names):
-                        matched.append(link_info)
-                
-                if matched:
-                    print(f"[BOT] Matched {len(matched)} URLs for shift '{shift_name}'")
-                    return matched
-            
-            if shift_type:
-                shift_type_lower = shift_type.lower()
-                matched = [link for link in enrollment_links 
-                          if shift_type_lower in link['context'] or shift_type_lower in link['link_text']]
-                if matched:
-                    print(f"[BOT] Matched {len(matched)} URLs for type '{shift_type}'")
-                    return matched
-            
+
+            matched = self._page_snapshot().find_shift_links(shift_name, shift_type, links=enrollment_links)
+            if matched:
+                print(f"[BOT] Matched {len(matched)} URLs for shift '{shift_name or shift_type}'")
+                return matched
+
             return enrollment_links
-            
+
         except Exception as e:
             print(f"[BOT] Error extracting enrollment URLs: {e}")
             return []
@@ -717,229 +741,204 @@ class FenixBot:
     def _extract_common_enrollment_params(self):
         """Extract common enrollment parameters that are the same for all shifts."""
         try:
-            from bs4 import BeautifulSoup
-            from urllib.parse import urlparse, parse_qs
-            
             if hasattr(self, '_cached_enrollment_params'):
                 return self._cached_enrollment_params
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            
-            # Find any enrollment or shift management link
-            sample_link = soup.find('a', href=lambda x: x and ('enrollStudentInShifts' in x or 'shiftId=' in x or 'removeStudentFromShifts' in x))
-            if not sample_link:
+
+            common_params = self._page_snapshot().common_params
+            if not common_params:
                 print(f"[BOT] No enrollment link found to extract common parameters")
                 return None
-            
-            sample_url = sample_link.get('href')
-            if not sample_url.startswith('http'):
-                sample_url = f"{self.base_url}{sample_url}"
-            
-            parsed = urlparse(sample_url)
-            params = parse_qs(parsed.query)
-            
-            common_params = {
-                'registrationOID': params.get('registrationOID', [None])[0],
-                'executionSemesterID': params.get('executionSemesterID', [None])[0],
-            }
-            
+
             if not common_params['registrationOID'] or not common_params['executionSemesterID']:
                 print(f"[BOT] Could not extract required common parameters")
                 return None
-            
+
             print(f"[BOT] Extracted common parameters: {common_params}")
             self._cached_enrollment_params = common_params
             return common_params
-            
+
         except Exception as e:
             print(f"[BOT] Error extracting common enrollment params: {e}")
             return None
 
+    def _build_enrollment_url(self, common_params: dict, params: dict) -> str:
+        return (f"{self.base_url}/student/enrollStudentInShifts.do?"
+                f"registrationOID={common_params['registrationOID']}&"
+                f"shiftId={params.get('shiftId')}&"
+                f"classId={params.get('classId') or ''}&"
+                f"executionCourseID={params.get('executionCourseID') or ''}&"
+                f"executionSemesterID={common_params['executionSemesterID']}&"
+                f"weekStart=null&weekEnd=null&"
+                f"_request_checksum_={params.get('_request_checksum_')}")
+
+    @traced()
     def _try_construct_enrollment_url(self, course_name: str, shift_name: str = "", shift_type: str = "") -> str:
         """Try to construct an enrollment URL by finding the shift link and extracting its parameters."""
         try:
-            from bs4 import BeautifulSoup
-            from urllib.parse import urlparse, parse_qs
-            
             # Get common parameters (cached)
             common_params = self._extract_common_enrollment_params()
             if not common_params:
                 return None
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            
+
             # Find the specific shift link by matching shift name
             if shift_name:
                 print(f"[BOT] Searching for shift {shift_name} in page...")
-                
-                for link in soup.find_all('a', href=lambda x: x and ('shiftId=' in x or 'enrollStudentInShifts' in x)):
-                    link_text = link.get_text(strip=True).lower()
-                    parent_text = ""
-                    parent = link.parent
-                    for _ in range(5):
-                        if parent:
-                            parent_text += " " + parent.get_text(strip=True).lower()
-                            parent = parent.parent
-                    
-                    # Check if this link is for our shift
-                    search_names = [
-                        shift_name.lower(),
-                        shift_name.lower().replace(" ", ""),
-                        shift_name.split("(")[0].strip().lower(),
-                    ]
-                    
-                    full_context = (link_text + " " + parent_text).lower()
-                    if any(name in full_context for name in search_names):
-                        href = link.get('href')
-                        if not href.startswith('http'):
-                            href = f"{self.base_url}{href}"
-                        
-                        parsed = urlparse(href)
-                        params = parse_qs(parsed.query)
-                        
-                        shift_id = params.get('shiftId', [None])[0]
-                        class_id = params.get('classId', [None])[0]
-                        execution_course_id = params.get('executionCourseID', [None])[0]
-                        checksum = params.get('_request_checksum_', [None])[0]
-                        
-                        if shift_id and checksum:
-                            # Construct the enrollment URL with all parameters
-                            url = (f"{self.base_url}/student/enrollStudentInShifts.do?"
-                                  f"registrationOID={common_params['registrationOID']}&"
-                                  f"shiftId={shift_id}&"
-                                  f"classId={class_id or ''}&"
-                                  f"executionCourseID={execution_course_id or ''}&"
-                                  f"executionSemesterID={common_params['executionSemesterID']}&"
-                                  f"weekStart=null&weekEnd=null&"
-                                  f"_request_checksum_={checksum}")
-                            
-                            print(f"[BOT] Constructed enrollment URL for {shift_name}: shiftId={shift_id}")
-                            return url
-            
+
+                for entry in self._page_snapshot().find_shift_links(shift_name):
+                    params = entry["params"]
+                    if params.get("shiftId") and params.get("_request_checksum_"):
+                        url = self._build_enrollment_url(common_params, params)
+                        print(f"[BOT] Constructed enrollment URL for {shift_name}: shiftId={params['shiftId']}")
+                        return url
+
             return None
-            
+
         except Exception as e:
             print(f"[BOT] Error constructing enrollment URL: {e}")
             return None
 
-    def find_and_enroll_shift(self, course_name: str, shift_type: str, shift_name: str = "", max_retries=5,
-                              retry_window_seconds: int = 900, retry_interval_seconds: int = 20, dry_run: bool = False) -> bool:
-        deadline = datetime.now() + timedelta(seconds=max(0, retry_window_seconds))
-        last_enroll_url = ""
-        enrolled_successfully = False
-
+    def _shift_type_display(self, shift_type: str) -> str:
+        """Normalize shift type for display matching (T, L, TP, etc.)"""
+        shift_type_display = shift_type.replace("TEORICO_PRATICA", "TP").replace("TEORICA", "T").replace("LABORATORIAL", "L")
+        if len(shift_type) > 2:
+            shift_type_display = shift_type_display.upper()
+        return shift_type_display
+
+    @traced()
+    def get_enrollment_state(self) -> EnrollmentState:
+        """Shifts currently booked, parsed once from the current page."""
+        return self._page_snapshot().enrollment_state()
+
+    def _is_shift_already_enrolled(self, shift_name: str, shift_type: str) -> bool:
+        """Check if this specific shift is already booked.
+
+        Fenix marks a booked shift with a cancel control
+        ("Cancel Booking" -> unEnroleStudentFromShift) rendered in the
+        same row/block as the shift code. We only trust that control.
+
+        We deliberately do NOT fall back to a page-wide scan for
+        "reserved"/"enrolled" text: those words are always present as
+        column labels on the enrollment manager page, so combined with a
+        loose substring match on the shift code they produce false
+        positives that make the bot skip shifts it never actually booked
+        and report false success.
+        """
         try:
-            # Normalize shift type for display matching (T, L, TP, etc.)
-            shift_type_display = shift_type.replace("TEORICO_PRATICA", "TP").replace("TEORICA", "T").replace("LABORATORIAL", "L")
-            if len(shift_type) > 2:
-                shift_type_display = shift_type_display.upper()
-
-            def is_shift_already_enrolled() -> bool:
-                """Check if this specific shift is already booked.
-
-                Fenix marks a booked shift with a cancel control
-                ("Cancel Booking" -> unEnroleStudentFromShift) rendered in the
-                same row/block as the shift code. We only trust that control.
-
-                We deliberately do NOT fall back to a page-wide scan for
-                "reserved"/"enrolled" text: those words are always present as
-                column labels on the enrollment manager page, so combined with a
-                loose substring match on the shift code they produce false
-                positives that make the bot skip shifts it never actually booked
-                and report false success.
-                """
-                try:
-                    cancel_links = self.driver.find_elements(
-                        By.XPATH,
-                        "//a[contains(@href, 'unEnroleStudentFromShift') or "
-                        "contains(@href, 'removeStudentFromShifts') or "
-                        "contains(text(), 'Cancel') or contains(text(), 'Cancelar')]"
-                    )
-                    for cancel_link in cancel_links:
-                        try:
-                            block = ""
-                            node = cancel_link
-                            for _ in range(4):
-                                node = node.find_element(By.XPATH, "..")
-                                block = (block + " " + (node.text or "")).lower()
-
-                            if shift_name:
-                                if shift_name.lower() in block:
-                                    print(f"[BOT] Shift {shift_name} is already booked (cancel link found). Skipping.")
-                                    return True
-                            elif shift_type_display.lower() in block:
-                                print(f"[BOT] Shift with type {shift_type} is already booked. Skipping.")
-                                return True
-                        except:
-                            pass
-                except:
-                    pass
-                return False
+            if self.get_enrollment_state().find(shift_name, self._shift_type_display(shift_type)):
+                if shift_name:
+                    print(f"[BOT] Shift {shift_name} is already booked (cancel link found). Skipping.")
+                else:
+                    print(f"[BOT] Shift with type {shift_type} is already booked. Skipping.")
+                return True
+        except Exception:
+            pass
+        return False
 
-            def try_enroll_from_urls(enrollment_urls) -> bool:
-                """Try to enroll by directly navigating to enrollment URLs"""
-                nonlocal last_enroll_url
+    @traced()
+    def _enroll_via_urls(self, enrollment_urls, label: str, dry_run: bool = False) -> EnrollmentOutcome:
+        """Try to enroll by directly navigating to enrollment URLs"""
+        outcome = EnrollmentOutcome.UNKNOWN
+        for url_info in enrollment_urls:
+            try:
+                url = url_info['url']
 
-                for url_info in enrollment_urls:
-                    try:
-                        url = url_info['url']
-                        last_enroll_url = url
+                print(f"[BOT] Found enrollment URL for {label}")
 
-                        print(f"[BOT] Found enrollment URL for {shift_name or shift_type}")
+                if dry_run:
+                    print(f"[DRY-RUN] Would navigate to: {url[:80]}...")
+                    print(f"[DRY-RUN] Would enroll in: {label}")
+                    return EnrollmentOutcome.ENROLLED
 
-                        if dry_run:
-                            print(f"[DRY-RUN] Would navigate to: {url[:80]}...")
-                            print(f"[DRY-RUN] Would enroll in: {shift_name or shift_type}")
-                            return True
+                print(f"[BOT] Navigating to enrollment URL for {label}")
+                self._load(url)
 
-                        print(f"[BOT] Navigating to enrollment URL for {shift_name or shift_type}")
-                        self.driver.get(url)
-                        time.sleep(2)
+                self._save_page("enroll_after_navigation")
+                self._save_requests("enroll_after_navigation")
 
-                        self._save_page("enroll_after_navigation")
-                        self._save_requests("enroll_after_navigation")
+                with self.tracer.span("confirm") as info:
+                    try:
+                        confirm = self.driver.find_element(By.XPATH, "//button[contains(text(), 'Confirmar')] | //input[@value='Confirmar']")
+                        print(f"[BOT] Clicking confirmation button")
+                        previous_key = self._navigation_key()
+                        confirm.click()
+                        self._wait_for_navigation(previous_key)
+                        info["clicked"] = True
+                    except:
+                        info["clicked"] = False
+
+                with self.tracer.span("classify") as info:
+                    outcome = classify(self._page_snapshot())
+                    info["outcome"] = outcome.value
+                print(f"[BOT] Enrollment outcome for {label}: {outcome.value}")
+                if is_success(outcome) or not is_retryable(outcome):
+                    return outcome
+            except Exception as e:
+                print(f"[BOT] Error while trying enrollment URL: {e}")
+                continue
 
-                        page_source = self.driver.page_source.lower()
+        return outcome
 
-                        try:
-                            confirm = self.driver.find_element(By.XPATH, "//button[contains(text(), 'Confirmar')] | //input[@value='Confirmar']")
-                            print(f"[BOT] Clicking confirmation button")
-                            confirm.click()
-                            time.sleep(2)
-                        except:
-                            pass
+    @traced()
+    def _resolve_shift_urls(self, shift_name: str, shift_type: str, course_page: bool = False) -> list:
+        """Enrollment URLs for one shift from the current page, without navigating.
 
-                        page_source = self.driver.page_source.lower()
-                        if any(kw in page_source for kw in ["sucesso", "success", "enrolled", "inscrito", "confirmada"]):
-                            print(f"[BOT] Successfully enrolled in {shift_name or shift_type}")
-                            return True
+        The enrollment manager lists every course's shifts, so there only a
+        shift name is trusted; matching by type is left to the course page.
+        """
+        shift_type_display = self._shift_type_display(shift_type) if course_page else ""
+        if not shift_name and not shift_type_display:
+            return []
+        constructed_url = self._try_construct_enrollment_url("", shift_name, shift_type_display)
+        if constructed_url:
+            return [{'url': constructed_url, 'shiftId': None, 'context': '', 'link_text': ''}]
+        return self._page_snapshot().find_shift_links(
+            shift_name, shift_type_display, links=self._page_snapshot().enrollment_links()
+        )
+
+    @traced()
+    def _return_to_enrollment_manager(self):
+        """Navigate back to main enrollment page for next course"""
+        try:
+            print(f"[BOT] Navigating back to main enrollment page...")
+            self._load(f"{self.base_url}/student/enroll/shift-enrollment")
+            self._pause(2, "enrollment landing")
+            # Click continue again
+            self._submit_continue_if_present()
+            self._pause(2, "after continue")
+        except Exception as e:
+            print(f"[BOT] Error navigating back: {e}")
 
-                        if any(kw in page_source for kw in ["erro", "error", "lotada", "full", "capacity"]):
-                            print(f"[BOT] Enrollment failed (shift may be full or unavailable)")
-                    except Exception as e:
-                        print(f"[BOT] Error while trying enrollment URL: {e}")
-                        continue
+    @traced()
+    def find_and_enroll_shift(self, course_name: str, shift_type: str, shift_name: str = "", max_retries=5,
+                              retry_window_seconds: int = 900, retry_interval_seconds: int = 20, dry_run: bool = False) -> bool:
+        deadline = datetime.now() + timedelta(seconds=max(0, retry_window_seconds))
+        enrolled_successfully = False
+        label = shift_name or shift_type
 
-                return False
+        try:
+            shift_type_display = self._shift_type_display(shift_type)
 
             for attempt in range(max_retries):
                 try:
                     self._save_page("enroll_search_start")
                     self._save_requests("enroll_search_start")
 
-                    if is_shift_already_enrolled():
+                    if self._is_shift_already_enrolled(shift_name, shift_type):
                         return True
 
-                    print(f"[BOT] Attempting to construct enrollment URL for {shift_name or shift_type}...")
+                    print(f"[BOT] Attempting to construct enrollment URL for {label}...")
                     constructed_url = self._try_construct_enrollment_url(course_name, shift_name, shift_type_display)
 
                     if constructed_url:
                         print(f"[BOT] Successfully constructed enrollment URL, trying direct enrollment...")
-                        if try_enroll_from_urls([{'url': constructed_url, 'shiftId': None, 'context': '', 'link_text': ''}]):
+                        outcome = self._enroll_via_urls([{'url': constructed_url, 'shiftId': None, 'context': '', 'link_text': ''}], label, dry_run)
+                        if is_success(outcome):
                             enrolled_successfully = True
                             break
-                        else:
-                            print(f"[BOT] Direct enrollment with constructed URL failed, falling back to search...")
+                        if outcome == EnrollmentOutcome.SESSION_EXPIRED:
+                            print(f"[BOT] Session expired, aborting enrollment of {label}")
+                            return False
+                        print(f"[BOT] Direct enrollment with constructed URL failed, falling back to search...")
                     else:
                         print(f"[BOT] Could not construct URL from current page...")
 
@@ -953,14 +952,14 @@ class FenixBot:
                     constructed_url = self._try_construct_enrollment_url(course_name, shift_name, shift_type_display)
                     if constructed_url:
                         print(f"[BOT] Constructed URL from course page, enrolling...")
-                        if try_enroll_from_urls([{'url': constructed_url, 'shiftId': None, 'context': '', 'link_text': ''}]):
+                        if is_success(self._enroll_via_urls([{'url': constructed_url, 'shiftId': None, 'context': '', 'link_text': ''}], label, dry_run)):
                             enrolled_successfully = True
                             break
 
                     enrollment_urls = self._extract_shift_enrollment_urls(shift_name, shift_type_display)
 
                     if not enrollment_urls:
-                        print(f"[BOT] No enrollment URLs found for {shift_name or shift_type}")
+                        print(f"[BOT] No enrollment URLs found for {label}")
                         if attempt < max_retries - 1:
                             time.sleep(2)
                             self.driver.refresh()
@@ -969,28 +968,23 @@ class FenixBot:
                         print(f"[BOT] Failed to find enrollment URL after {max_retries} attempts")
                         return False
 
-                    if try_enroll_from_urls(enrollment_urls):
+                    outcome = self._enroll_via_urls(enrollment_urls, label, dry_run)
+                    if is_success(outcome):
                         enrolled_successfully = True
                         break
 
-                    while datetime.now() < deadline:
+                    while is_retryable(outcome) and datetime.now() < deadline:
                         time.sleep(retry_interval_seconds)
-                        try:
-                            if last_enroll_url:
-                                print(f"[BOT] Retrying enrollment URL...")
-                                self.driver.get(last_enroll_url)
-                            else:
-                                self.driver.refresh()
-                            time.sleep(2)
-
-                            page_source = self.driver.page_source.lower()
-                            if any(kw in page_source for kw in ["sucesso", "success", "enrolled", "inscrito", "confirmada"]):
-                                print(f"[BOT] Successfully enrolled in {shift_name or shift_type}")
-                                enrolled_successfully = True
-                                break
-                        except Exception:
+                        print(f"[BOT] Retrying enrollment URL ({outcome.value})...")
+                        outcome = self._enroll_via_urls(enrollment_urls[-1:], label, dry_run)
+                        if is_success(outcome):
+                            enrolled_successfully = True
                             break
 
+                    if outcome == EnrollmentOutcome.SESSION_EXPIRED:
+                        print(f"[BOT] Session expired, aborting enrollment of {label}")
+                        return False
+
                     if enrolled_successfully:
                         break
 
@@ -1009,30 +1003,210 @@ class FenixBot:
                     continue
         
         finally:
-            # Always navigate back to main enrollment page for next course
-            try:
-                print(f"[BOT] Navigating back to main enrollment page...")
-                self.driver.get(f"{self.base_url}/student/enroll/shift-enrollment")
-                time.sleep(2)
-                # Click continue again
-                self._submit_continue_if_present()
-                time.sleep(2)
-            except Exception as e:
-                print(f"[BOT] Error navigating back: {e}")
+            self._return_to_enrollment_manager()
         
         if not enrolled_successfully:
-            print(f"[BOT] Failed to enroll in {shift_name or shift_type} after {max_retries} attempts")
+            print(f"[BOT] Failed to enroll in {label} after {max_retries} attempts")
         
         return enrolled_successfully
+
+    @traced()
+    def enroll_course_shifts(self, course_name: str, shifts, retry_window_seconds: int = 60,
+                             retry_interval_seconds: int = 10, dry_run: bool = False,
+                             alternates: dict = None) -> dict:
+        """Enroll in every queued shift of one course from a single course page visit.
+
+        ``shifts`` is a list of ``(shift_type, shift_name)`` pairs and
+        ``alternates`` optionally maps a pair to ranked fallback shift names
+        of the same type, tried in order when the preferred shift is full.
+        All enrollment URLs, fallbacks included, are resolved from the course
+        page before the first request navigates away, so the course page is
+        visited once and the bot only returns to the enrollment manager when
+        done with the course. ``retry_window_seconds=0`` makes a single pass,
+        leaving retries to the caller.
+
+        Returns ``{(shift_type, shift_name): EnrollmentOutcome}`` for the
+        queued pairs. A pair counts as enrolled when any shift of its chain
+        was booked; the booked fallback is reported under its own
+        ``(shift_type, alternate_name)`` key.
+        """
+        alternates = alternates or {}
+        outcomes = {(t, n): EnrollmentOutcome.UNKNOWN for t, n in shifts}
+        chains = {key: [key[1]] + [a for a in alternates.get(key) or [] if a != key[1]] for key in outcomes}
+        deadline = datetime.now() + timedelta(seconds=max(0, retry_window_seconds))
+        navigated = False
+
+        try:
+            # A browser that crashed since the last course is replaced from the
+            # pool and put back on the enrollment manager
+            if not driver_alive(self.driver):
+                if not (self.ensure_driver() and self.navigate_to_enrollments()):
+                    return outcomes
+
+            self._save_page("enroll_search_start")
+            self._save_requests("enroll_search_start")
+
+            pending = []
+            for key, chain in chains.items():
+                booked = next((name for name in chain if self._is_shift_already_enrolled(name, key[0])), None)
+                if booked is None:
+                    pending.append(key)
+                    continue
+                outcomes[key] = EnrollmentOutcome.ALREADY_ENROLLED
+                if booked != key[1]:
+                    outcomes[(key[0], booked)] = EnrollmentOutcome.ALREADY_ENROLLED
+            if not pending:
+                return outcomes
+
+            # The enrollment manager may already carry the shift links
+            wanted = [(key[0], name) for key in pending for name in chains[key]]
+            urls = {}
+            for shift in wanted:
+                found = self._resolve_shift_urls(shift[1], shift[0])
+                if found:
+                    urls[shift] = found
+
+            if any(key not in urls for key in pending):
+                print(f"[BOT] Navigating to course page to find shift links...")
+                navigated = True
+                if self.navigate_to_course_enrollment(course_name):
+                    for shift in wanted:
+                        if shift not in urls:
+                            found = self._resolve_shift_urls(shift[1], shift[0], course_page=True)
+                            if found:
+                                urls[shift] = found
+                else:
+                    print(f"[BOT] Failed to navigate to course enrollment page for {course_name}")
+
+            def attempt_chain(key, retry=False):
+                # Fall through the ranked chain with the URLs resolved above;
+                # only a full shift moves on to the next fallback
+                outcome = EnrollmentOutcome.UNKNOWN
+                for name in chains[key]:
+                    shift = (key[0], name)
+                    if shift not in urls:
+                        print(f"[BOT] No enrollment URLs found for {name or key[0]}")
+                        continue
+                    if name != key[1]:
+                        print(f"[BOT] Trying fallback {name} for {key[1] or key[0]}...")
+                    outcome = self._enroll_via_urls(urls[shift][-1:] if retry else urls[shift], name or key[0], dry_run)
+                    if name != key[1]:
+                        outcomes[shift] = outcome
+                    if outcome != EnrollmentOutcome.FULL:
+                        break
+                return outcome
+
+            attempted = []
+            for key in pending:
+                if not any((key[0], name) in urls for name in chains[key]):
+                    print(f"[BOT] No enrollment URLs found for {key[1] or key[0]}")
+                    continue
+                navigated = navigated or not dry_run
+                outcomes[key] = attempt_chain(key)
+                attempted.append(key)
+
+            # Keep retrying the remaining shifts of this course until the window
+            # closes; an expired session makes every further request pointless
+            retry = [key for key in attempted if not is_success(outcomes[key]) and is_retryable(outcomes[key])]
+            while retry and datetime.now() < deadline:
+                if EnrollmentOutcome.SESSION_EXPIRED in outcomes.values():
+                    print(f"[BOT] Session expired, stopping retries for {course_name}")
+                    break
+                time.sleep(retry_interval_seconds)
+                for key in list(retry):
+                    print(f"[BOT] Retrying enrollment URL for {key[1] or key[0]} ({outcomes[key].value})...")
+                    outcomes[key] = attempt_chain(key, retry=True)
+                    if is_success(outcomes[key]) or not is_retryable(outcomes[key]):
+                        retry.remove(key)
+
+        except Exception as e:
+            print(f"[BOT] Error enrolling shifts of {course_name}: {e}")
+        finally:
+            if navigated:
+                self._return_to_enrollment_manager()
+
+        return outcomes
     
+    @traced()
+    def prepare_http_jobs(self, shifts, max_workers: int = PARALLEL_ENROLL_WORKERS):
+        """Resolve enrollment URLs for ``shifts`` so they can be requested over HTTP.
+
+        ``shifts`` is a list of ``(course_name, shift_type, shift_name)``.
+        Must be called from the enrollment manager page. Course pages are
+        fetched concurrently through a session sharing the browser cookies.
+        Returns ``(enroller, {key: (url, label)})``; shifts whose URL could
+        not be resolved are left out.
+        """
+        enroller = ParallelEnroller(session_from_driver(self.driver), self.base_url, max_workers, tracer=self.tracer)
+        manager = self._page_snapshot()
+        common_params = self._extract_common_enrollment_params()
+
+        # Course pages to fetch, taken from the manager page in one script call
+        course_links = self._extract_course_links()
+        course_urls = {}
+        for course_name, _t, _n in shifts:
+            if course_name in course_urls:
+                continue
+            link, _reason = find_course_link(course_links, course_name)
+            if link and not link["href"].startswith("javascript"):
+                course_urls[course_name] = urljoin(manager.url or self.base_url, link["href"])
+
+        print(f"[BOT] Fetching {len(course_urls)} course pages in parallel...")
+        snapshots = enroller.fetch_snapshots(course_urls)
+
+        jobs = {}
+        for key in shifts:
+            course_name, shift_type, shift_name = key
+            shift_type_display = self._shift_type_display(shift_type)
+            for snapshot in (manager, snapshots.get(course_name)):
+                if snapshot is None:
+                    continue
+                params = common_params or snapshot.common_params
+                if snapshot is manager:
+                    # The manager lists every course's shifts, where a bare type
+                    # such as "T" would match another course: trust names only
+                    matches = snapshot.find_shift_links(shift_name, links=snapshot.enrollment_links()) \
+                        if shift_name else []
+                else:
+                    matches = snapshot.find_shift_links(shift_name, shift_type_display)
+                entry = next((e for e in matches
+                              if e["params"].get("shiftId") and e["params"].get("_request_checksum_")), None)
+                if entry and params and params.get("registrationOID") and params.get("executionSemesterID"):
+                    jobs[key] = (self._build_enrollment_url(params, entry["params"]), shift_name or shift_type)
+                    break
+            if key not in jobs:
+                print(f"[BOT] No enrollment URL resolved for {shift_name or shift_type} ({course_name})")
+        return enroller, jobs
+
+    @traced()
+    def enroll_parallel(self, shifts, max_workers: int = PARALLEL_ENROLL_WORKERS, dry_run: bool = False) -> dict:
+        """Request all queued shifts concurrently over HTTP in this logged-in session.
+
+        ``shifts`` is a list of ``(course_name, shift_type, shift_name)``.
+        Must be called from the enrollment manager page. Every enrollment
+        URL is resolved up front and then all requests are fired at once
+        (bounded by ``max_workers``). Returns
+        ``{(course_name, shift_type, shift_name): enrolled}``; shifts whose
+        URL could not be resolved are reported as not enrolled so the
+        caller can fall back to the browser path.
+        """
+        results = {key: False for key in shifts}
+        try:
+            enroller, jobs = self.prepare_http_jobs(shifts, max_workers)
+
+            if dry_run:
+                for key, (url, label) in jobs.items():
+                    print(f"[DRY-RUN] Would request in parallel: {label} -> {url[:80]}...")
+                    results[key] = True
+                return results
+
+            print(f"[BOT] Requesting {len(jobs)} shifts with up to {enroller.max_workers} parallel workers...")
+            for key, outcome in enroller.enroll_all(jobs).items():
+                results[key] = is_success(outcome)
+        except Exception as e:
+            print(f"[BOT] Error during parallel enrollment: {e}")
+        return results
+
     def _normalize_text(self, text: str) -> str:
         """Normalize text for matching (remove accents, lowercase)"""
-        return ''.join(c for c in unicodedata.normalize('NFD', text) 
-                      if unicodedata.category(c) != 'Mn').lower()
-    
-    def close(self):
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
+        return normalize_text(text)
@@ -0,0 +1,105 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from .config import API_TRANSPORT, DEFAULT_ACADEMIC_TERM, DEFAULT_LANG
+
+# Bumped whenever the snapshot layout changes; older files are refused:
+#   {"version": 1, "term": "2025/2026", "lang": "pt-PT", "created": "...",
+#    "degrees": [...], "courses": {degree_id: [enriched courses]}}
+SNAPSHOT_VERSION = 1
+
+
+def write_snapshot(snapshot: dict, path) -> Path:
+    """Write the snapshot as gzipped compact JSON, replacing ``path`` atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=9) as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+    tmp.replace(path)
+    return path
+
+
+def read_snapshot(path) -> dict:
+    """Load a snapshot written by ``write_snapshot``; raises ValueError if it is not one."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path} is not a catalog snapshot (version {SNAPSHOT_VERSION})")
+    return snapshot
+
+
+def describe(snapshot: dict) -> str:
+    courses = sum(len(c) for c in snapshot["courses"].values())
+    shifts = sum(len(c.get("shifts") or []) for cs in snapshot["courses"].values() for c in cs)
+    return (f"{snapshot['term']} ({snapshot['lang']}, {snapshot['created']}): {len(snapshot['degrees'])} degrees, "
+            f"{courses} courses, {shifts} shifts")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="ist-fenix-auto-enroller catalog",
+        description="Export the degree catalog of a term to a file the GUI can load offline.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="crawl a term's catalog from Fenix into a snapshot (resumable)")
+    export.add_argument("output", help="snapshot file to write (e.g. catalog-2025-2026.json.gz)")
+    export.add_argument("--term", default=DEFAULT_ACADEMIC_TERM, help="academic term, e.g. 2025/2026")
+    export.add_argument("--lang", default=DEFAULT_LANG)
+    export.add_argument("--degree", action="append", default=[], metavar="ID_OR_ACRONYM",
+                        help="only this degree (repeatable; default: every degree of the term)")
+    export.add_argument("--workers", type=int, default=2, help="degrees fetched at once to begin with")
+    export.add_argument("--max-workers", type=int, default=8, help="upper bound as concurrency adapts")
+    export.add_argument("--allow-empty", action="store_true",
+                        help="write the snapshot even if some degrees came back empty")
+    info = sub.add_parser("info", help="summarize a snapshot")
+    info.add_argument("snapshot")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        try:
+            snapshot = read_snapshot(args.snapshot)
+        except Exception as e:
+            print(f"Could not read snapshot: {e}", file=sys.stderr)
+            return 2
+        print(describe(snapshot))
+        for degree in snapshot["degrees"]:
+            courses = snapshot["courses"].get(str(degree.get("id")), [])
+            print(f"  {degree.get('acronym', ''):<12} {len(courses):>4} courses  {degree.get('name', '')}")
+        return 0
+
+    from .api import FenixAPI
+    from .crawler import CatalogCrawler
+
+    # Keep the pool large enough for every concurrent degree
+    api = FenixAPI(lang=args.lang, academic_term=args.term,
+                   transport={"pool_maxsize": max(args.max_workers, API_TRANSPORT["pool_maxsize"])})
+    started = time.monotonic()
+
+    def progress(event, **fields):
+        if event == "start" and fields["resumed"]:
+            print(f"Resuming: {fields['resumed']}/{fields['degrees']} degrees already fetched", flush=True)
+        elif event == "degree":
+            print(f"[{fields['done']}/{fields['total']}] {fields['degree'].get('acronym', '')}: "
+                  f"{fields['courses']} courses ({fields['workers']} workers)", flush=True)
+
+    crawler = CatalogCrawler(api, args.output, args.term, args.degree, workers=args.workers,
+                             max_workers=args.max_workers, allow_empty=args.allow_empty, on_progress=progress)
+    try:
+        snapshot = crawler.run()
+    except KeyboardInterrupt:
+        print(f"Interrupted; run the same command again to resume from {crawler.checkpoint}", file=sys.stderr)
+        return 130
+    if snapshot is None:
+        names = ", ".join(d.get("acronym") or str(d.get("id")) for d in crawler.failed)
+        print(f"No courses for {names}; run again to retry them (or pass --allow-empty)", file=sys.stderr)
+        return 1
+    path = crawler.output
+    print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KiB) in {time.monotonic() - started:.1f}s: "
+          f"{describe(snapshot)}")
+    return 0 if snapshot["degrees"] else 1
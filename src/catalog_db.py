@@ -0,0 +1,317 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+PERIODS = ("P1", "P2", "P3", "P4")
+SEMESTER_PERIODS = {"1": ("P1", "P2"), "2": ("P3", "P4")}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS degrees (
+    id TEXT NOT NULL, lang TEXT NOT NULL, acronym TEXT, name TEXT, data TEXT NOT NULL,
+    PRIMARY KEY (id, lang)
+);
+CREATE TABLE IF NOT EXISTS degree_terms (
+    term TEXT NOT NULL, degree_id TEXT NOT NULL, lang TEXT NOT NULL,
+    PRIMARY KEY (term, lang, degree_id)
+) WITHOUT ROWID;
+-- One row per (degree, term, lang) whose courses are stored, with when they were fetched
+CREATE TABLE IF NOT EXISTS loads (
+    degree_id TEXT NOT NULL, term TEXT NOT NULL, lang TEXT NOT NULL, fetched REAL NOT NULL, source TEXT,
+    PRIMARY KEY (degree_id, term, lang)
+);
+CREATE TABLE IF NOT EXISTS courses (
+    rowid INTEGER PRIMARY KEY,
+    degree_id TEXT NOT NULL, term TEXT NOT NULL, lang TEXT NOT NULL, position INTEGER NOT NULL,
+    id TEXT NOT NULL, acronym TEXT, name TEXT,
+    semester TEXT NOT NULL,          -- '1', '2', or '' when it shows in either semester
+    semester_hint TEXT NOT NULL,
+    has_periods INTEGER NOT NULL,    -- periods known from period_hint or courseLoads
+    any_period INTEGER NOT NULL,     -- courseLoads say it spans the semester
+    search TEXT NOT NULL,            -- lowercased name and acronym/code
+    data TEXT NOT NULL               -- the course without its shifts
+);
+CREATE INDEX IF NOT EXISTS courses_by_degree ON courses (degree_id, term, lang, semester, position);
+CREATE TABLE IF NOT EXISTS course_periods (
+    period TEXT NOT NULL, course INTEGER NOT NULL, PRIMARY KEY (period, course)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS course_periods_by_course ON course_periods (course);
+CREATE TABLE IF NOT EXISTS course_campuses (
+    campus TEXT NOT NULL, course INTEGER NOT NULL, PRIMARY KEY (campus, course)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS course_campuses_by_course ON course_campuses (course);
+CREATE TABLE IF NOT EXISTS shifts (
+    rowid INTEGER PRIMARY KEY, course INTEGER NOT NULL, position INTEGER NOT NULL, name TEXT,
+    data TEXT NOT NULL               -- the shift without its lessons
+);
+CREATE INDEX IF NOT EXISTS shifts_by_course ON shifts (course, position);
+CREATE TABLE IF NOT EXISTS shift_types (
+    type TEXT NOT NULL, shift INTEGER NOT NULL, PRIMARY KEY (type, shift)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS shift_types_by_shift ON shift_types (shift);
+CREATE TABLE IF NOT EXISTS lessons (
+    rowid INTEGER PRIMARY KEY, shift INTEGER NOT NULL, position INTEGER NOT NULL,
+    start TEXT, "end" TEXT, room_id TEXT, campus TEXT, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lessons_by_shift ON lessons (shift, position);
+-- Imports are deduplicated against loads now
+DROP TABLE IF EXISTS snapshots;
+"""
+
+# Substring search on course names; trigram needs SQLite 3.34+, older ones fall back to a scan
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5(search, tokenize='trigram')"
+
+
+def normalize_campus(name: str) -> str:
+    value = (name or "").strip()
+    lower = value.lower()
+    if "alameda" in lower:
+        return "Alameda"
+    if "tagus" in lower:
+        return "Taguspark"
+    return value
+
+
+def course_semester(course: dict) -> str:
+    """'1' or '2' if the course belongs to one semester, '' if it may show in either."""
+    hint = course.get("semester_hint")
+    if hint in SEMESTER_PERIODS:
+        return hint
+    period = course.get("period_hint")
+    for semester, periods in SEMESTER_PERIODS.items():
+        if period in periods:
+            return semester
+    return ""
+
+
+def course_periods(course: dict) -> tuple:
+    """(periods, any_period) as the course selector reads them.
+
+    Periods come from ``period_hint``, or else from the courseLoads text;
+    a load naming a semester makes the course show in every period of it.
+    """
+    raw = str(course.get("period_hint", "") or "").upper()
+    periods = {p for p in PERIODS if p in raw}
+    if periods:
+        return periods, False
+    any_period = False
+    for load in course.get("courseLoads") or []:
+        if not isinstance(load, dict):
+            continue
+        for key in ["executionPeriod", "period", "semester", "academicTerm", "term"]:
+            value = load.get(key)
+            if not isinstance(value, str):
+                continue
+            value = value.upper()
+            periods.update(p for p in PERIODS if p in value)
+            if "SEM" in value or value.startswith("S"):
+                any_period = True
+    return periods, any_period
+
+
+class CatalogDB:
+    """SQLite store of degrees and enriched courses, queried instead of kept in memory.
+
+    Courses are split into courses, shifts and lessons, with the fields the
+    course selector filters on (semester, period, campus, name) indexed.
+    One connection is shared behind a lock, since the GUI writes from its
+    loader threads and reads from the Tk thread.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        try:
+            self._conn = self._open(self.path)
+        except (OSError, sqlite3.Error) as e:
+            # An unwritable data directory only costs the cache across runs
+            print(f"[CATALOG] Could not open {self.path} ({e}), keeping the catalog in memory")
+            self.path = ":memory:"
+            self._conn = self._open(self.path)
+        try:
+            self._conn.execute(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self._conn.commit()
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -- writing
+
+    def store_degrees(self, degrees: list, lang: str):
+        with self._lock, self._conn:
+            for degree in degrees:
+                degree_id = str(degree.get("id") or "")
+                if not degree_id:
+                    continue
+                self._conn.execute("INSERT OR REPLACE INTO degrees VALUES (?, ?, ?, ?, ?)",
+                                   (degree_id, lang, degree.get("acronym", ""), degree.get("name", ""),
+                                    json.dumps(degree, ensure_ascii=False)))
+                self._conn.execute("DELETE FROM degree_terms WHERE degree_id = ? AND lang = ?", (degree_id, lang))
+                self._conn.executemany("INSERT OR IGNORE INTO degree_terms VALUES (?, ?, ?)",
+                                       [(term, degree_id, lang) for term in degree.get("academicTerms") or []])
+
+    def store_courses(self, degree_id: str, term: str, lang: str, courses: list, source: str = "api",
+                      fetched: float = None):
+        """Replace the stored courses of a degree with ``courses`` (enriched, as get_degree_courses returns)."""
+        degree_id = str(degree_id)
+        with self._lock, self._conn:
+            self._delete_courses(degree_id, term, lang)
+            for position, course in enumerate(courses):
+                self._insert_course(degree_id, term, lang, position, course)
+            self._conn.execute("INSERT OR REPLACE INTO loads VALUES (?, ?, ?, ?, ?)",
+                               (degree_id, term, lang, fetched or time.time(), source))
+
+    def import_snapshot(self, snapshot: dict) -> int:
+        """Store a catalog snapshot (catalog.py); returns how many degrees' courses were (re)written.
+
+        A degree is skipped only if its stored courses still are this
+        snapshot's, i.e. ``loads`` has source "snapshot" and the snapshot's
+        creation time; courses fetched online since then are overwritten.
+        """
+        term, lang = snapshot["term"], snapshot["lang"]
+        created = datetime.fromisoformat(snapshot["created"]).timestamp()
+        self.store_degrees(snapshot["degrees"], lang)
+        imported = 0
+        for degree_id, courses in snapshot["courses"].items():
+            if self.loaded(degree_id, term, lang) == (created, "snapshot"):
+                continue
+            self.store_courses(degree_id, term, lang, courses, source="snapshot", fetched=created)
+            imported += 1
+        return imported
+
+    def _delete_courses(self, degree_id: str, term: str, lang: str):
+        rows = [r[0] for r in self._conn.execute(
+            "SELECT rowid FROM courses WHERE degree_id = ? AND term = ? AND lang = ?", (degree_id, term, lang))]
+        for course in rows:
+            shifts = [(s[0],) for s in self._conn.execute("SELECT rowid FROM shifts WHERE course = ?", (course,))]
+            self._conn.executemany("DELETE FROM lessons WHERE shift = ?", shifts)
+            self._conn.executemany("DELETE FROM shift_types WHERE shift = ?", shifts)
+            self._conn.execute("DELETE FROM shifts WHERE course = ?", (course,))
+            self._conn.execute("DELETE FROM course_periods WHERE course = ?", (course,))
+            self._conn.execute("DELETE FROM course_campuses WHERE course = ?", (course,))
+            if self.fts:
+                self._conn.execute("DELETE FROM courses_fts WHERE rowid = ?", (course,))
+        self._conn.execute("DELETE FROM courses WHERE degree_id = ? AND term = ? AND lang = ?",
+                           (degree_id, term, lang))
+
+    def _insert_course(self, degree_id: str, term: str, lang: str, position: int, course: dict):
+        course_id = course.get("id")
+        if not course_id:
+            return
+        periods, any_period = course_periods(course)
+        code = course.get("acronym") or course.get("code") or ""
+        search = f"{(course.get('name') or '').lower()}\n{code.lower()}"
+        data = {k: v for k, v in course.items() if k != "shifts"}
+        rowid = self._conn.execute(
+            "INSERT INTO courses (degree_id, term, lang, position, id, acronym, name, semester, semester_hint, "
+            "has_periods, any_period, search, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (degree_id, term, lang, position, str(course_id), course.get("acronym", ""), course.get("name", ""),
+             course_semester(course), str(course.get("semester_hint") or ""), int(bool(periods) or any_period),
+             int(any_period), search, json.dumps(data, ensure_ascii=False))).lastrowid
+        self._conn.executemany("INSERT OR IGNORE INTO course_periods VALUES (?, ?)", [(p, rowid) for p in periods])
+        self._conn.executemany("INSERT OR IGNORE INTO course_campuses VALUES (?, ?)",
+                               [(normalize_campus(c), rowid) for c in course.get("campus") or []
+                                if normalize_campus(c)])
+        if self.fts:
+            self._conn.execute("INSERT INTO courses_fts (rowid, search) VALUES (?, ?)", (rowid, search))
+        for shift_position, shift in enumerate(course.get("shifts") or []):
+            if not isinstance(shift, dict):
+                continue
+            shift_data = {k: v for k, v in shift.items() if k != "lessons"}
+            shift_id = self._conn.execute(
+                "INSERT INTO shifts (course, position, name, data) VALUES (?, ?, ?, ?)",
+                (rowid, shift_position, shift.get("name", ""), json.dumps(shift_data, ensure_ascii=False))).lastrowid
+            self._conn.executemany("INSERT OR IGNORE INTO shift_types VALUES (?, ?)",
+                                   [(str(t), shift_id) for t in shift.get("types") or []])
+            self._conn.executemany(
+                'INSERT INTO lessons (shift, position, start, "end", room_id, campus, data) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(shift_id, i, lesson.get("start"), lesson.get("end"), str((lesson.get("room") or {}).get("id") or ""),
+                  normalize_campus(((lesson.get("room") or {}).get("topLevelSpace") or {}).get("name")),
+                  json.dumps(lesson, ensure_ascii=False))
+                 for i, lesson in enumerate(shift.get("lessons") or []) if isinstance(lesson, dict)])
+
+    # -- reading
+
+    def degrees(self, term: str, lang: str) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.data FROM degree_terms t JOIN degrees d ON d.id = t.degree_id AND d.lang = t.lang "
+                "WHERE t.term = ? AND t.lang = ?", (term, lang)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def loaded(self, degree_id: str, term: str, lang: str):
+        """(fetched timestamp, source) of the stored courses of a degree, or None."""
+        with self._lock:
+            return self._conn.execute("SELECT fetched, source FROM loads WHERE degree_id = ? AND term = ? AND lang = ?",
+                                      (str(degree_id), term, lang)).fetchone()
+
+    def count_courses(self, degree_id: str, term: str, lang: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM courses WHERE degree_id = ? AND term = ? AND lang = ?",
+                                      (str(degree_id), term, lang)).fetchone()[0]
+
+    def courses(self, degree_id: str, term: str, lang: str, semester: str = None, period: str = "",
+                campus: str = "", query: str = "", allow_missing: bool = False) -> list:
+        """Enriched courses of a degree matching the course selector's filters, in fetch order.
+
+        ``semester`` is '1' or '2' (None for any), ``period`` one of P1-P4,
+        ``campus`` a normalized campus name and ``query`` a substring of the
+        name or acronym. Without period information a course matches the
+        periods of its semester, or any period with ``allow_missing``.
+        """
+        sql = ["SELECT c.rowid, c.data FROM courses c WHERE c.degree_id = ? AND c.term = ? AND c.lang = ?"]
+        params = [str(degree_id), term, lang]
+        if semester is not None:
+            sql.append("AND c.semester IN (?, '')")
+            params.append(semester)
+        if period:
+            period_semester = next((s for s, ps in SEMESTER_PERIODS.items() if period in ps), "")
+            sql.append("AND (c.any_period OR EXISTS (SELECT 1 FROM course_periods p WHERE p.period = ? "
+                       "AND p.course = c.rowid) OR (NOT c.has_periods AND (? OR c.semester_hint = ?)))")
+            params += [period, int(allow_missing), period_semester]
+        if campus:
+            sql.append("AND EXISTS (SELECT 1 FROM course_campuses k WHERE k.campus = ? AND k.course = c.rowid)")
+            params.append(campus)
+        query = (query or "").strip().lower()
+        if query and self.fts and len(query) >= 3:
+            sql.append("AND c.rowid IN (SELECT rowid FROM courses_fts WHERE courses_fts MATCH ?)")
+            params.append('"' + query.replace('"', '""') + '"')
+        elif query:
+            sql.append("AND instr(c.search, ?) > 0")
+            params.append(query)
+        sql.append("ORDER BY c.position")
+        with self._lock:
+            rows = self._conn.execute(" ".join(sql), params).fetchall()
+            return [self._assemble(rowid, data) for rowid, data in rows]
+
+    def _assemble(self, rowid: int, data: str) -> dict:
+        course = json.loads(data)
+        shifts = []
+        for shift_id, shift_data in self._conn.execute(
+                "SELECT rowid, data FROM shifts WHERE course = ? ORDER BY position", (rowid,)):
+            shift = json.loads(shift_data)
+            shift["lessons"] = [json.loads(r[0]) for r in self._conn.execute(
+                "SELECT data FROM lessons WHERE shift = ? ORDER BY position", (shift_id,))]
+            shifts.append(shift)
+        course["shifts"] = shifts
+        return course
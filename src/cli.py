@@ -0,0 +1,211 @@
+import argparse
+import contextlib
+import getpass
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from .config import DEFAULT_LANG, SESSION_REFRESH_LEAD_SECONDS
+from .paths import get_config_path
+
+EXIT_OK = 0
+EXIT_PENDING = 1
+EXIT_SETUP_FAILED = 2
+EXIT_WINDOW_CLOSED = 3
+EXIT_CANCELLED = 130
+
+
+class ProgressPrinter:
+    """Progress events as text lines or JSON lines (one object per line)."""
+
+    def __init__(self, json_lines: bool = False, stream=None):
+        self.json_lines = json_lines
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def __call__(self, event: str, message: str = "", level: str = "INFO", **fields):
+        now = datetime.now()
+        if self.json_lines:
+            line = json.dumps({"ts": now.isoformat(timespec="milliseconds"), "event": event,
+                               "level": level, "message": message, **fields}, ensure_ascii=False, default=str)
+        else:
+            line = f"{now.strftime('%H:%M:%S')} {level:<7} {message}"
+        with self._lock:
+            print(line, file=self.stream, flush=True)
+
+
+def parse_time_of_day(value: str) -> datetime:
+    """Next occurrence today of HH:MM or HH:MM:SS (now if it already passed)."""
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            at = datetime.strptime(value, fmt).time()
+            break
+        except ValueError:
+            continue
+    else:
+        raise argparse.ArgumentTypeError(f"invalid time '{value}' (use HH:MM or HH:MM:SS)")
+    return datetime.combine(datetime.now().date(), at)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ist-fenix-auto-enroller",
+        description="Enroll in the shifts queued in config.json without the GUI.",
+    )
+    parser.add_argument("--config", help="config.json to read (default: the one the GUI uses)")
+    parser.add_argument("--username", default=os.environ.get("FENIX_USERNAME", ""),
+                        help="IST username (default: $FENIX_USERNAME)")
+    parser.add_argument("--at", type=parse_time_of_day, metavar="HH:MM[:SS]",
+                        help="start at this time today; the session is renewed shortly before")
+    parser.add_argument("--no-wait", action="store_true",
+                        help="do not wait for the enrollment period to open")
+    parser.add_argument("--dry-run", action="store_true", help="find the shifts but do not enroll")
+    parser.add_argument("--parallel", action="store_true", default=None,
+                        help="fire all requests at once over HTTP (default: as saved in config)")
+    parser.add_argument("--watch", action="store_true", default=None,
+                        help="keep watching shifts that stay full (default: as saved in config)")
+    parser.add_argument("--show-browser", action="store_true", help="run Chrome with a visible window")
+    parser.add_argument("--json", action="store_true", help="print progress as JSON lines")
+    return parser
+
+
+def load_queue(path: str) -> dict:
+    with open(path, "r") as f:
+        data = json.load(f)
+    if not data.get("enrollments"):
+        raise ValueError(f"no enrollments queued in {path}")
+    return data
+
+
+def sleep_until(when: datetime, cancelled: threading.Event):
+    while not cancelled.is_set():
+        seconds = (when - datetime.now()).total_seconds()
+        if seconds <= 0:
+            return
+        cancelled.wait(min(seconds, 1.0))
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "batch":
+        from .batch import main as batch_main
+        return batch_main(argv[1:])
+    if argv and argv[0] == "catalog":
+        from .catalog import main as catalog_main
+        return catalog_main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    emit = ProgressPrinter(json_lines=args.json)
+
+    config_path = args.config or str(get_config_path())
+    try:
+        data = load_queue(config_path)
+    except Exception as e:
+        emit("config_error", f"Could not load queue: {e}", "ERROR", path=config_path)
+        return EXIT_SETUP_FAILED
+    enrollments = data["enrollments"]
+    emit("config_loaded", f"Loaded {len(enrollments)} enrollments from {config_path}",
+         path=config_path, enrollments=len(enrollments), degree_id=data.get("degree_id"))
+
+    username = args.username
+    password = os.environ.get("FENIX_PASSWORD", "")
+    if not username or not password:
+        if not sys.stdin.isatty():
+            emit("config_error", "Set FENIX_USERNAME and FENIX_PASSWORD (or run interactively)", "ERROR")
+            return EXIT_SETUP_FAILED
+        username = username or input("IST username: ").strip()
+        password = password or getpass.getpass("Password: ")
+
+    cancelled = threading.Event()
+
+    def on_signal(signum, _frame):
+        if cancelled.is_set():
+            raise KeyboardInterrupt
+        emit("cancel_requested", "Stopping after the current request (repeat to abort)", "WARNING")
+        cancelled.set()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+
+    # Bot and library output goes to stderr so stdout only carries progress
+    with contextlib.redirect_stdout(sys.stderr):
+        return _run(args, data, username, password, emit, cancelled)
+
+
+def _run(args, data, username, password, emit, cancelled) -> int:
+    from .bot import FenixBot
+    from .runner import EnrollmentRunner
+
+    bot = FenixBot(username, password, headless=not args.show_browser)
+    try:
+        emit("browser_start", "Starting headless browser...")
+        bot.init_driver()
+        emit("login_start", f"Logging in as {username}...")
+        if not bot.login():
+            emit("login_failed", "Login failed - check username and password", "ERROR")
+            return EXIT_SETUP_FAILED
+        emit("login_ok", "Restored saved session" if bot.session_restored else "Logged in",
+             "SUCCESS", restored=bot.session_restored)
+        bot.start_keepalive(on_expired=lambda: emit("session_expired", "Keepalive found the session expired",
+                                                   "WARNING"))
+
+        if args.at and args.at > datetime.now():
+            emit("waiting", f"Waiting until {args.at.strftime('%H:%M:%S')}", at=args.at)
+            sleep_until(args.at - timedelta(seconds=SESSION_REFRESH_LEAD_SECONDS), cancelled)
+            if cancelled.is_set():
+                return EXIT_CANCELLED
+            ok = bot.refresh_session()
+            emit("session_refresh", "Session is active" if ok else "Could not renew the session",
+                 "SUCCESS" if ok else "ERROR", ok=ok)
+            sleep_until(args.at, cancelled)
+            if cancelled.is_set():
+                return EXIT_CANCELLED
+
+        if not args.no_wait:
+            bot.on_enrollment_wait = lambda start_dt, text=None: emit(
+                "window_closed", text or "Enrollment period closed, waiting", "WARNING", opens_at=start_dt)
+            if not bot.navigate_to_enrollments() or not bot.wait_for_enrollment_window(cancelled.is_set):
+                if cancelled.is_set():
+                    return EXIT_CANCELLED
+                emit("window_unavailable", "Enrollment period is not open", "ERROR")
+                return EXIT_WINDOW_CLOSED
+
+        bot.start_capture()
+        runner = EnrollmentRunner(
+            bot,
+            data["enrollments"],
+            dry_run=args.dry_run,
+            parallel=data.get("parallel_enroll", False) if args.parallel is None else args.parallel,
+            watch_full=data.get("watch_full_shifts", False) if args.watch is None else args.watch,
+            scheduler_policy=data.get("scheduler_policy") or {},
+            watcher_policy=data.get("seat_watcher") or {},
+            lang=data.get("lang") or DEFAULT_LANG,
+            on_log=lambda message, level="INFO": emit("log", message, level),
+            on_status=lambda text: text and emit("status", text, "DEBUG"),
+            should_cancel=cancelled.is_set,
+        )
+        started = time.monotonic()
+        result = runner.run()
+        result["seconds"] = round(time.monotonic() - started, 1)
+        emit("done", f"Done! {result['enrolled']}/{result['total']} enrolled "
+                     f"(pending: {len(result['pending'])})", "SUCCESS" if not result["pending"] else "WARNING",
+             **result)
+        if result["cancelled"]:
+            return EXIT_CANCELLED
+        return EXIT_OK if not result["pending"] else EXIT_PENDING
+    except KeyboardInterrupt:
+        emit("aborted", "Aborted", "ERROR")
+        return EXIT_CANCELLED
+    except Exception as e:
+        emit("error", f"Error: {e}", "ERROR")
+        return EXIT_SETUP_FAILED
+    finally:
+        bot.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
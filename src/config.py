@@ -1,13 +1,95 @@
-BASE_URL = "https://fenix.tecnico.ulisboa.pt/api/fenix/v1"
-FENIX_BASE_URL = "https://fenix.tecnico.ulisboa.pt"
+import os
+
+# Both can be pointed at a local stand-in server (see bench/)
+FENIX_BASE_URL = os.environ.get("FENIX_BASE_URL", "https://fenix.tecnico.ulisboa.pt").rstrip("/")
+BASE_URL = os.environ.get("FENIX_API_URL", f"{FENIX_BASE_URL}/api/fenix/v1").rstrip("/")
 
 DEFAULT_LANG = "pt-PT"
-DEFAULT_ACADEMIC_TERM = "2025/2026"
+DEFAULT_ACADEMIC_TERM = os.environ.get("FENIX_ACADEMIC_TERM", "2025/2026")
 DEFAULT_SESSION_TIMEOUT = 10
+# Courses stored in the local catalog are reused for this long before the GUI refetches them
+CATALOG_MAX_AGE_SECONDS = 15 * 60
+
+# HTTP transport of the API client (FenixAPI): connection pool, timeouts,
+# retries of idempotent requests and a token bucket across all its threads
+API_TRANSPORT = {
+    # Connections kept open to the server; at least the concurrent API lookups
+    "pool_maxsize": 8,
+    "connect_timeout": 5,
+    "read_timeout": DEFAULT_SESSION_TIMEOUT,
+    "retries": 3,
+    # Sleeps backoff_factor * 2^n between retries, at most backoff_max
+    "backoff_factor": 0.5,
+    "backoff_max": 10,
+    "retry_statuses": [429, 500, 502, 503, 504],
+    # 0 disables the rate limit
+    "rate_per_second": 20,
+    "burst": 40,
+    # Send a duplicate GET once one outlives this latency percentile of its endpoint
+    # (None disables hedging)
+    "hedge_percentile": 0.95,
+    "hedge_min_delay": 0.05,
+    # Latency samples an endpoint needs before hedging and adaptive timeouts kick in
+    "adaptive_min_samples": 20,
+    # Read timeout becomes timeout_factor * p99 of the endpoint, within [min_read_timeout, read_timeout]
+    "timeout_factor": 4,
+    "min_read_timeout": 2,
+}
 
 BROWSER_TIMEOUT = 20
 PAGE_LOAD_TIMEOUT = 30
 
+# Lightweight browser profile: skip images, fonts, CSS and trackers and use
+# eager page loading. Set FENIX_FULL_RENDER=1 to get normal pages for debugging.
+LIGHTWEIGHT_BROWSER = True
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*hotjar.com*",
+]
+
+# Browsers kept started in the background so login and crash recovery are instant
+DRIVER_POOL_SPARES = 1
+
+# Multi-account batch runs: browsers alive at once across all accounts
+BATCH_CONCURRENCY = 4
+# A batch account waits for a later enrollment opening without a browser,
+# taking one again this many seconds before it opens
+BATCH_WINDOW_LEAD_SECONDS = 60
+
+# Saved login sessions (encrypted, see session_store.py)
+SESSION_CHECK_PATH = "/student"
+SESSION_MAX_AGE_HOURS = 12
+SESSION_KEEPALIVE_MINUTES = 10
+# Re-validate the session this long before a scheduled enrollment starts
+SESSION_REFRESH_LEAD_SECONDS = 90
+
+# Concurrent HTTP enrollment requests sharing the browser session
+PARALLEL_ENROLL_WORKERS = 4
+HTTP_ENROLL_TIMEOUT = 15
+
+# Enrollment queue scheduling; override any key via "scheduler_policy" in config.json
+SCHEDULER_POLICY = {
+    # Seconds before retrying a shift, per classified outcome
+    "backoff_base": {"full": 5, "closed": 30, "unknown": 3},
+    "backoff_factor": 2.0,
+    "backoff_max": 120,
+    "jitter": 0.3,
+    # Global request budget across all shifts
+    "rate_per_minute": 30,
+    "burst": 10,
+    "deadline_minutes": 20,
+}
+
+# Seat watcher for shifts still full after the enrollment run
+SEAT_WATCHER = {
+    "poll_seconds": 20,
+    # Shifts without published occupancy are requested blindly this often
+    "blind_probe_seconds": 300,
+    "max_hours": 6,
+}
+
 SHIFT_TYPES = ["T", "TP", "L", "PB"]
 
 DEGREE_TYPE_ORDER = {
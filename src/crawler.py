@@ -0,0 +1,172 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+
+from .catalog import SNAPSHOT_VERSION, write_snapshot
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit driven by the server's response.
+
+    Grows by one after every clean completion and halves when requests
+    failed or their mean latency rose above ``tolerance`` times the best
+    seen, which is how a throttled or overloaded server first shows.
+    """
+
+    def __init__(self, initial: int = 2, minimum: int = 1, maximum: int = 8, tolerance: float = 2.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.tolerance = tolerance
+        self.baseline = None
+
+    def update(self, errors: int, latency: float = None) -> int:
+        slow = latency is not None and self.baseline is not None and latency > self.tolerance * self.baseline
+        if errors or slow:
+            self.limit = max(self.minimum, self.limit // 2)
+        else:
+            self.limit = min(self.maximum, self.limit + 1)
+        if latency is not None and not errors:
+            self.baseline = latency if self.baseline is None else min(self.baseline, latency)
+        return self.limit
+
+
+class CatalogCrawler:
+    """Fetch every degree of a term concurrently into a catalog snapshot, resumably.
+
+    Degrees are enriched with ``api.get_degree_courses`` on a worker pool
+    whose size follows ``AdaptiveLimit``. Each finished degree is appended
+    to ``<output>.partial`` right away, so an interrupted crawl picks up
+    where it stopped. A degree that comes back empty (``get_degree_courses``
+    swallows errors) is retried once; if it is still empty it is not
+    checkpointed, and the next run tries it again. The snapshot is written,
+    and the checkpoint removed, once every degree is in, or regardless
+    with ``allow_empty``.
+    """
+
+    def __init__(self, api, output, academic_term: str = None, degrees: list = None,
+                 workers: int = 2, max_workers: int = 8, allow_empty: bool = False, on_progress=None):
+        self.api = api
+        self.output = Path(output)
+        self.checkpoint = self.output.with_name(self.output.name + ".partial")
+        self.term = academic_term or api.academic_term
+        self.wanted = {str(d).lower() for d in degrees or []}
+        self.limit = AdaptiveLimit(workers, 1, max_workers)
+        self.allow_empty = allow_empty
+        self.on_progress = on_progress or (lambda event, **fields: None)
+        self.failed = []
+
+    def _header(self) -> dict:
+        return {"version": SNAPSHOT_VERSION, "term": self.term, "lang": self.api.lang}
+
+    def load_checkpoint(self) -> dict:
+        """{degree_id: courses} already fetched by an earlier run of the same term and language."""
+        done = {}
+        try:
+            with self.checkpoint.open("r", encoding="utf-8") as f:
+                if json.loads(f.readline() or "null") != self._header():
+                    return {}
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # cut short by the interruption
+                    done[entry["degree_id"]] = entry["courses"]
+        except (OSError, ValueError):
+            return {}
+        return done
+
+    def _degrees(self) -> list:
+        degrees = [d for d in self.api.get_degrees_all() if self.term in d.get("academicTerms", [])]
+        if self.wanted:
+            degrees = [d for d in degrees if str(d.get("id")).lower() in self.wanted
+                       or (d.get("acronym") or "").lower() in self.wanted]
+        return degrees
+
+    def _fetch(self, degree: dict):
+        return self.api.get_degree_courses(str(degree.get("id")), self.term, enrich=True,
+                                           degree_acronym=degree.get("acronym", ""))
+
+    def _server_health(self, before: dict) -> tuple:
+        """(errors, mean request latency in seconds, new snapshot) since the ``before`` metrics snapshot."""
+        now = self.api.metrics.snapshot()
+        requests = now["requests"] - before["requests"]
+        errors = sum(e["errors"] for e in now["endpoints"].values()) - \
+            sum(e["errors"] for e in before["endpoints"].values())
+        latency = (now["total_ms"] - before["total_ms"]) / 1000 / requests if requests > 0 else None
+        return errors, latency, now
+
+    @staticmethod
+    def _save(checkpoint, degree_id: str, courses: list):
+        checkpoint.write(json.dumps({"degree_id": degree_id, "courses": courses},
+                                    ensure_ascii=False, separators=(",", ":")) + "\n")
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+
+    def run(self) -> dict:
+        """Crawl the missing degrees and return the snapshot (None if some are still missing)."""
+        degrees = self._degrees()
+        done = self.load_checkpoint()
+        if not done:
+            self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+            with self.checkpoint.open("w", encoding="utf-8") as f:
+                f.write(json.dumps(self._header()) + "\n")
+        todo = [d for d in degrees if str(d.get("id")) not in done]
+        self.on_progress("start", degrees=len(degrees), resumed=len(degrees) - len(todo))
+        self.failed = []
+
+        started = time.monotonic()
+        # Not a with block: its exit waits for every running fetch, which
+        # would hold Ctrl-C up until the slowest degree finished
+        pool = ThreadPoolExecutor(max_workers=self.limit.maximum, thread_name_prefix="catalog-crawl")
+        with self.checkpoint.open("a", encoding="utf-8") as checkpoint:
+            pending = {}
+            queue = list(todo)
+            retried = set()
+            health = self.api.metrics.snapshot()
+            try:
+                while queue or pending:
+                    while queue and len(pending) < self.limit.limit:
+                        degree = queue.pop(0)
+                        pending[pool.submit(self._fetch, degree)] = degree
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        degree = pending[future]
+                        degree_id = str(degree.get("id"))
+                        try:
+                            courses = future.result()
+                        except Exception:
+                            courses = []
+                        if courses:
+                            done[degree_id] = courses
+                            self._save(checkpoint, degree_id, courses)
+                        elif degree_id not in retried:
+                            retried.add(degree_id)
+                            queue.append(degree)
+                        else:
+                            self.failed.append(degree)
+                        errors, latency, health = self._server_health(health)
+                        self.on_progress("degree", degree=degree, courses=len(courses), done=len(done),
+                                         total=len(degrees), workers=self.limit.update(errors, latency))
+                        # Dropped only now, so an interrupt above still finds it below
+                        del pending[future]
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                # Keep the degrees that finished while we were interrupted
+                for future, degree in pending.items():
+                    if future.done() and not future.cancelled() and future.exception() is None and future.result():
+                        self._save(checkpoint, str(degree.get("id")), future.result())
+                raise
+        pool.shutdown()
+
+        self.on_progress("finish", seconds=round(time.monotonic() - started, 1), failed=len(self.failed))
+        if self.failed and not self.allow_empty:
+            return None
+        snapshot = {**self._header(), "created": datetime.now().isoformat(timespec="seconds"),
+                    "degrees": degrees, "courses": {str(d.get("id")): done.get(str(d.get("id")), []) for d in degrees}}
+        write_snapshot(snapshot, self.output)
+        self.checkpoint.unlink(missing_ok=True)
+        return snapshot
@@ -0,0 +1,87 @@
+from .snapshot import normalize_text
+
+COURSE_LINK_MARKERS = ("proceedToShiftEnrolment", "executionCourse")
+
+# Describe every link and course header of the page in a single WebDriver
+# round trip. Links are referenced by their index in
+# document.querySelectorAll('a[href]') so the chosen one can be clicked later.
+EXTRACT_COURSE_LINKS_JS = r"""
+var links = Array.prototype.slice.call(document.querySelectorAll('a[href]'));
+var index = new Map();
+var out = {links: [], headers: []};
+links.forEach(function (a, i) {
+    index.set(a, i);
+    var row = a.closest('tr');
+    out.links.push({
+        i: i,
+        text: a.innerText || a.textContent || '',
+        href: a.getAttribute('href') || '',
+        row: row ? (row.innerText || row.textContent || '') : ''
+    });
+});
+document.querySelectorAll('h2, h3, h4, td.disciplina').forEach(function (h) {
+    var scope = h.parentElement && h.parentElement.parentElement;
+    var near = [];
+    if (scope) {
+        scope.querySelectorAll('a[href]').forEach(function (a) {
+            if (index.has(a)) { near.push(index.get(a)); }
+        });
+    }
+    out.headers.push({text: h.innerText || h.textContent || '', links: near});
+});
+return JSON.stringify(out);
+"""
+
+CLICK_LINK_JS = r"""
+var a = document.querySelectorAll('a[href]')[arguments[0]];
+if (!a) { return false; }
+a.scrollIntoView(true);
+a.click();
+return true;
+"""
+
+
+def _is_course_link(href: str) -> bool:
+    return any(marker in href for marker in COURSE_LINK_MARKERS)
+
+
+def find_course_link(page: dict, course_name: str):
+    """Pick the link leading to a course's enrollment page.
+
+    ``page`` is the decoded result of EXTRACT_COURSE_LINKS_JS. Returns
+    ``(link, reason)`` or ``(None, "")`` when the course is not on the page.
+    """
+    course_lower = course_name.lower()
+    course_norm = normalize_text(course_name)
+    links = page.get("links") or []
+
+    # Primary path: on the enrollment manager the "Book" links have the
+    # generic text "Book" (href=proceedToShiftEnrolment) and the course
+    # name lives in a sibling cell of the SAME table row.
+    for link in links:
+        row = link.get("row") or ""
+        if "proceedToShiftEnrolment" not in link["href"] or not row.strip():
+            continue
+        if course_lower in row.lower() or course_norm in normalize_text(row):
+            return link, "course row"
+
+    # Links whose text or href mention the course
+    for link in links:
+        if not _is_course_link(link["href"]):
+            continue
+        text = link.get("text") or ""
+        if course_lower in text.lower() or course_lower in link["href"].lower():
+            return link, "course link"
+        # e.g. "Producao" matches "Produção"
+        if course_norm in normalize_text(text):
+            return link, "course link (normalized match)"
+
+    # Headers or course cells with an enrollment link nearby
+    for header in page.get("headers") or []:
+        if course_lower not in (header.get("text") or "").lower():
+            continue
+        for i in header.get("links") or []:
+            if 0 <= i < len(links) and _is_course_link(links[i]["href"]):
+                return links[i], "nearby enrollment link"
+
+    return None, ""
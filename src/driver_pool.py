@@ -0,0 +1,228 @@
+import os
+import shutil
+import threading
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+
+from .config import BLOCKED_URL_PATTERNS, DRIVER_POOL_SPARES, LIGHTWEIGHT_BROWSER
+
+
+def lightweight_default() -> bool:
+    return LIGHTWEIGHT_BROWSER and os.environ.get("FENIX_FULL_RENDER", "") in ("", "0")
+
+
+def _apply_lightweight_options(chrome_options: Options):
+    """Only load what the bot reads: HTML and scripts, no rendering extras."""
+    # Return from driver.get once the DOM is parsed instead of waiting
+    # for every sub-resource
+    chrome_options.page_load_strategy = "eager"
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.default_content_setting_values.notifications": 2,
+        "profile.default_content_setting_values.geolocation": 2,
+    })
+    for arg in (
+        "--blink-settings=imagesEnabled=false",
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-translate",
+        "--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication",
+        "--no-first-run",
+        "--mute-audio",
+    ):
+        chrome_options.add_argument(arg)
+
+
+def _block_heavy_resources(driver):
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        print(f"[BOT] Lightweight profile: blocking {len(BLOCKED_URL_PATTERNS)} resource patterns")
+    except Exception as e:
+        print(f"[BOT] Could not block resources over CDP: {e}")
+
+
+# Far enough off any desktop that a warming spare never shows up on screen
+OFFSCREEN_POSITION = (-32000, -32000)
+
+
+def create_driver(headless: bool = False, lightweight: bool = None, retries: int = 5, offscreen: bool = False):
+    """Start a Chrome WebDriver, retrying a few times before giving up.
+
+    ``offscreen`` opens a windowed browser outside the visible desktop, for
+    spares that should not pop up until they are handed out.
+    """
+    if lightweight is None:
+        lightweight = lightweight_default()
+
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--window-size=1920,1080")
+    if offscreen and not headless:
+        chrome_options.add_argument(f"--window-position={OFFSCREEN_POSITION[0]},{OFFSCREEN_POSITION[1]}")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("--disable-gpu")
+    if lightweight:
+        _apply_lightweight_options(chrome_options)
+
+    # Try to find chromedriver from environment or PATH
+    chromedriver_path = os.environ.get("CHROMEDRIVER_PATH") or shutil.which("chromedriver")
+
+    # Set chromium binary if available
+    chrome_bin = os.environ.get("CHROME_BIN")
+    if chrome_bin:
+        chrome_options.binary_location = chrome_bin
+
+    # Enable performance logging for network requests
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    for attempt in range(retries):
+        try:
+            if chromedriver_path:
+                driver = webdriver.Chrome(service=Service(chromedriver_path), options=chrome_options)
+            else:
+                driver = webdriver.Chrome(options=chrome_options)
+            if lightweight:
+                _block_heavy_resources(driver)
+            return driver
+        except Exception as e:
+            if attempt == retries - 1:
+                raise Exception(f"Failed to initialize browser: {e}")
+            time.sleep(2)
+
+
+def driver_alive(driver) -> bool:
+    """Cheap health check: one round trip to the browser."""
+    try:
+        return driver.execute_script("return 1;") == 1
+    except Exception:
+        return False
+
+
+def quit_driver(driver):
+    if not driver:
+        return
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """Keep Chrome instances warm so nobody waits for a cold start.
+
+    ``warm()`` launches spares in a background thread when the app starts;
+    windowed spares are started off screen and only moved into view when
+    ``acquire()`` hands one out. ``acquire()`` returns a health-checked spare
+    immediately (or waits for the one being started) and starts a
+    replacement in the background, so a crashed browser can be swapped out
+    during the enrollment window in milliseconds instead of a full Chrome
+    start. Once ``close()`` is called no new browser is started.
+    """
+
+    def __init__(self, headless: bool = False, lightweight: bool = None, spares: int = DRIVER_POOL_SPARES):
+        self.headless = headless
+        self.lightweight = lightweight_default() if lightweight is None else lightweight
+        self.spares = max(0, spares)
+        self._idle = []
+        self._starting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.last_error = None
+
+    def _start_one(self):
+        try:
+            driver = create_driver(self.headless, self.lightweight, offscreen=True)
+        except Exception as e:
+            print(f"[POOL] Could not start a spare browser: {e}")
+            driver = None
+            self.last_error = e
+        with self._cond:
+            self._starting -= 1
+            if driver and not self._closed:
+                self._idle.append(driver)
+                driver = None
+            self._cond.notify_all()
+        quit_driver(driver)
+
+    def warm(self):
+        """Top up to ``spares`` idle browsers in the background."""
+        with self._cond:
+            if self._closed:
+                return
+            missing = self.spares - len(self._idle) - self._starting
+            self._starting += max(0, missing)
+        for _ in range(max(0, missing)):
+            threading.Thread(target=self._start_one, daemon=True).start()
+
+    def acquire(self, timeout: float = None):
+        """A healthy browser, from the warm spares when possible."""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            with self._cond:
+                driver = self._idle.pop(0) if self._idle else None
+                waiting = driver is None and self._starting > 0
+                if waiting:
+                    remaining = deadline - time.monotonic() if deadline else None
+                    if remaining is not None and remaining <= 0:
+                        waiting = False
+                    else:
+                        self._cond.wait(remaining)
+            if waiting:
+                continue
+            if driver is None:
+                # Nothing warm: start one on this thread
+                driver = create_driver(self.headless, self.lightweight)
+            if driver_alive(driver):
+                self._show(driver)
+                self.warm()
+                return driver
+            print("[POOL] Discarding a spare browser that failed its health check")
+            quit_driver(driver)
+
+    def _show(self, driver):
+        if self.headless:
+            return
+        try:
+            driver.set_window_position(0, 0)
+        except Exception:
+            pass
+
+    def discard(self, driver):
+        """Quit a driver that was handed out and keep the spares topped up.
+
+        The replacement (if the pool is still open) starts before the old
+        browser is quit, and the quit itself is synchronous so no Chrome
+        outlives the call.
+        """
+        self.warm()
+        quit_driver(driver)
+
+    def close(self):
+        """Stop starting browsers; spares still warming are quit as they come up."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def shutdown(self, timeout: float = 10):
+        """Close the pool and quit its idle spares.
+
+        Waits up to ``timeout`` seconds for spares still starting, which quit
+        themselves once they see the pool closed, so exiting the app right
+        after launch doesn't leave a Chrome behind.
+        """
+        self.close()
+        with self._cond:
+            self._cond.wait_for(lambda: self._starting == 0, timeout)
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            quit_driver(driver)
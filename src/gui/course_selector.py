@@ -1,18 +1,30 @@
 import tkinter as tk
 from tkinter import messagebox
 import threading
+import time
 from datetime import datetime
 
+from ..config import CATALOG_MAX_AGE_SECONDS
+
+SEMESTER_CODES = {"1st Semester": "1", "2nd Semester": "2"}
+
 
 class CourseSelectorMixin:
     """Mixin for course selection functionality"""
 
-    def _get_courses_cache_key(self, degree_id: str, lang: str):
-        return (str(degree_id or ""), lang)
-
     def _reset_course_cache(self):
-        self.all_degree_courses = []
-        self._courses_cache_key = None
+        # (degree_id, term, lang) of the courses shown; they are read back from self.catalog
+        self._courses_key = None
+
+    def _courses_are_fresh(self, degree_id: str, lang: str) -> bool:
+        loaded = self.catalog.loaded(degree_id, self.academic_term, lang)
+        if not loaded:
+            return False
+        fetched, source = loaded
+        if getattr(self, "offline_catalog", False):
+            # Offline only the imported snapshot counts, however old
+            return source == "snapshot"
+        return time.time() - fetched < CATALOG_MAX_AGE_SECONDS
 
     def _get_selected_semester(self):
         return self.semester_combo.get()
@@ -20,15 +32,6 @@ class CourseSelectorMixin:
     def _get_selected_period(self):
         return self.period_combo.get()
 
-    def _normalize_campus_name(self, name: str) -> str:
-        value = (name or "").strip()
-        lower = value.lower()
-        if "alameda" in lower:
-            return "Alameda"
-        if "tagus" in lower:
-            return "Taguspark"
-        return value
-
     def _degree_implied_campus(self) -> str:
         acronym = (getattr(self, "selected_degree_acronym", "") or "").upper()
         if acronym.endswith("-A"):
@@ -37,16 +40,6 @@ class CourseSelectorMixin:
             return "Taguspark"
         return ""
 
-    def _course_matches_degree_campus(self, course, implied_campus: str) -> bool:
-        if not implied_campus:
-            return True
-        campuses = set()
-        for name in course.get("campus") or []:
-            normalized = self._normalize_campus_name(name)
-            if normalized:
-                campuses.add(normalized)
-        return implied_campus in campuses
-
     def _set_courses_loading(self, is_loading: bool):
         if not hasattr(self, "courses_loading_frame"):
             return
@@ -69,7 +62,7 @@ class CourseSelectorMixin:
         semester = self._get_selected_semester()
         degree_id = self.get_selected_degree_id()
         lang = self.lang_combo.get() or "pt-PT"
-        cache_key = self._get_courses_cache_key(degree_id, lang)
+        cache_key = (str(degree_id or ""), self.academic_term, lang)
         
         self.log(f"on_semester_selected: semester={semester}, degree_id={degree_id}, lang={lang}", "DEBUG")
 
@@ -80,19 +73,26 @@ class CourseSelectorMixin:
             messagebox.showwarning("Warning", "Select a degree first")
             return
         
-        if lang != self.last_lang:
-            self._reset_course_cache()
-            self.last_lang = lang
-        
         self.api.set_lang(lang)
         self.api.set_academic_term(self.academic_term)
         self.log(f"Loading courses for {semester} ({self.academic_term})...")
         
-        if self.all_degree_courses and getattr(self, "_courses_cache_key", None) == cache_key:
-            self.log(f"Using cached courses, filtering for {semester}", "DEBUG")
+        if self._courses_are_fresh(degree_id, lang):
+            self.log(f"Using stored courses, filtering for {semester}", "DEBUG")
+            self._courses_key = cache_key
             self.filter_courses_by_semester()
             return
 
+        if getattr(self, "offline_catalog", False):
+            # Never fall back to Fenix while working from a snapshot
+            self._courses_key = None
+            self.clear_course_widgets()
+            self.course_vars = {}
+            self.update_selected_count()
+            degree = getattr(self, "selected_degree_acronym", "") or degree_id
+            self.log(f"{degree} is not in the offline catalog snapshot ({self.academic_term}, {lang})", "WARNING")
+            return
+
         self._set_courses_loading(True)
         
         def load_thread():
@@ -106,8 +106,9 @@ class CourseSelectorMixin:
                     degree_acronym=getattr(self, "selected_degree_acronym", "")
                 )
                 self.log(f"Fetched {len(courses)} courses", "DEBUG")
+                self.log(self.api.metrics.report_lines()[0], "DEBUG")
                 def apply_courses():
-                    self._courses_cache_key = cache_key
+                    self._courses_key = cache_key
                     self.display_available_courses(courses)
                     self._set_courses_loading(False)
 
@@ -145,191 +146,70 @@ class CourseSelectorMixin:
         else:
             self.period_combo.set(default)
     
-    def display_available_courses(self, courses):
+    def _query_courses(self, query: str = "", allow_missing: bool = False):
+        """Courses shown for the current degree that pass the semester, period, campus and search filters."""
+        if not getattr(self, "_courses_key", None):
+            return []
+        degree_id, term, lang = self._courses_key
+        return self.catalog.courses(
+            degree_id, term, lang,
+            semester=SEMESTER_CODES.get(self._get_selected_semester()),
+            period=self._get_selected_period(),
+            campus=self._degree_implied_campus(),
+            query=query,
+            allow_missing=allow_missing,
+        )
+
+    def _show_courses(self, query: str = "", reset_vars: bool = True) -> bool:
+        """Render the filtered courses, selected ones first. Returns True if the period fallback was needed."""
         current_selected = {cid for cid, entry in self.course_vars.items() if entry["var"].get()}
         self._current_selected_cache = set(current_selected)
         self.clear_course_widgets()
-        self.available_courses = []
-        self.all_degree_courses = []
-        self.course_vars = {}
-        semester = self.semester_combo.get()
-        period_filter = self._get_selected_period()
+        if reset_vars:
+            self.course_vars = {}
         saved_selected = getattr(self, "saved_selected_course_ids", set())
-        implied_campus = self._degree_implied_campus()
-        
-        if not courses:
-            self.log("No courses found for this degree and semester", "WARNING")
-            return
-        
-        self.log(f"Found {len(courses)} courses", "SUCCESS")
-        
-        # Render selected courses first (current selection and saved)
-        def is_selected_course(course):
-            course_id = str(course.get("id") or course.get("code") or course.get("name"))
-            if course_id in current_selected:
-                return True
-            return course_id in saved_selected
 
-        sorted_courses = sorted(
-            courses,
-            key=lambda c: not is_selected_course(c)
-        )
-
-        for course in sorted_courses:
-            # Courses are already enriched by the API with semester_hint and period_hint
-            course_id = course.get("id")
-            if not course_id:
-                continue
-            
-            name = course.get("name", "Unknown")
-            code = course.get("code", "")
-            
-            # Store in all_degree_courses for search filtering
-            self.all_degree_courses.append(course)
-            
-            # Now check if the course matches the selected semester
-            if not self.course_matches_semester(course, semester):
-                continue
-
-            if not self.course_matches_period(course, period_filter, allow_missing=False):
-                continue
+        filtered = self._query_courses(query)
+        fallback = False
+        # Fallback: if period filter yields nothing, allow missing period info
+        if not filtered and self._get_selected_period():
+            filtered = self._query_courses(query, allow_missing=True)
+            fallback = True
 
-            if not self._course_matches_degree_campus(course, implied_campus):
-                continue
+        def is_selected_course(course):
+            course_id = str(course.get("id") or course.get("code") or course.get("name"))
+            return course_id in current_selected or course_id in saved_selected
 
-            
+        for course in sorted(filtered, key=lambda c: not is_selected_course(c)):
             self.available_courses.append(course)
             self.render_course_checkbox(course)
-        
-        self.search_var.set("")
         self.update_selected_count()
-        # Fallback: if period filter yields nothing, allow missing period info
-        if period_filter and len(self.available_courses) == 0:
+        return fallback
+
+    def display_available_courses(self, courses):
+        """Show freshly loaded courses; they were stored in self.catalog by the API."""
+        semester = self.semester_combo.get()
+        if not courses:
             self.clear_course_widgets()
-            self.available_courses = []
-            for course in sorted_courses:
-                if not self.course_matches_semester(course, semester):
-                    continue
-                if not self.course_matches_period(course, period_filter, allow_missing=True):
-                    continue
-                if not self._course_matches_degree_campus(course, implied_campus):
-                    continue
-                self.available_courses.append(course)
-                self.render_course_checkbox(course)
-            self.update_selected_count()
-            self.log(f"Displayed {len(self.available_courses)} courses for {semester} (fallback)")
+            self.course_vars = {}
+            self.log("No courses found for this degree and semester", "WARNING")
             return
 
-        self.log(f"Displayed {len(self.available_courses)} courses for {semester}")
-    
+        self.log(f"Found {len(courses)} courses", "SUCCESS")
+        self.search_var.set("")
+        fallback = self._show_courses()
+        self.log(f"Displayed {len(self.available_courses)} courses for {semester}" + (" (fallback)" if fallback else ""))
+
     def filter_courses_by_semester(self):
-        """Re-filter cached courses when semester selection changes"""
-        current_selected = {cid for cid, entry in self.course_vars.items() if entry["var"].get()}
-        self._current_selected_cache = set(current_selected)
-        self.clear_course_widgets()
-        self.available_courses = []
-        self.course_vars = {}
+        """Re-filter stored courses when semester selection changes"""
         semester = self._get_selected_semester()
-        period_filter = self._get_selected_period()
-        saved_selected = getattr(self, "saved_selected_course_ids", set())
-        implied_campus = self._degree_implied_campus()
-
-        filtered = [c for c in self.all_degree_courses if self.course_matches_semester(c, semester) and self.course_matches_period(c, period_filter, allow_missing=False) and self._course_matches_degree_campus(c, implied_campus)]
-        filtered = sorted(
-            filtered,
-            key=lambda c: not (str(c.get("id") or c.get("code") or c.get("name")) in current_selected or str(c.get("id") or c.get("code") or c.get("name")) in saved_selected)
-        )
-        
-        for course in filtered:
-            self.available_courses.append(course)
-            self.render_course_checkbox(course)
-        
         self.search_var.set("")
-        self.update_selected_count()
-        if period_filter and len(self.available_courses) == 0:
-            self.clear_course_widgets()
-            self.available_courses = []
-            filtered = [c for c in self.all_degree_courses if self.course_matches_semester(c, semester) and self.course_matches_period(c, period_filter, allow_missing=True) and self._course_matches_degree_campus(c, implied_campus)]
-            filtered = sorted(
-                filtered,
-                key=lambda c: not (str(c.get("id") or c.get("code") or c.get("name")) in current_selected or str(c.get("id") or c.get("code") or c.get("name")) in saved_selected)
-            )
-            for course in filtered:
-                self.available_courses.append(course)
-                self.render_course_checkbox(course)
-            self.update_selected_count()
-            self.log(f"Filtered to {len(self.available_courses)} courses for {semester} (fallback)")
-            return
+        fallback = self._show_courses()
+        self.log(f"Filtered to {len(self.available_courses)} courses for {semester}" + (" (fallback)" if fallback else ""))
 
-        self.log(f"Filtered to {len(self.available_courses)} courses for {semester}")
-    
     def filter_courses_display(self):
-        query = self.search_var.get().strip().lower()
-        current_selected = {cid for cid, entry in self.course_vars.items() if entry["var"].get()}
-        self._current_selected_cache = set(current_selected)
-        self.clear_course_widgets()
-        self.available_courses = []
-        semester = self._get_selected_semester()
-        period_filter = self._get_selected_period()
-        saved_selected = getattr(self, "saved_selected_course_ids", set())
-        implied_campus = self._degree_implied_campus()
-
-        filtered = []
-        
-        for course in self.all_degree_courses:
-            name = course.get("name", "").lower()
-            code = (course.get("acronym") or course.get("code") or "").lower()
-            
-            if not self.course_matches_semester(course, semester):
-                continue
-            
-            # Apply period filter
-            if not self.course_matches_period(course, period_filter, allow_missing=False):
-                continue
-
-            if not self._course_matches_degree_campus(course, implied_campus):
-                continue
-
-
-            if not query or query in name or query in code:
-                filtered.append(course)
-
-        filtered = sorted(
-            filtered,
-            key=lambda c: not (str(c.get("id") or c.get("code") or c.get("name")) in current_selected or str(c.get("id") or c.get("code") or c.get("name")) in saved_selected)
-        )
-
-        for course in filtered:
-            self.available_courses.append(course)
-            self.render_course_checkbox(course)
-        self.update_selected_count()
+        self._show_courses(self.search_var.get().strip().lower(), reset_vars=False)
 
-        if period_filter and len(self.available_courses) == 0:
-            self.clear_course_widgets()
-            self.available_courses = []
-            filtered = []
-            for course in self.all_degree_courses:
-                name = course.get("name", "").lower()
-                code = (course.get("acronym") or course.get("code") or "").lower()
-                if not self.course_matches_semester(course, semester):
-                    continue
-                if not self.course_matches_period(course, period_filter, allow_missing=True):
-                    continue
-                if not self._course_matches_degree_campus(course, implied_campus):
-                    continue
-                if not query or query in name or query in code:
-                    filtered.append(course)
-
-            filtered = sorted(
-                filtered,
-                key=lambda c: not (str(c.get("id") or c.get("code") or c.get("name")) in current_selected or str(c.get("id") or c.get("code") or c.get("name")) in saved_selected)
-            )
-
-            for course in filtered:
-                self.available_courses.append(course)
-                self.render_course_checkbox(course)
-            self.update_selected_count()
-    
     def clear_search(self):
         self.search_var.set("")
         self.filter_courses_display()
@@ -344,6 +224,11 @@ class CourseSelectorMixin:
             entry["var"].set(True)
         self.update_selected_count()
 
+    def show_api_stats(self):
+        """Dump the API client's request and cache metrics to the log."""
+        for line in self.api.metrics.report_lines():
+            self.log(line, "DEBUG")
+
     def clear_course_selection(self):
         for entry in self.course_vars.values():
             entry["var"].set(False)
@@ -1,4 +1,8 @@
+import os
 import threading
+from tkinter import filedialog
+from ..catalog import read_snapshot, describe
+from ..config import DEFAULT_ACADEMIC_TERM
 from ..utils import get_degree_type_name
 
 
@@ -118,14 +122,67 @@ class DegreeSelectorMixin:
             return
         self.on_semester_selected()
     
+    def import_catalog(self, path: str = None, reload: bool = True):
+        """Load degrees and courses from a catalog snapshot instead of Fenix (asks for the file without ``path``).
+
+        The snapshot is copied into the catalog database, skipping degrees
+        whose stored courses already are this snapshot's, and not kept in
+        memory. From then on courses are only read from the snapshot.
+        """
+        if not path:
+            last = getattr(self, "last_catalog_path", "")
+            path = filedialog.askopenfilename(
+                title="Load catalog snapshot",
+                filetypes=[("Catalog snapshot", "*.json.gz"), ("All files", "*")],
+                initialdir=os.path.dirname(last) or None,
+                initialfile=os.path.basename(last) or None,
+            )
+            if not path:
+                return False
+        try:
+            snapshot = read_snapshot(path)
+            imported = self.catalog.import_snapshot(snapshot)
+        except Exception as e:
+            self.log(f"Could not load catalog {path}: {e}", "ERROR")
+            return False
+        if not self.offline_catalog:
+            # Restored by use_online_catalog
+            self._online_lang = self.lang_combo.get()
+        self.catalog_path = self.last_catalog_path = path
+        self.offline_catalog = True
+        self.academic_term = snapshot["term"]
+        self.lang_combo.set(snapshot["lang"])
+        self._reset_course_cache()
+        self.log(f"Offline catalog {describe(snapshot)}" + ("" if imported else " (already up to date)"), "SUCCESS")
+        if reload:
+            self.load_degrees_async()
+        return True
+
+    def use_online_catalog(self):
+        """Leave the offline catalog and load degrees and courses from Fenix again."""
+        if not self.offline_catalog:
+            self.log("Already using the online catalog", "INFO")
+            return
+        self.offline_catalog = False
+        self.catalog_path = ""
+        self.academic_term = DEFAULT_ACADEMIC_TERM
+        if getattr(self, "_online_lang", ""):
+            self.lang_combo.set(self._online_lang)
+        self._reset_course_cache()
+        self.log(f"Using the online catalog ({self.academic_term})", "SUCCESS")
+        self.load_degrees_async()
+
     def load_degrees_async(self):
         self._set_degrees_loading(True)
 
         def load_thread():
             try:
                 term = self.academic_term
-                degrees = self.api.get_degrees_all()
-                valid_degrees = [d for d in degrees if term in d.get("academicTerms", [])]
+                if self.offline_catalog:
+                    valid_degrees = self.catalog.degrees(term, self.lang_combo.get() or "pt-PT")
+                else:
+                    degrees = self.api.get_degrees_all()
+                    valid_degrees = [d for d in degrees if term in d.get("academicTerms", [])]
                 self.root.after(0, lambda: (self.populate_degrees(valid_degrees), self._set_degrees_loading(False)))
             except Exception as e:
                 self.root.after(0, lambda: (self.log(f"Error loading degrees: {e}", "ERROR"), self._set_degrees_loading(False)))
@@ -1,10 +1,12 @@
 from tkinter import messagebox, simpledialog
 import json
-import os
-from pathlib import Path
 import threading
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from ..config import SESSION_REFRESH_LEAD_SECONDS
+from ..paths import get_config_path
+from ..runner import EnrollmentRunner
 
 
 class EnrollmentManagerMixin:
@@ -21,89 +23,13 @@ class EnrollmentManagerMixin:
             )
         self.root.after(0, _show)
 
-    def _is_writable_path(self, path: Path) -> bool:
-        try:
-            if path.exists():
-                return os.access(path, os.W_OK)
-            return os.access(path.parent, os.W_OK)
-        except Exception:
-            return False
-
-    def _search_project_root_in_home(self, max_depth: int = 4):
-        home = Path.home().resolve()
-        markers = {"src/gui/main_window.py", "main.py"}
-
-        def is_project_root(p: Path) -> bool:
-            return any((p / marker).exists() for marker in markers)
-
-        if is_project_root(home):
-            return home
-
-        for root, dirs, files in os.walk(home):
-            root_path = Path(root)
-            try:
-                depth = len(root_path.relative_to(home).parts)
-            except Exception:
-                depth = max_depth + 1
-
-            if depth > max_depth:
-                dirs[:] = []
-                continue
-
-            dirs[:] = [
-                d for d in dirs
-                if not d.startswith(".") and d not in {".git", "node_modules", "__pycache__"}
-            ]
-
-            if is_project_root(root_path):
-                return root_path
-
-        return None
-
-    def _find_project_root(self):
-        """Find project root by walking up from CWD for known markers."""
-        markers = {"src/gui/main_window.py", "main.py", "flake.nix", "README.md"}
-        def is_nix_store(path: Path) -> bool:
-            try:
-                return str(path).startswith("/nix/store/")
-            except Exception:
-                return False
-
-        env_root = os.environ.get("FENIX_PROJECT_ROOT")
-        if env_root:
-            root_path = Path(env_root).resolve()
-            if root_path.exists() and not is_nix_store(root_path):
-                return root_path
-
-        env_pwd = os.environ.get("PWD")
-        candidates = []
-        if env_pwd:
-            candidates.append(Path(env_pwd).resolve())
-        candidates.append(Path.cwd().resolve())
-
-        for base in candidates:
-            if is_nix_store(base):
-                continue
-            for parent in [base, *base.parents]:
-                if any((parent / marker).exists() for marker in markers):
-                    return parent
-
-        return candidates[0]
+    def _set_scheduler_status(self, text: str):
+        if hasattr(self, "scheduler_status_var"):
+            self.root.after(0, lambda: self.scheduler_status_var.set(text))
 
     def _get_config_path(self):
-        """Return config path in the project root."""
-        project_root = self._find_project_root()
-        config_path = project_root / "config.json"
-        if self._is_writable_path(config_path):
-            return config_path
-
-        fallback_root = self._search_project_root_in_home()
-        if fallback_root:
-            fallback_path = fallback_root / "config.json"
-            if self._is_writable_path(fallback_path):
-                return fallback_path
-
-        return config_path
+        """Return config path (resolved once per process, see paths.py)."""
+        return get_config_path()
     
     def remove_enrollment(self):
         selected = self.tree.selection()
@@ -130,7 +56,12 @@ class EnrollmentManagerMixin:
                     "lang": self.lang_combo.get() or "pt-PT",
                     "period": self.period_combo.get() if hasattr(self, "period_combo") else "",
                     "selected_courses": selected_courses,
-                    "selected_shifts": self.selected_shifts
+                    "selected_shifts": self.selected_shifts,
+                    "parallel_enroll": self.parallel_enroll_var.get(),
+                    "watch_full_shifts": self.watch_full_var.get(),
+                    "seat_watcher": getattr(self, "seat_watcher_policy", {}),
+                    "scheduler_policy": getattr(self, "scheduler_policy", {}),
+                    "catalog_snapshot": getattr(self, "catalog_path", "") or getattr(self, "last_catalog_path", "")
                 }, f, indent=2)
             self.log(f"Config saved: {config_path}", "SUCCESS")
         except Exception as e:
@@ -146,16 +77,26 @@ class EnrollmentManagerMixin:
                     self.log(f"Loaded saved degree_id from config: {self._saved_degree_id}", "DEBUG")
                 if data.get("lang"):
                     self.lang_combo.set(data.get("lang"))
+                if data.get("catalog_snapshot"):
+                    # Offered again, but never silently back in offline mode
+                    self.last_catalog_path = data["catalog_snapshot"]
+                    self.log(f"Last offline catalog: {self.last_catalog_path} "
+                             "(load it again with [Offline] Load Catalog)", "INFO")
                 if data.get("period"):
                     self.default_period = data.get("period")
                 self.saved_selected_course_ids = {str(cid) for cid in data.get("selected_courses", [])}
                 self.selected_shifts = data.get("selected_shifts", {})
+                self.parallel_enroll_var.set(bool(data.get("parallel_enroll", False)))
+                self.scheduler_policy = data.get("scheduler_policy", {}) or {}
+                self.watch_full_var.set(bool(data.get("watch_full_shifts", False)))
+                self.seat_watcher_policy = data.get("seat_watcher", {}) or {}
                 self.enrollments = data.get("enrollments", [])
                 for idx, e in enumerate(self.enrollments):
                     row_tag = "evenrow" if idx % 2 == 0 else "oddrow"
                     self.tree.insert(
                         "", "end",
-                        values=(e["course"], e.get("shift_type", ""), e.get("shift_name", "")),
+                        values=(e["course"], e.get("shift_type", ""), e.get("shift_name", ""),
+                                ", ".join(e.get("alternates") or [])),
                         tags=(row_tag,)
                     )
                 if self.enrollments:
@@ -179,16 +120,34 @@ class EnrollmentManagerMixin:
             messagebox.showerror("Error", "Invalid format (use HH:MM:SS)")
             return
         
+        self._enroll_cancelled = False
         self.enroll_btn.configure(state="disabled")
         self.timed_btn.configure(state="disabled")
+        self.cancel_btn.configure(state="normal")
         self.log(f"Waiting for {time_str} to start enrollment...")
         
         def schedule_thread():
+            refreshed = False
             while True:
-                now = datetime.now().time()
-                if now >= target_time:
+                if self._enroll_cancelled:
+                    self.root.after(0, lambda: self.enroll_btn.configure(state="normal"))
+                    self.root.after(0, lambda: self.timed_btn.configure(state="normal"))
+                    self.root.after(0, lambda: self.cancel_btn.configure(state="disabled"))
+                    break
+                now = datetime.now()
+                if now.time() >= target_time:
                     self.root.after(0, self.start_enrollment)
                     break
+                # Renew the login shortly before the window so it is not lost
+                # at the critical moment
+                seconds_left = (datetime.combine(now.date(), target_time) - now).total_seconds()
+                if not refreshed and self.bot and seconds_left <= SESSION_REFRESH_LEAD_SECONDS:
+                    refreshed = True
+                    self.root.after(0, lambda: self.log("Checking Fenix session before enrollment..."))
+                    if self.bot.refresh_session():
+                        self.root.after(0, lambda: self.log("Session is active", "SUCCESS"))
+                    else:
+                        self.root.after(0, lambda: self.log("Could not renew the Fenix session", "ERROR"))
                 time.sleep(0.1)
         
         threading.Thread(target=schedule_thread, daemon=True).start()
@@ -247,61 +206,24 @@ class EnrollmentManagerMixin:
         def enroll_thread():
             try:
                 # Browser already logged in from login() call
-                self.root.after(0, lambda: self.log(f"{mode_str}Navigating to enrollments..."))
-                if not self.bot.navigate_to_enrollments():
-                    self.root.after(0, lambda: self.log("Failed to navigate to enrollments", "ERROR"))
+                runner = EnrollmentRunner(
+                    self.bot,
+                    self.enrollments,
+                    dry_run=dry_run,
+                    parallel=self.parallel_enroll_var.get(),
+                    watch_full=self.watch_full_var.get(),
+                    scheduler_policy=getattr(self, "scheduler_policy", {}),
+                    watcher_policy=getattr(self, "seat_watcher_policy", {}),
+                    lang=self.api.lang,
+                    on_log=lambda message, level="INFO": self.root.after(0, lambda: self.log(message, level)),
+                    on_status=self._set_scheduler_status,
+                    should_cancel=lambda: self._enroll_cancelled,
+                )
+                result = runner.run()
+                if result["cancelled"]:
                     return
-                
-                enrolled = 0
-                remaining = [e for e in self.enrollments]
-                total = len(remaining)
-
-                overall_deadline = datetime.now() + timedelta(minutes=20)
-                per_shift_window = 60
-                per_shift_interval = 10
-
-                while remaining and datetime.now() < overall_deadline:
-                    if self._enroll_cancelled:
-                        self.root.after(0, lambda: self.log("Enrollment cancelled", "WARNING"))
-                        return
-
-                    for enrollment in list(remaining):
-                        if self._enroll_cancelled:
-                            self.root.after(0, lambda: self.log("Enrollment cancelled", "WARNING"))
-                            return
-
-                        course = enrollment["course"]
-                        shift_type = enrollment["shift_type"]
-                        shift_name = enrollment.get("shift_name", "")
-
-                        if not shift_name:
-                            self.root.after(0, lambda c=course, t=shift_type: 
-                                          self.log(f"✗ Missing shift selection for {c} ({t}). Skipping.", "ERROR"))
-                            remaining.remove(enrollment)
-                            continue
-
-                        self.root.after(0, lambda c=course, t=shift_type:
-                                      self.log(f"{mode_str}Searching for {c} ({t})..."))
-
-                        if self.bot.find_and_enroll_shift(
-                            course,
-                            shift_type,
-                            shift_name,
-                            retry_window_seconds=per_shift_window,
-                            retry_interval_seconds=per_shift_interval,
-                            dry_run=dry_run
-                        ):
-                            enrolled += 1
-                            remaining.remove(enrollment)
-                            action_str = "Would enroll in" if dry_run else "Enrolled in"
-                            self.root.after(0, lambda c=course, a=action_str:
-                                          self.log(f"✓ {a} {c}", "SUCCESS"))
-
-                    if remaining and datetime.now() < overall_deadline:
-                        self.root.after(0, lambda: self.log(
-                            f"Round robin retry: {len(remaining)} shifts still pending...", "WARNING"
-                        ))
 
+                enrolled, total, remaining = result["enrolled"], result["total"], result["pending"]
                 msg = f"Done! {enrolled}/{total}" 
                 if dry_run:
                     msg = f"[DRY-RUN] {msg} would be enrolled"
@@ -342,7 +264,7 @@ class EnrollmentManagerMixin:
             try:
                 # Initialize bot and perform login first
                 from ..bot import FenixBot
-                self.bot = FenixBot(username, password, headless=False)
+                self.bot = FenixBot(username, password, headless=False, driver_pool=self.driver_pool)
                 
                 self.root.after(0, lambda: self.log("Initializing browser..."))
                 self.bot.init_driver()
@@ -363,7 +285,11 @@ class EnrollmentManagerMixin:
                     self.bot = None
                     return
                 
+                if self.bot.session_restored:
+                    self.root.after(0, lambda: self.log("Restored saved session, CAS login skipped", "SUCCESS"))
                 self.root.after(0, lambda: self.log("Login successful!", "SUCCESS"))
+                self.bot.start_keepalive(on_expired=lambda: self.root.after(
+                    0, lambda: self.log("Fenix session expired - it will be renewed before enrolling", "WARNING")))
                 
                 # Now setup API with language and academic term
                 lang = self.lang_combo.get() or "pt-PT"
@@ -3,7 +3,10 @@ from tkinter import ttk
 from datetime import datetime
 
 from ..api import FenixAPI
+from ..catalog_db import CatalogDB
 from ..config import DEFAULT_ACADEMIC_TERM
+from ..driver_pool import DriverPool
+from ..paths import get_catalog_db_path
 
 # Import all mixins
 from .degree_selector import DegreeSelectorMixin
@@ -22,7 +25,8 @@ class GUI(DegreeSelectorMixin, CourseSelectorMixin, ScheduleBuilderMixin, Enroll
         self.root.resizable(True, True)
         
         self.bot = None
-        self.api = FenixAPI()
+        self.catalog = CatalogDB(get_catalog_db_path())
+        self.api = FenixAPI(catalog=self.catalog)
         self.enrollments = []
         self.is_logged_in = False
         self.available_courses = []
@@ -32,21 +36,39 @@ class GUI(DegreeSelectorMixin, CourseSelectorMixin, ScheduleBuilderMixin, Enroll
         self.degree_labels = []
         self.selected_degree_id = ""
         self.selected_degree_acronym = ""
-        self.all_degree_courses = []
+        self._courses_key = None
         self.academic_term = DEFAULT_ACADEMIC_TERM
+        self.catalog_path = ""
+        # Snapshot loaded in an earlier run, offered by the file dialog but not re-entered
+        self.last_catalog_path = ""
+        self.offline_catalog = False
         self.course_by_item_id = {}
-        self.last_lang = ""
         self.course_vars = {}
         self.course_widgets = []
         self.selected_count_var = tk.StringVar(value="Selected: 0")
         self.default_semester = ""
         self.default_period = ""
         self.saved_selected_course_ids = set()
+        self.scheduler_policy = {}
+        self.seat_watcher_policy = {}
+        
+        # Start Chrome in the background while the user fills in the login form
+        self.driver_pool = DriverPool(headless=False)
+        self.driver_pool.warm()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         self.setup_ui()
         self.load_config()
         self.apply_current_semester_default()
         self.load_degrees_async()
+
+    def on_close(self):
+        # Closed first, so releasing the bot's browser doesn't warm a new one
+        self.driver_pool.close()
+        if self.bot:
+            self.bot.close()
+        self.driver_pool.shutdown()
+        self.root.destroy()
         
     def setup_ui(self):
         # Dark mode colors - truly black theme
@@ -408,6 +430,9 @@ class GUI(DegreeSelectorMixin, CourseSelectorMixin, ScheduleBuilderMixin, Enroll
 
         ttk.Button(btn_top, text="[All] Select All", command=self.select_all_courses).pack(side="left", padx=5)
         ttk.Button(btn_top, text="[None] Clear Selection", command=self.clear_course_selection).pack(side="left", padx=5)
+        ttk.Button(btn_top, text="[Debug] API Stats", command=self.show_api_stats).pack(side="right", padx=5)
+        ttk.Button(btn_top, text="[Offline] Load Catalog", command=self.import_catalog).pack(side="right", padx=5)
+        ttk.Button(btn_top, text="[Online] Use Fenix", command=self.use_online_catalog).pack(side="right", padx=5)
 
         ttk.Button(
             btn_frame,
@@ -421,16 +446,18 @@ class GUI(DegreeSelectorMixin, CourseSelectorMixin, ScheduleBuilderMixin, Enroll
                         font=("Segoe UI", 10, "bold"))
         queue_frame.pack(fill="both", expand=True, pady=(0, 10))
         
-        self.tree = ttk.Treeview(queue_frame, columns=("Course", "Type", "Shift"), show="headings", height=4, style="Treeview")
+        self.tree = ttk.Treeview(queue_frame, columns=("Course", "Type", "Shift", "Fallbacks"), show="headings", height=4, style="Treeview")
         self.tree.heading("#0", text="")
         self.tree.heading("Course", text="Course Name")
         self.tree.heading("Type", text="Shift Type")
         self.tree.heading("Shift", text="Shift Name")
+        self.tree.heading("Fallbacks", text="Fallbacks")
         
         self.tree.column("#0", width=0, stretch=False)
-        self.tree.column("Course", width=480)
+        self.tree.column("Course", width=400)
         self.tree.column("Type", width=90)
-        self.tree.column("Shift", width=180)
+        self.tree.column("Shift", width=130)
+        self.tree.column("Fallbacks", width=130)
 
         # Alternating row colors to simulate grid lines
         self.tree.tag_configure("evenrow", background=self.BG_SECONDARY, foreground=self.FG_PRIMARY)
@@ -497,6 +524,18 @@ class GUI(DegreeSelectorMixin, CourseSelectorMixin, ScheduleBuilderMixin, Enroll
         self.dry_run_btn = ttk.Button(top_row, text="[Test] Dry Run", 
             command=self.start_dry_run, state="disabled")
         self.dry_run_btn.pack(side="left", padx=5)
+
+        self.parallel_enroll_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_row, text="Parallel requests",
+                        variable=self.parallel_enroll_var).pack(side="left", padx=(15, 5))
+
+        self.watch_full_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_row, text="Watch full shifts",
+                        variable=self.watch_full_var).pack(side="left", padx=5)
+
+        self.scheduler_status_var = tk.StringVar(value="")
+        ttk.Label(btn_container, textvariable=self.scheduler_status_var,
+                  foreground=self.FG_SECONDARY).pack(fill="x", padx=5, pady=(6, 0))
         
         # Log frame as a resizable pane (always visible at bottom)
         log_frame = tk.Frame(panes, bg=self.BG_PRIMARY, highlightthickness=0, bd=0, relief="flat")
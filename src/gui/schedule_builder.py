@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
-from ..utils import normalize_shift_type, get_shift_campus
+from ..utils import normalize_shift_type, get_shift_campus, rank_alternate_shifts
 
 
 class ScheduleBuilderMixin:
@@ -634,17 +634,49 @@ class ScheduleBuilderMixin:
                     self.enrollments.append(enrollment)
                     added_count += 1
         
+        self._rank_queue_alternates(courses)
+
         self.tree.delete(*self.tree.get_children())
         for idx, e in enumerate(self.enrollments):
             row_tag = "evenrow" if idx % 2 == 0 else "oddrow"
             self.tree.insert(
                 "", "end",
-                values=(e["course"], e.get("shift_type", ""), e.get("shift_name", "")),
+                values=(e["course"], e.get("shift_type", ""), e.get("shift_name", ""),
+                        ", ".join(e.get("alternates") or [])),
                 tags=(row_tag,)
             )
         
         self.log(f"Added {added_count} new enrollments to queue (total: {len(self.enrollments)})")
     
+    def _rank_queue_alternates(self, courses):
+        """Attach ranked fallback shifts to the queue entries of ``courses``.
+
+        Alternates of each entry must not clash with any other queued shift,
+        so the plan stays valid whichever fallback ends up booked. Each entry
+        keeps the lesson times of its shift, so entries queued for courses
+        that are no longer loaded still count towards the plan.
+        """
+        shifts_by_course = {
+            course.get("id") or course.get("code") or course.get("name"): course.get("shifts") or []
+            for course in courses
+        }
+        for e in self.enrollments:
+            shifts = shifts_by_course.get(e.get("course_id")) or []
+            shift = next((s for s in shifts if s.get("name") == e.get("shift_name")), None)
+            if shift:
+                e["lessons"] = [{"start": l.get("start"), "end": l.get("end")}
+                                for l in shift.get("lessons") or [] if isinstance(l, dict)]
+
+        for idx, e in enumerate(self.enrollments):
+            shifts = shifts_by_course.get(e.get("course_id"))
+            if not shifts or not e.get("shift_name"):
+                continue
+            plan = [{"lessons": other["lessons"]} for other_idx, other in enumerate(self.enrollments)
+                    if other_idx != idx and other.get("lessons")]
+            e["alternates"] = rank_alternate_shifts(shifts, e["shift_type"], e["shift_name"], plan)
+            if e["alternates"]:
+                self.log(f"{e['course']} ({e['shift_type']}): fallbacks {', '.join(e['alternates'])}", "DEBUG")
+
     def show_enrollment_queue(self):
         """Bring enrollment queue to focus"""
         self.root.lift()
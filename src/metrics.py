@@ -0,0 +1,128 @@
+import math
+import threading
+from collections import Counter, deque
+
+# Latency samples kept per endpoint; percentiles are over the most recent ones
+MAX_LATENCY_SAMPLES = 2048
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.statuses = Counter()
+        self.latencies = deque(maxlen=MAX_LATENCY_SAMPLES)
+
+
+class RequestMetrics:
+    """Per-endpoint request counts, latencies, bytes and status codes, plus cache hit ratios.
+
+    Endpoints are recorded by template (``/courses/{id}/schedule``) so that
+    an N+1 fetch pattern shows up as one endpoint with a large count.
+    Thread-safe: the GUI loads degrees and courses from worker threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._caches = {}
+
+    def record(self, endpoint: str, seconds: float, status: int = None, size: int = 0, error: bool = False):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _EndpointStats()
+            stats.count += 1
+            stats.seconds += seconds
+            stats.bytes += size
+            stats.latencies.append(seconds)
+            if status is not None:
+                stats.statuses[status] += 1
+            if error or (status is not None and status >= 400):
+                stats.errors += 1
+
+    def hedge(self, endpoint: str, won: bool):
+        """Count a duplicate request sent for a slow one; ``won`` if the duplicate answered first."""
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _EndpointStats()
+            stats.hedged += 1
+            stats.hedge_wins += int(won)
+
+    def latency(self, endpoint: str, fraction: float, min_samples: int = 1):
+        """Recent latency percentile of an endpoint in seconds, or None with fewer than ``min_samples``."""
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None or len(stats.latencies) < max(1, min_samples):
+                return None
+            latencies = sorted(stats.latencies)
+        return percentile(latencies, fraction)
+
+    def cache(self, name: str, hit: bool):
+        with self._lock:
+            counts = self._caches.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._caches.clear()
+
+    def snapshot(self) -> dict:
+        """Plain-dict view of everything recorded so far (latencies in ms)."""
+        with self._lock:
+            endpoints = {}
+            for name, stats in self._endpoints.items():
+                latencies = sorted(stats.latencies)
+                endpoints[name] = {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "bytes": stats.bytes,
+                    "total_ms": round(stats.seconds * 1000, 1),
+                    "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+                    "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+                    "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+                    "statuses": dict(stats.statuses),
+                    "hedged": stats.hedged,
+                    "hedge_wins": stats.hedge_wins,
+                }
+            caches = {
+                name: {"hits": hits, "misses": misses,
+                       "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0}
+                for name, (hits, misses) in self._caches.items()
+            }
+        return {
+            "requests": sum(e["count"] for e in endpoints.values()),
+            "total_ms": round(sum(e["total_ms"] for e in endpoints.values()), 1),
+            "endpoints": endpoints,
+            "caches": caches,
+        }
+
+    def report_lines(self) -> list:
+        """Human-readable dump, busiest endpoint first."""
+        snap = self.snapshot()
+        lines = [f"API: {snap['requests']} requests, {snap['total_ms'] / 1000:.2f}s total"]
+        for name, e in sorted(snap["endpoints"].items(), key=lambda kv: -kv[1]["total_ms"]):
+            statuses = ", ".join(f"{code}x{n}" for code, n in sorted(e["statuses"].items()))
+            lines.append(f"  {name}: {e['count']} req, p50 {e['p50_ms']}ms p95 {e['p95_ms']}ms "
+                         f"p99 {e['p99_ms']}ms, {e['bytes'] / 1024:.0f} KiB"
+                         + (f", {e['errors']} errors" if e["errors"] else "")
+                         + (f", {e['hedged']} hedged ({e['hedge_wins']} won)" if e["hedged"] else "")
+                         + (f" [{statuses}]" if statuses else ""))
+        for name, c in sorted(snap["caches"].items()):
+            lines.append(f"  cache {name}: {c['hits']} hits / {c['misses']} misses ({c['hit_ratio']:.0%})")
+        return lines
+
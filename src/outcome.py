@@ -0,0 +1,152 @@
+import re
+from enum import Enum
+from bs4 import BeautifulSoup
+
+from .snapshot import normalize_text
+
+
+class EnrollmentOutcome(str, Enum):
+    ENROLLED = "enrolled"
+    FULL = "full"
+    ALREADY_ENROLLED = "already-enrolled"
+    CLOSED = "closed"
+    SESSION_EXPIRED = "session-expired"
+    UNKNOWN = "unknown"
+
+
+# Containers Fenix renders result messages into. Menus, column labels and
+# the rest of the page are ignored on purpose: words like "error" or
+# "enrolled" appear there on every page.
+MESSAGE_SELECTORS = [
+    ".success0", ".error0", ".warning0", ".infoop", ".infoop2", ".infoop4",
+    ".alert", ".messages", ".message", "#messages", ".help-block.error",
+    "span.error", "div.error", "p.error", "span.success", "div.success",
+]
+
+# Matched as whole words or phrases of the normalized message text, so
+# "full" in "successfully" or "inscrito" in "nao esta inscrito" do not count
+ALREADY_ENROLLED_KEYWORDS = [
+    "ja esta inscrito", "ja se encontra inscrito", "ja inscrito", "already enrolled",
+    "already booked", "ja tem o turno",
+]
+FULL_KEYWORDS = [
+    "lotado", "lotada", "sem vagas", "nao existem vagas", "nao ha vagas", "esgotado", "esgotada",
+    "cheio", "cheia", "turno cheio", "is full", "are full", "shift full", "fully booked", "maximum capacity",
+    "capacity reached",
+    "no vacancies", "no places", "no seats",
+]
+CLOSED_KEYWORDS = [
+    "periodo de inscricoes fechado", "enrollment period closed", "fora do periodo",
+    "periodo de inscricao encerrado", "not open",
+]
+# Explicit success phrases only: bare "inscrito"/"enrolled" also head the
+# status lists ("Turnos em que esta inscrito:") Fenix shows after failures
+ENROLLED_KEYWORDS = [
+    "inscrito com sucesso", "inscrita com sucesso", "inscricao efetuada com sucesso",
+    "inscricao realizada com sucesso", "inscricao confirmada", "reserva efetuada com sucesso",
+    "successfully enrolled", "enrolled successfully", "successfully booked", "booked successfully",
+    "enrollment confirmed", "enrolment confirmed",
+]
+# Negated success words, e.g. "nao esta inscrito neste turno"
+NOT_ENROLLED_KEYWORDS = [
+    "nao esta inscrito", "nao esta inscrita", "nao foi inscrito", "nao foi possivel", "not enrolled",
+    "could not", "unable to", "failed",
+]
+
+
+def _keyword_pattern(keywords):
+    return re.compile(r"\b(?:" + "|".join(re.escape(kw) for kw in keywords) + r")\b")
+
+
+ALREADY_ENROLLED_RE = _keyword_pattern(ALREADY_ENROLLED_KEYWORDS)
+FULL_RE = _keyword_pattern(FULL_KEYWORDS)
+CLOSED_RE = _keyword_pattern(CLOSED_KEYWORDS)
+ENROLLED_RE = _keyword_pattern(ENROLLED_KEYWORDS)
+NOT_ENROLLED_RE = _keyword_pattern(NOT_ENROLLED_KEYWORDS)
+
+# Page-level markers that hold regardless of message containers
+CLOSED_PAGE_MARKERS = ["enrollment period closed", "periodo de inscricoes fechado"]
+
+
+def _message_texts(soup):
+    """(kind, text) for every result message container on the page."""
+    seen = set()
+    messages = []
+    for selector in MESSAGE_SELECTORS:
+        for element in soup.select(selector):
+            if id(element) in seen:
+                continue
+            seen.add(id(element))
+            text = normalize_text(element.get_text(" ", strip=True))
+            if not text:
+                continue
+            classes = " ".join(element.get("class") or []).lower()
+            if "success" in classes:
+                kind = "success"
+            elif any(k in classes for k in ("error", "danger", "warning")):
+                kind = "error"
+            else:
+                kind = "info"
+            messages.append((kind, text))
+    return messages
+
+
+def _is_login_page(soup, url: str) -> bool:
+    url = (url or "").lower()
+    has_form = bool(soup.find("input", attrs={"id": "username"})) and bool(soup.find("input", attrs={"id": "password"}))
+    if has_form:
+        return True
+    return "/cas/" in url or url.rstrip("/").endswith("/login")
+
+
+def classify(source, url: str = "", status_code: int = None) -> EnrollmentOutcome:
+    """Classify an enrollment response.
+
+    ``source`` may be a PageSnapshot, a ``requests.Response`` or raw HTML.
+    """
+    if hasattr(source, "soup"):
+        soup, url, html = source.soup, url or source.url, source.html
+    elif hasattr(source, "status_code"):
+        url = url or source.url
+        status_code = source.status_code if status_code is None else status_code
+        html = source.text or ""
+        soup = BeautifulSoup(html, "html.parser")
+    else:
+        html = source or ""
+        soup = BeautifulSoup(html, "html.parser")
+
+    if status_code in (401, 403) or _is_login_page(soup, url):
+        return EnrollmentOutcome.SESSION_EXPIRED
+
+    messages = _message_texts(soup)
+
+    def any_message(pattern):
+        return any(pattern.search(text) for _kind, text in messages)
+
+    if any_message(ALREADY_ENROLLED_RE):
+        return EnrollmentOutcome.ALREADY_ENROLLED
+    if any_message(FULL_RE):
+        return EnrollmentOutcome.FULL
+    if any_message(CLOSED_RE):
+        return EnrollmentOutcome.CLOSED
+    # A success container or an explicit success phrase; never from an
+    # error container, whatever its words
+    for kind, text in messages:
+        if kind == "error" or NOT_ENROLLED_RE.search(text):
+            continue
+        if kind == "success" or ENROLLED_RE.search(text):
+            return EnrollmentOutcome.ENROLLED
+
+    page_text = normalize_text(html[:20000]) if html else ""
+    if any(marker in page_text for marker in CLOSED_PAGE_MARKERS):
+        return EnrollmentOutcome.CLOSED
+    return EnrollmentOutcome.UNKNOWN
+
+
+def is_success(outcome: EnrollmentOutcome) -> bool:
+    return outcome in (EnrollmentOutcome.ENROLLED, EnrollmentOutcome.ALREADY_ENROLLED)
+
+
+def is_retryable(outcome: EnrollmentOutcome) -> bool:
+    """Whether retrying the same enrollment URL later can still succeed."""
+    return outcome in (EnrollmentOutcome.FULL, EnrollmentOutcome.CLOSED, EnrollmentOutcome.UNKNOWN)
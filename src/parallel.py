@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from .config import PARALLEL_ENROLL_WORKERS, HTTP_ENROLL_TIMEOUT
+from .snapshot import PageSnapshot
+from .outcome import EnrollmentOutcome, classify, is_success
+from .tracing import Tracer
+
+
+def session_from_driver(driver) -> requests.Session:
+    """Build a requests session that shares the browser's authenticated cookies."""
+    session = requests.Session()
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        if user_agent:
+            session.headers["User-Agent"] = user_agent
+    except Exception:
+        pass
+    for cookie in driver.get_cookies():
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path") or "/",
+        )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PARALLEL_ENROLL_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _confirmation_form(html: str, page_url: str):
+    """Return (action, data) of a 'Confirmar' form on the page, if any."""
+    soup = BeautifulSoup(html or "", "html.parser")
+    button = soup.find("input", attrs={"value": "Confirmar"})
+    if not button:
+        button = next((b for b in soup.find_all("button") if "Confirmar" in b.get_text()), None)
+    form = button.find_parent("form") if button else None
+    if not form:
+        return None
+    data = {}
+    for field in form.find_all("input"):
+        name = field.get("name")
+        if name and field.get("type") not in ("submit", "button"):
+            data[name] = field.get("value", "")
+    if button.get("name"):
+        data[button["name"]] = button.get("value", "")
+    return urljoin(page_url, form.get("action") or page_url), data, (form.get("method") or "get").lower()
+
+
+class ParallelEnroller:
+    """Fire enrollment requests concurrently over HTTP within one logged-in session.
+
+    Requests share the browser's cookies, so every worker acts as the same
+    authenticated user. At most ``max_workers`` requests are in flight at
+    any time to stay polite to the server. Requests are recorded as spans
+    of ``tracer`` (the bot's, when created by it).
+    """
+
+    def __init__(self, session: requests.Session, base_url: str, max_workers: int = PARALLEL_ENROLL_WORKERS,
+                 tracer: Tracer = None):
+        self.session = session
+        self.base_url = base_url
+        self.max_workers = max(1, int(max_workers))
+        self.tracer = tracer or Tracer(enabled=False)
+        self._print_lock = threading.Lock()
+
+    def _log(self, message: str):
+        with self._print_lock:
+            print(message)
+
+    def fetch_snapshot(self, url: str):
+        try:
+            with self.tracer.span("http.fetch", "http", url=url.split("?")[0]) as info:
+                resp = self.session.get(url, timeout=HTTP_ENROLL_TIMEOUT)
+                info["status"] = resp.status_code
+            if not resp.ok:
+                self._log(f"[PARALLEL] HTTP {resp.status_code} fetching {url[:80]}")
+                return None
+            with self.tracer.span("parse_page", "http"):
+                return PageSnapshot(resp.text, self.base_url, url=resp.url)
+        except Exception as e:
+            self._log(f"[PARALLEL] Error fetching {url[:80]}: {e}")
+            return None
+
+    def fetch_snapshots(self, urls: dict) -> dict:
+        """Fetch several pages concurrently: {key: url} -> {key: PageSnapshot or None}."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {key: pool.submit(self.fetch_snapshot, url) for key, url in urls.items()}
+            return {key: f.result() for key, f in futures.items()}
+
+    def enroll_one(self, url: str, label: str) -> EnrollmentOutcome:
+        try:
+            self._log(f"[PARALLEL] Requesting enrollment for {label}")
+            with self.tracer.span("http.enroll", "http", target=label) as info:
+                resp = self.session.get(url, timeout=HTTP_ENROLL_TIMEOUT)
+                info["status"] = resp.status_code
+            form = _confirmation_form(resp.text, resp.url)
+            if form:
+                action, data, method = form
+                self._log(f"[PARALLEL] Confirming enrollment for {label}")
+                with self.tracer.span("http.confirm", "http", target=label) as info:
+                    if method == "post":
+                        resp = self.session.post(action, data=data, timeout=HTTP_ENROLL_TIMEOUT)
+                    else:
+                        resp = self.session.get(action, params=data, timeout=HTTP_ENROLL_TIMEOUT)
+                    info["status"] = resp.status_code
+            with self.tracer.span("classify", "http", target=label) as info:
+                outcome = classify(resp)
+                info["outcome"] = outcome.value
+            if is_success(outcome):
+                self._log(f"[PARALLEL] Successfully enrolled in {label} ({outcome.value})")
+            else:
+                self._log(f"[PARALLEL] Enrollment failed for {label}: {outcome.value} (HTTP {resp.status_code})")
+            return outcome
+        except Exception as e:
+            self._log(f"[PARALLEL] Error enrolling in {label}: {e}")
+        return EnrollmentOutcome.UNKNOWN
+
+    def enroll_all(self, jobs: dict) -> dict:
+        """Enroll concurrently: {key: (url, label)} -> {key: EnrollmentOutcome}."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {key: pool.submit(self.enroll_one, url, label) for key, (url, label) in jobs.items()}
+            return {key: f.result() for key, f in futures.items()}
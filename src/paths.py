@@ -0,0 +1,204 @@
+import os
+import json
+import shutil
+import threading
+from pathlib import Path
+
+APP_NAME = "ist-fenix-auto-enroller"
+
+# Files that uniquely identify a checkout of this project
+PROJECT_MARKERS = ["src/gui/main_window.py", "main.py"]
+HOME_SEARCH_MAX_DEPTH = 4
+LOCATIONS_FILE = "locations.json"
+
+_lock = threading.RLock()
+_resolved = {}
+
+
+def _is_nix_store(path: Path) -> bool:
+    return str(path).startswith("/nix/store/")
+
+
+def _is_project_root(path: Path) -> bool:
+    return all((path / marker).exists() for marker in PROJECT_MARKERS)
+
+
+def _is_writable_dir(path: Path) -> bool:
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+        test_file = path / ".write_test"
+        test_file.touch()
+        test_file.unlink()
+        return True
+    except OSError:
+        return False
+
+
+def _is_writable_file(path: Path) -> bool:
+    try:
+        if path.exists():
+            return os.access(path, os.W_OK)
+        return os.access(path.parent, os.W_OK)
+    except Exception:
+        return False
+
+
+def xdg_data_dir() -> Path:
+    base = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    return Path(base) / APP_NAME
+
+
+def xdg_state_dir() -> Path:
+    base = os.environ.get("XDG_STATE_HOME") or str(Path.home() / ".local" / "state")
+    return Path(base) / APP_NAME
+
+
+def _locations_path() -> Path:
+    return xdg_state_dir() / LOCATIONS_FILE
+
+
+def _load_locations() -> dict:
+    try:
+        with _locations_path().open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _persist_location(key: str, value: Path):
+    try:
+        data = _load_locations()
+        data[key] = str(value)
+        path = _locations_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp.replace(path)
+    except Exception:
+        pass
+
+
+def _search_home(max_depth: int = HOME_SEARCH_MAX_DEPTH):
+    """Depth-limited search of the home directory for a project checkout."""
+    home = Path.home().resolve()
+    for root, dirs, _files in os.walk(home):
+        root_path = Path(root)
+        depth = len(root_path.relative_to(home).parts)
+        if depth >= max_depth:
+            dirs[:] = []
+        dirs[:] = [
+            d for d in dirs
+            if not d.startswith(".") and d not in {"node_modules", "__pycache__"}
+        ]
+        if _is_project_root(root_path):
+            return root_path
+    return None
+
+
+def _discover_project_root():
+    env_root = os.environ.get("FENIX_PROJECT_ROOT")
+    if env_root:
+        root_path = Path(env_root).resolve()
+        if root_path.exists() and not _is_nix_store(root_path) and _is_project_root(root_path):
+            return root_path
+
+    candidates = []
+    env_pwd = os.environ.get("PWD")
+    if env_pwd:
+        candidates.append(Path(env_pwd).resolve())
+    candidates.append(Path.cwd().resolve())
+
+    for base in candidates:
+        if _is_nix_store(base):
+            continue
+        for parent in [base, *base.parents]:
+            if _is_project_root(parent):
+                return parent
+
+    persisted = _load_locations().get("project_root")
+    if persisted:
+        root_path = Path(persisted)
+        if _is_project_root(root_path):
+            return root_path
+
+    # Only walk the home directory once per machine; the outcome (even a
+    # miss) is persisted so later runs never repeat the search.
+    if _load_locations().get("home_searched"):
+        return None
+    found = _search_home()
+    _persist_location("home_searched", "1")
+    if found:
+        _persist_location("project_root", found)
+    return found
+
+
+def _memoized(key: str, resolve):
+    with _lock:
+        if key not in _resolved:
+            _resolved[key] = resolve()
+        return _resolved[key]
+
+
+def get_project_root():
+    """Return the project checkout in use, or None when running from an install."""
+    return _memoized("project_root", _discover_project_root)
+
+
+def get_logs_dir() -> Path:
+    """Return a writable logs directory, resolved once per process."""
+    def resolve():
+        root = get_project_root()
+        if root and _is_writable_dir(root / "logs"):
+            return root / "logs"
+
+        persisted = _load_locations().get("logs_dir")
+        if persisted and _is_writable_dir(Path(persisted)):
+            return Path(persisted)
+
+        logs_dir = xdg_state_dir() / "logs"
+        if _is_writable_dir(logs_dir):
+            _persist_location("logs_dir", logs_dir)
+            return logs_dir
+        return None
+
+    return _memoized("logs_dir", resolve)
+
+
+def get_catalog_db_path() -> Path:
+    """Return the SQLite catalog path (a cache, so kept out of the checkout).
+
+    CatalogDB falls back to an in-memory database if it cannot be opened.
+    """
+    return _memoized("catalog_db", lambda: xdg_data_dir() / "catalog.sqlite3")
+
+
+def get_config_path() -> Path:
+    """Return the config.json path, resolved once per process."""
+    def resolve():
+        root = get_project_root()
+        if root and _is_writable_file(root / "config.json"):
+            return root / "config.json"
+
+        persisted = _load_locations().get("config_path")
+        if persisted and _is_writable_file(Path(persisted)):
+            return Path(persisted)
+
+        config_path = xdg_data_dir() / "config.json"
+        try:
+            config_path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            pass
+        # Installs used to keep config.json in the working directory
+        legacy = Path.cwd() / "config.json"
+        if legacy.is_file() and not config_path.exists():
+            try:
+                shutil.copy2(legacy, config_path)
+                print(f"[PATHS] Copied {legacy} to {config_path}")
+            except OSError:
+                if _is_writable_file(legacy):
+                    config_path = legacy
+        _persist_location("config_path", config_path)
+        return config_path
+
+    return _memoized("config_path", resolve)
@@ -0,0 +1,52 @@
+import threading
+import time
+
+
+class RateBudget:
+    """Token bucket shared by every request it paces.
+
+    Used by the enrollment scheduler and the API transport. Thread-safe;
+    ``acquire`` blocks until a token is free, for callers that pace
+    themselves instead of polling ``available``.
+    """
+
+    def __init__(self, per_minute: float, burst: float = None):
+        self.rate = max(0.01, float(per_minute)) / 60.0
+        self.capacity = float(burst if burst is not None else max(1.0, per_minute))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> int:
+        with self._lock:
+            self._refill()
+            return int(self.tokens)
+
+    def take(self, n: int = 1):
+        with self._lock:
+            self._refill()
+            self.tokens -= n
+
+    def seconds_until_available(self) -> float:
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is free; returns the seconds waited."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return time.monotonic() - started
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
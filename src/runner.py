@@ -0,0 +1,249 @@
+import time
+from datetime import datetime, timedelta
+
+from .config import DEFAULT_LANG
+from .outcome import EnrollmentOutcome, is_success
+from .scheduler import EnrollmentScheduler, load_policy
+from .watcher import SeatWatcher
+
+
+def queue_key(enrollment: dict):
+    return (enrollment["course"], enrollment["shift_type"], enrollment["shift_name"])
+
+
+class EnrollmentRunner:
+    """Work through an enrollment queue with a logged-in FenixBot.
+
+    Shared by the GUI and the command line. Progress goes through
+    ``on_log(message, level)`` (levels as in the GUI log) and
+    ``on_status(text)``; ``should_cancel()`` is polled between requests.
+    ``before_watch()`` is called once the seat watcher has what it needs
+    and before it starts, since it no longer uses the browser.
+    """
+
+    def __init__(self, bot, enrollments, dry_run: bool = False, parallel: bool = False,
+                 watch_full: bool = False, scheduler_policy: dict = None, watcher_policy: dict = None,
+                 lang: str = DEFAULT_LANG, on_log=None, on_status=None, should_cancel=None, before_watch=None):
+        self.bot = bot
+        self.enrollments = list(enrollments)
+        self.dry_run = dry_run
+        self.parallel = parallel
+        self.watch_full = watch_full
+        self.policy = load_policy(scheduler_policy)
+        self.watcher_policy = watcher_policy or {}
+        self.lang = lang
+        self.on_log = on_log or (lambda message, level="INFO": print(f"[{level}] {message}"))
+        self.on_status = on_status or (lambda text: None)
+        self.should_cancel = should_cancel or (lambda: False)
+        self.before_watch = before_watch or (lambda: None)
+        self.mode_str = "[DRY-RUN] " if dry_run else ""
+
+        self.enrolled = 0
+        self.remaining = []
+        self.cancelled = False
+        self.session_expired = False
+        self.scheduler = None
+        self._by_key = {}
+
+    def log(self, message: str, level: str = "INFO"):
+        self.on_log(message, level)
+
+    def _cancel_requested(self) -> bool:
+        if self.should_cancel():
+            if not self.cancelled:
+                self.log("Enrollment cancelled", "WARNING")
+            self.cancelled = True
+        return self.cancelled
+
+    def _mark_enrolled(self, enrollment: dict):
+        self.enrolled += 1
+        self.remaining.remove(enrollment)
+        action_str = "Would enroll in" if self.dry_run else "Enrolled in"
+        self.log(f"✓ {action_str} {enrollment['course']} ({enrollment['shift_type']})", "SUCCESS")
+
+    def run(self) -> dict:
+        """Run the queue; returns a summary dict (see ``summary``).
+
+        The bot's trace of the run is exported next to its capture
+        directory when one was started, also when the run fails, and
+        then cleared so the next run starts from an empty trace.
+        """
+        tracer = getattr(self.bot, "tracer", None)
+        if tracer is None:
+            return self._run()
+        try:
+            with tracer.span("enrollment_run", queued=len(self.enrollments), dry_run=self.dry_run) as info:
+                summary = self._run()
+                info.update(enrolled=summary["enrolled"], pending=len(summary["pending"]))
+        finally:
+            self._report_trace(tracer)
+        return summary
+
+    def _report_trace(self, tracer):
+        try:
+            # Spans nest, so these overlap; the exported trace shows the hierarchy
+            totals = sorted(tracer.totals().items(), key=lambda kv: -kv[1][1])
+            steps = ", ".join(f"{name} {ms / 1000:.1f}s x{count}"
+                              for name, (count, ms) in [t for t in totals if t[0] != "enrollment_run"][:8])
+            if steps:
+                self.log(f"Time by step: {steps}", "DEBUG")
+            path = self.bot.export_trace()
+            if path:
+                self.log(f"Trace saved to {path}", "DEBUG")
+        except Exception as e:
+            self.log(f"Could not report the trace: {e}", "WARNING")
+        finally:
+            tracer.clear()
+
+    def _run(self) -> dict:
+        self.log(f"{self.mode_str}Navigating to enrollments...")
+        if not self.bot.navigate_to_enrollments():
+            self.log("Failed to navigate to enrollments", "ERROR")
+            return self.summary()
+
+        self.remaining = list(self.enrollments)
+        self._skip_booked()
+        for enrollment in list(self.remaining):
+            if not enrollment.get("shift_name"):
+                self.log(f"✗ Missing shift selection for {enrollment['course']} ({enrollment['shift_type']}). Skipping.",
+                         "ERROR")
+                self.remaining.remove(enrollment)
+
+        if self.parallel and self.remaining:
+            self._run_parallel()
+        self._run_scheduled()
+
+        if self.session_expired:
+            self.log("Session expired - log in again to continue", "ERROR")
+        self.on_status("")
+
+        if self.watch_full and not self.session_expired and not self._cancel_requested():
+            self._watch_full_shifts()
+        return self.summary()
+
+    def summary(self) -> dict:
+        return {
+            "enrolled": self.enrolled,
+            "total": len(self.enrollments),
+            "pending": [queue_key(e) for e in self.remaining],
+            "cancelled": self.cancelled,
+            "session_expired": self.session_expired,
+            "dry_run": self.dry_run,
+        }
+
+    def _skip_booked(self):
+        # Diff the queue against what is already booked, parsed once
+        # from the enrollment manager page
+        state = self.bot.get_enrollment_state()
+        for enrollment in list(self.remaining):
+            if not enrollment.get("shift_name"):
+                continue
+            chain = [enrollment["shift_name"]] + (enrollment.get("alternates") or [])
+            booked = next((name for name in chain if state.find(name)), None)
+            if booked:
+                self.enrolled += 1
+                self.remaining.remove(enrollment)
+                self.log(f"✓ Already booked: {enrollment['course']} ({enrollment['shift_type']}) {booked}", "SUCCESS")
+
+    def _run_parallel(self):
+        # Fire every queued shift at once over HTTP; whatever is left falls
+        # through to the scheduled browser loop
+        self.log(f"{self.mode_str}Requesting {len(self.remaining)} shifts in parallel...")
+        results = self.bot.enroll_parallel([queue_key(e) for e in self.remaining], dry_run=self.dry_run)
+        for enrollment in list(self.remaining):
+            if results.get(queue_key(enrollment)):
+                self._mark_enrolled(enrollment)
+
+    def _run_scheduled(self):
+        policy = self.policy
+        overall_deadline = datetime.now() + timedelta(minutes=policy["deadline_minutes"])
+
+        # Queue order is the user's priority unless an entry sets one
+        scheduler = self.scheduler = EnrollmentScheduler(policy)
+        for idx, e in enumerate(self.remaining):
+            self._by_key[queue_key(e)] = e
+            scheduler.add(
+                queue_key(e),
+                label=f"{e['course']} ({e['shift_type']})",
+                priority=e.get("priority", len(self.remaining) - idx),
+                contention=e.get("contention", 0),
+            )
+        self.log(f"Scheduler policy: backoff {policy['backoff_base']} x{policy['backoff_factor']} "
+                 f"(max {policy['backoff_max']}s, jitter {policy['jitter']}), "
+                 f"{policy['rate_per_minute']} req/min", "DEBUG")
+
+        while self.remaining and not self.session_expired and datetime.now() < overall_deadline:
+            if self._cancel_requested():
+                return
+
+            self.on_status(scheduler.describe())
+            batch = scheduler.next_batch()
+            if not batch:
+                time.sleep(min(1.0, max(0.1, scheduler.seconds_until_next())))
+                continue
+
+            # Group the batch by course so each course page is visited
+            # once for all of its ready shifts
+            by_course = {}
+            for key in batch:
+                by_course.setdefault(key[0], []).append(key)
+
+            for course, keys in by_course.items():
+                if self._cancel_requested():
+                    return
+                self.log(f"{self.mode_str}Searching for {course} ({', '.join(k[1] for k in keys)})...")
+                self._enroll_course(course, keys)
+
+    def _enroll_course(self, course: str, keys):
+        outcomes = self.bot.enroll_course_shifts(
+            course,
+            [(k[1], k[2]) for k in keys],
+            retry_window_seconds=0,
+            dry_run=self.dry_run,
+            alternates={(k[1], k[2]): self._by_key[k].get("alternates") or [] for k in keys}
+        )
+        for key in keys:
+            outcome = outcomes.get((key[1], key[2]), EnrollmentOutcome.UNKNOWN)
+            self.scheduler.record(key, outcome)
+            if is_success(outcome):
+                fallback = next((a for a in self._by_key[key].get("alternates") or []
+                                 if is_success(outcomes.get((key[1], a)))), None)
+                if fallback:
+                    self.log(f"{key[0]} ({key[1]}): {key[2]} was full, booked fallback {fallback}", "WARNING")
+                self._mark_enrolled(self._by_key[key])
+            elif outcome == EnrollmentOutcome.SESSION_EXPIRED:
+                self.session_expired = True
+            else:
+                self.log(f"{key[0]} ({key[1]}): {outcome.value}, retrying later", "WARNING")
+
+    def _watch_full_shifts(self):
+        """Hand shifts that are still full to a SeatWatcher."""
+        tasks = self.scheduler.tasks if self.scheduler else {}
+        entries = [e for e in self.remaining
+                   if e.get("course_id") and queue_key(e) in tasks
+                   and tasks[queue_key(e)].last_outcome == EnrollmentOutcome.FULL]
+        if not entries:
+            return
+        if not self.bot.navigate_to_enrollments():
+            self.log("Seat watcher: failed to reach enrollments page", "ERROR")
+            return
+        by_key = {queue_key(e): e for e in entries}
+        enroller, jobs = self.bot.prepare_http_jobs(list(by_key))
+
+        watcher = SeatWatcher(enroller, self.watcher_policy, lang=self.lang,
+                              on_event=lambda key, message, level: self.log(f"[Watch] {message}", level))
+        for key, job in jobs.items():
+            watcher.watch(key, by_key[key]["course_id"], key[2], job)
+        if not watcher.watched:
+            return
+
+        # The watch runs over HTTP only; the browser may be let go
+        self.before_watch()
+        self.log(f"Watching {len(watcher.watched)} full shifts for free seats (Cancel to stop)...", "WARNING")
+        self.on_status(f"Watching {len(watcher.watched)} full shifts")
+        enrolled = watcher.run(should_stop=self._cancel_requested, dry_run=self.dry_run)
+        self.on_status("")
+        if watcher.stop_reason:
+            self.log(f"Seat watcher stopped: {watcher.stop_reason}", "WARNING")
+        for key in enrolled:
+            self._mark_enrolled(by_key[key])
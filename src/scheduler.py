@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+
+from .config import SCHEDULER_POLICY
+from .ratelimit import RateBudget
+from .outcome import EnrollmentOutcome, is_success, is_retryable
+
+
+def load_policy(overrides: dict = None) -> dict:
+    """Default scheduler policy from config.py, updated with user overrides."""
+    policy = dict(SCHEDULER_POLICY)
+    policy["backoff_base"] = dict(SCHEDULER_POLICY["backoff_base"])
+    for key, value in (overrides or {}).items():
+        if key == "backoff_base" and isinstance(value, dict):
+            policy["backoff_base"].update(value)
+        elif key in policy:
+            policy[key] = value
+    return policy
+
+
+class ShiftTask:
+    def __init__(self, key, label: str, priority: float = 0, contention: float = 0):
+        self.key = key
+        self.label = label
+        self.priority = priority
+        self.contention = contention
+        self.attempts = 0
+        self.failures = {}
+        self.next_at = 0.0
+        self.last_attempt = 0.0
+        self.last_outcome = None
+        self.done = False
+
+
+class EnrollmentScheduler:
+    """Decide which queued shifts to request next.
+
+    Ready shifts are ordered by user priority, then by contention (how
+    full the shift is, raised every time it is reported full), then by
+    how long they have been waiting. After each attempt the shift backs
+    off exponentially with jitter, with a base delay that depends on the
+    classified outcome. A global token bucket caps the request rate, and
+    since backoff is capped and waiting time breaks ties, a shift that
+    keeps failing can delay others but never starve them.
+    """
+
+    def __init__(self, policy: dict = None):
+        self.policy = load_policy(policy)
+        self.budget = RateBudget(self.policy["rate_per_minute"], self.policy.get("burst"))
+        self.tasks = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, label: str = "", priority: float = 0, contention: float = 0):
+        with self._lock:
+            self.tasks[key] = ShiftTask(key, label or str(key), priority, contention)
+
+    def pending(self) -> list:
+        return [t for t in self.tasks.values() if not t.done]
+
+    def _order_key(self, task: ShiftTask, now: float):
+        return (-task.priority, -task.contention, task.last_attempt, -(now - task.next_at))
+
+    def next_batch(self) -> list:
+        """Keys of the shifts to request now, within the rate budget."""
+        with self._lock:
+            now = time.monotonic()
+            ready = [t for t in self.pending() if t.next_at <= now]
+            ready.sort(key=lambda t: self._order_key(t, now))
+            batch = ready[:self.budget.available()]
+            for task in batch:
+                task.last_attempt = now
+                task.attempts += 1
+            self.budget.take(len(batch))
+            return [t.key for t in batch]
+
+    def seconds_until_next(self) -> float:
+        with self._lock:
+            pending = self.pending()
+            if not pending:
+                return 0.0
+            now = time.monotonic()
+            wait = max(0.0, min(t.next_at for t in pending) - now)
+            return max(wait, self.budget.seconds_until_available())
+
+    def _backoff(self, task: ShiftTask, outcome: EnrollmentOutcome) -> float:
+        base = self.policy["backoff_base"].get(outcome.value, self.policy["backoff_base"]["unknown"])
+        streak = task.failures.get(outcome, 1)
+        delay = min(self.policy["backoff_max"], base * (self.policy["backoff_factor"] ** (streak - 1)))
+        jitter = self.policy["jitter"]
+        return max(0.0, delay * random.uniform(1 - jitter, 1 + jitter))
+
+    def record(self, key, outcome: EnrollmentOutcome):
+        """Store the outcome of one attempt and schedule the next one."""
+        with self._lock:
+            task = self.tasks[key]
+            task.last_outcome = outcome
+            if is_success(outcome) or not is_retryable(outcome):
+                task.done = True
+                return
+            task.failures[outcome] = task.failures.get(outcome, 0) + 1
+            if outcome == EnrollmentOutcome.FULL:
+                task.contention += 1
+            task.next_at = time.monotonic() + self._backoff(task, outcome)
+
+    def describe(self) -> str:
+        """One-line live status for the GUI."""
+        with self._lock:
+            pending = self.pending()
+            if not pending:
+                return "Scheduler idle"
+            now = time.monotonic()
+            nxt = min(pending, key=lambda t: t.next_at)
+            wait = max(0, int(nxt.next_at - now))
+            last = nxt.last_outcome.value if nxt.last_outcome else "new"
+            return (f"Pending {len(pending)} | next: {nxt.label} in {wait}s "
+                    f"({last}, try {nxt.attempts + 1}) | budget {self.budget.available()} req")
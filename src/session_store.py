@@ -0,0 +1,184 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+
+from .config import (
+    FENIX_BASE_URL, HTTP_ENROLL_TIMEOUT, SESSION_CHECK_PATH, SESSION_KEEPALIVE_MINUTES, SESSION_MAX_AGE_HOURS,
+)
+from .paths import xdg_state_dir
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+except ImportError:  # optional: without it sessions are simply not persisted
+    Fernet = None
+
+KDF_ITERATIONS = 390000
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "expiry")
+
+
+def _derive_key(password: str, salt: bytes) -> bytes:
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=KDF_ITERATIONS)
+    return base64.urlsafe_b64encode(kdf.derive(password.encode("utf-8")))
+
+
+def normalize_cookie(cookie: dict) -> dict:
+    """Selenium-style cookie from a Selenium or CDP (Network.getAllCookies) cookie."""
+    out = {k: cookie[k] for k in COOKIE_FIELDS if cookie.get(k) is not None}
+    expires = cookie.get("expires")
+    if "expiry" not in out and isinstance(expires, (int, float)) and expires > 0:
+        out["expiry"] = int(expires)
+    out.setdefault("path", "/")
+    return out
+
+
+def requests_session(cookies) -> requests.Session:
+    session = requests.Session()
+    for cookie in cookies or []:
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path") or "/")
+    return session
+
+
+def session_is_valid(session: requests.Session) -> bool:
+    """One request to a page that needs a login; a redirect to CAS means the session is gone."""
+    try:
+        resp = session.get(f"{FENIX_BASE_URL}{SESSION_CHECK_PATH}", allow_redirects=False, timeout=HTTP_ENROLL_TIMEOUT)
+    except Exception as e:
+        print(f"[SESSION] Validation request failed: {e}")
+        return False
+    if resp.is_redirect:
+        location = (resp.headers.get("Location") or "").lower()
+        return not ("login" in location or "/cas/" in location)
+    return resp.ok and 'id="username"' not in resp.text
+
+
+class SessionStore:
+    """Encrypted-at-rest store for one user's Fenix/CAS cookies.
+
+    The key is derived from the user's password (PBKDF2), so the file is
+    useless without the credentials that are typed in on every start
+    anyway, and a changed password silently invalidates it. Requires the
+    optional ``cryptography`` package; without it nothing is stored.
+    """
+
+    def __init__(self, username: str, password: str):
+        self.username = username
+        self.password = password
+        user_id = hashlib.sha256(username.encode("utf-8")).hexdigest()[:16]
+        self.path = xdg_state_dir() / "sessions" / f"{user_id}.json"
+
+    @property
+    def enabled(self) -> bool:
+        return Fernet is not None and bool(self.password)
+
+    def save(self, cookies):
+        if not self.enabled:
+            return
+        try:
+            salt = os.urandom(16)
+            payload = json.dumps({"username": self.username, "saved_at": time.time(), "cookies": cookies})
+            token = Fernet(_derive_key(self.password, salt)).encrypt(payload.encode("utf-8"))
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"salt": base64.b64encode(salt).decode(), "token": token.decode()}, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"[SESSION] Could not save session: {e}")
+
+    def load(self):
+        """Saved cookies, or None when missing, expired or not decryptable."""
+        if not self.enabled or not self.path.exists():
+            return None
+        try:
+            with self.path.open("r") as f:
+                data = json.load(f)
+            salt = base64.b64decode(data["salt"])
+            payload = Fernet(_derive_key(self.password, salt)).decrypt(data["token"].encode())
+            session = json.loads(payload)
+        except InvalidToken:
+            print("[SESSION] Saved session does not match these credentials, ignoring it")
+            return None
+        except Exception as e:
+            print(f"[SESSION] Could not read saved session: {e}")
+            return None
+        if session.get("username") != self.username:
+            return None
+        if time.time() - session.get("saved_at", 0) > SESSION_MAX_AGE_HOURS * 3600:
+            print("[SESSION] Saved session is too old, ignoring it")
+            return None
+        now = time.time()
+        return [c for c in session.get("cookies") or [] if not c.get("expiry") or c["expiry"] > now]
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[SESSION] Could not remove saved session: {e}")
+
+
+class SessionKeepalive:
+    """Ping Fenix periodically so the server-side session does not idle out.
+
+    Runs over HTTP with the browser's cookies so it never touches the
+    WebDriver, which is not safe to share between threads. Cookies the
+    server refreshes along the way are written back to the store.
+    ``on_expired`` is called once if the session is found dead.
+    """
+
+    def __init__(self, cookies, store: SessionStore = None, interval_minutes: float = SESSION_KEEPALIVE_MINUTES,
+                 on_expired=None):
+        self.session = requests_session(cookies)
+        self.cookies = list(cookies or [])
+        self.store = store
+        self.interval = max(30.0, interval_minutes * 60)
+        self.on_expired = on_expired
+        self.last_ok = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def ping(self) -> bool:
+        ok = session_is_valid(self.session)
+        if ok:
+            self.last_ok = time.time()
+            self._persist_refreshed_cookies()
+        return ok
+
+    def _persist_refreshed_cookies(self):
+        if not self.store:
+            return
+        current = {(c.name, c.domain): c for c in self.session.cookies}
+        changed = False
+        for cookie in self.cookies:
+            fresh = current.get((cookie["name"], cookie.get("domain")))
+            if fresh is not None and fresh.value != cookie["value"]:
+                cookie["value"] = fresh.value
+                changed = True
+        if changed:
+            self.store.save(self.cookies)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.ping():
+                print("[SESSION] Keepalive found the session expired")
+                if self.on_expired:
+                    self.on_expired()
+                return
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,239 @@
+import re
+import unicodedata
+from urllib.parse import urlparse, parse_qs
+from bs4 import BeautifulSoup
+
+SHIFT_LINK_MARKERS = ("enrollStudentInShifts", "shiftId=")
+COMMON_PARAM_MARKERS = ("enrollStudentInShifts", "shiftId=", "removeStudentFromShifts")
+CANCEL_LINK_MARKERS = ("unEnroleStudentFromShift", "removeStudentFromShifts")
+CANCEL_LINK_TEXTS = ("cancel", "cancelar")
+CANCEL_BLOCK_LEVELS = 4
+CONTEXT_PARENT_LEVELS = 5
+SHIFT_TOKEN_RE = re.compile(r"[\w\-]+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for matching (remove accents, lowercase)"""
+    return ''.join(c for c in unicodedata.normalize('NFD', text or "")
+                   if unicodedata.category(c) != 'Mn').lower()
+
+
+def shift_search_names(shift_name: str):
+    """Variations of a shift name that may appear in the page text."""
+    name = normalize_text(shift_name)
+    return [n for n in dict.fromkeys([
+        name,
+        name.replace(" ", ""),
+        name.split("(")[0].strip(),
+    ]) if n]
+
+
+def shift_type_from_name(shift_name: str) -> str:
+    """Guess the shift type from a Fenix shift code, e.g. "IAED1L02" -> "L"."""
+    match = re.search(r"\d(tp|pb|to|t|l|s)\d{2}$", normalize_text(shift_name).strip())
+    return match.group(1).upper() if match else ""
+
+
+class EnrollmentState:
+    """The shifts the student currently holds, as parsed from one page.
+
+    Each booked entry carries the cancel URL Fenix renders next to the
+    shift, the block text around it and the course/type it belongs to.
+    """
+
+    def __init__(self, booked: list):
+        self.booked = booked
+
+    def __len__(self):
+        return len(self.booked)
+
+    def by_course(self) -> dict:
+        """{course: {shift_type: [entries]}}"""
+        grouped = {}
+        for entry in self.booked:
+            for name in entry["names"] or [""]:
+                course_map = grouped.setdefault(entry["course"], {})
+                course_map.setdefault(shift_type_from_name(name), []).append(entry)
+        return grouped
+
+    def find(self, shift_name: str = "", shift_type: str = ""):
+        """Return the booked entry matching the shift, or None.
+
+        Matches the shift code against the text of the block holding the
+        cancel control; the type is only used when no shift name is known.
+        """
+        if shift_name:
+            names = shift_search_names(shift_name)
+            for entry in self.booked:
+                if any(n in entry["names"] for n in names):
+                    return entry
+            for entry in self.booked:
+                if any(n in entry["text"] for n in names):
+                    return entry
+            return None
+        if shift_type:
+            shift_type_lower = shift_type.lower()
+            for entry in self.booked:
+                if shift_type_lower in entry["text"]:
+                    return entry
+        return None
+
+
+class PageSnapshot:
+    """A page parsed once, with all shift links indexed by shiftId.
+
+    The bot keeps one snapshot per loaded document (see FenixBot._page_snapshot),
+    so the several lookups made during one enrollment attempt share the same
+    parse instead of re-reading driver.page_source each time.
+    """
+
+    def __init__(self, html: str, base_url: str, nav_key=None, url: str = ""):
+        self.html = html or ""
+        self.base_url = base_url
+        self.nav_key = nav_key
+        self.url = url
+        self.soup = BeautifulSoup(self.html, "html.parser")
+        self._text_cache = {}
+        self._lower_text = None
+        self.shift_links = []
+        self.by_shift_id = {}
+        self.common_params = None
+        self._enrollment_state = None
+        self._index()
+
+    @property
+    def lower_text(self) -> str:
+        if self._lower_text is None:
+            self._lower_text = self.html.lower()
+        return self._lower_text
+
+    def absolute_url(self, href: str) -> str:
+        return href if href.startswith("http") else f"{self.base_url}{href}"
+
+    def _element_text(self, element) -> str:
+        key = id(element)
+        if key not in self._text_cache:
+            self._text_cache[key] = normalize_text(element.get_text(" ", strip=True))
+        return self._text_cache[key]
+
+    def _context_levels(self, link) -> list:
+        """Text of the link's ancestors, nearest first."""
+        levels = []
+        parent = link.parent
+        for _ in range(CONTEXT_PARENT_LEVELS):
+            if parent is None:
+                break
+            levels.append(self._element_text(parent))
+            parent = parent.parent
+        return levels
+
+    def _index(self):
+        for link in self.soup.find_all("a", href=True):
+            href = link.get("href", "")
+
+            if self.common_params is None and any(m in href for m in COMMON_PARAM_MARKERS):
+                params = parse_qs(urlparse(self.absolute_url(href)).query)
+                self.common_params = {
+                    "registrationOID": params.get("registrationOID", [None])[0],
+                    "executionSemesterID": params.get("executionSemesterID", [None])[0],
+                }
+
+            if not any(m in href for m in SHIFT_LINK_MARKERS):
+                continue
+
+            url = self.absolute_url(href)
+            params = {k: v[0] for k, v in parse_qs(urlparse(url).query).items() if v}
+            link_text = link.get_text(strip=True).lower()
+            levels = self._context_levels(link)
+            entry = {
+                "url": url,
+                "shiftId": params.get("shiftId"),
+                "params": params,
+                "context": " " + " ".join(levels),
+                "link_text": link_text,
+                "is_enroll": "enrollStudentInShifts" in href,
+                "levels": [normalize_text(link_text)] + levels,
+                # Shift codes (e.g. "iaed1t01") found around the link, nearest ancestor first
+                "names": [
+                    {t for t in SHIFT_TOKEN_RE.findall(text) if any(c.isdigit() for c in t)}
+                    for text in [normalize_text(link_text)] + levels
+                ],
+            }
+            self.shift_links.append(entry)
+            if entry["shiftId"] and entry["shiftId"] not in self.by_shift_id:
+                self.by_shift_id[entry["shiftId"]] = entry
+
+    def enrollment_links(self):
+        return [e for e in self.shift_links if e["is_enroll"]]
+
+    @staticmethod
+    def _match_rank(entry: dict, names: list):
+        for level, tokens in enumerate(entry["names"]):
+            if any(n in tokens for n in names):
+                return (level, 0)
+        for level, text in enumerate(entry["levels"]):
+            if any(n in text for n in names):
+                return (level, 1)
+        return None
+
+    def find_shift_links(self, shift_name: str = "", shift_type: str = "", links=None) -> list:
+        """Match indexed links by shift name, falling back to shift type."""
+        links = self.shift_links if links is None else links
+        if shift_name:
+            names = shift_search_names(shift_name)
+            # Prefer links whose nearest ancestor names the shift: an exact
+            # shift-code token beats a substring hit further up the tree.
+            ranked = []
+            for e in links:
+                rank = self._match_rank(e, names)
+                if rank is not None:
+                    ranked.append((rank, e))
+            if ranked:
+                best = min(r for r, _ in ranked)
+                return [e for r, e in ranked if r == best]
+        if shift_type:
+            shift_type_lower = shift_type.lower()
+            matched = [e for e in links
+                       if shift_type_lower in e["context"] or shift_type_lower in e["link_text"]]
+            if matched:
+                return matched
+        return []
+
+    def _cancel_links(self):
+        for link in self.soup.find_all("a"):
+            href = link.get("href") or ""
+            if any(m in href for m in CANCEL_LINK_MARKERS):
+                yield link
+                continue
+            text = link.get_text(strip=True).lower()
+            if any(t in text for t in CANCEL_LINK_TEXTS):
+                yield link
+
+    def enrollment_state(self) -> EnrollmentState:
+        """Parse the student's booked shifts from the cancel controls on the page."""
+        if self._enrollment_state is not None:
+            return self._enrollment_state
+        booked = []
+        for link in self._cancel_links():
+            # The block of a booked shift is the nearest ancestor that names a
+            # shift code; going further up would pull in neighbouring rows.
+            levels = self._context_levels(link)[:CANCEL_BLOCK_LEVELS]
+            text, names = (levels[-1] if levels else ""), set()
+            for level_text in levels:
+                tokens = {t for t in SHIFT_TOKEN_RE.findall(level_text) if any(c.isdigit() for c in t)}
+                if tokens:
+                    text, names = level_text, tokens
+                    break
+            row = link.find_parent("tr")
+            first_cell = row.find(["td", "th"]) if row else None
+            href = link.get("href") or ""
+            params = {k: v[0] for k, v in parse_qs(urlparse(self.absolute_url(href)).query).items() if v}
+            booked.append({
+                "url": self.absolute_url(href) if href else "",
+                "shiftId": params.get("shiftId"),
+                "course": first_cell.get_text(" ", strip=True) if first_cell else "",
+                "text": text,
+                "names": names,
+            })
+        self._enrollment_state = EnrollmentState(booked)
+        return self._enrollment_state
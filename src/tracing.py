@@ -0,0 +1,124 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Events kept per tracer; a long seat-watching session stops recording past this
+MAX_TRACE_EVENTS = 100_000
+
+
+class Tracer:
+    """Record timed spans and export them in Chrome trace event format.
+
+    The exported JSON opens in chrome://tracing or https://ui.perfetto.dev,
+    one track per thread. Timestamps come from the monotonic clock,
+    relative to when the tracer was created.
+    """
+
+    def __init__(self, process_name: str = "fenix-bot", enabled: bool = True):
+        self.process_name = process_name
+        self.enabled = enabled
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._events = []
+        self._threads = {}
+        self.dropped = 0
+
+    def _now_us(self) -> float:
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        tid = self._threads.get(ident)
+        if tid is None:
+            with self._lock:
+                tid = self._threads.setdefault(ident, (len(self._threads) + 1, threading.current_thread().name))
+        return tid[0]
+
+    def _add(self, event: dict):
+        with self._lock:
+            if len(self._events) >= MAX_TRACE_EVENTS:
+                self.dropped += 1
+                return
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str = "bot", **args):
+        """Time the block; the yielded dict is stored as the span's args and may be filled in."""
+        if not self.enabled:
+            yield args
+            return
+        tid = self._tid()
+        start = self._now_us()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = repr(e)
+            raise
+        finally:
+            self._add({"name": name, "cat": category, "ph": "X", "ts": round(start, 3),
+                       "dur": round(self._now_us() - start, 3), "pid": self._pid, "tid": tid,
+                       "args": {k: v if isinstance(v, (int, float, bool)) or v is None else str(v)
+                                for k, v in args.items()}})
+
+    def instant(self, name: str, category: str = "bot", **args):
+        if not self.enabled:
+            return
+        self._add({"name": name, "cat": category, "ph": "i", "s": "t", "ts": round(self._now_us(), 3),
+                   "pid": self._pid, "tid": self._tid(), "args": {k: str(v) for k, v in args.items()}})
+
+    def events(self) -> list:
+        with self._lock:
+            return list(self._events)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self.dropped = 0
+
+    def totals(self) -> dict:
+        """{span name: (count, total ms)}, to spot the dominant step without opening the trace."""
+        totals = {}
+        for event in self.events():
+            if event["ph"] != "X":
+                continue
+            count, ms = totals.get(event["name"], (0, 0.0))
+            totals[event["name"]] = (count + 1, ms + event["dur"] / 1000)
+        return totals
+
+    def export(self, path) -> str:
+        """Write the trace as Chrome trace JSON and return the path."""
+        with self._lock:
+            meta = [{"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0,
+                     "args": {"name": self.process_name}}]
+            meta += [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                     for tid, name in self._threads.values()]
+            data = {"traceEvents": meta + self._events, "displayTimeUnit": "ms",
+                    "otherData": {"dropped_events": self.dropped}}
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        return str(path)
+
+
+def traced(name: str = None, category: str = "bot"):
+    """Method decorator: run the call inside a span of ``self.tracer`` (if it has one).
+
+    A leading string argument (a course or shift name) is kept as the
+    span's ``target``.
+    """
+    def decorate(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            tracer = getattr(self, "tracer", None)
+            if tracer is None:
+                return fn(self, *args, **kwargs)
+            target = {"target": args[0]} if args and isinstance(args[0], str) and args[0] else {}
+            with tracer.span(span_name, category, **target):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,80 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import API_TRANSPORT
+from .ratelimit import RateBudget
+
+
+def load_transport(overrides: dict = None) -> dict:
+    """Default API transport settings from config.py, updated with overrides."""
+    policy = dict(API_TRANSPORT)
+    policy.update({k: v for k, v in (overrides or {}).items() if k in policy})
+    return policy
+
+
+def _retry(policy: dict) -> Retry:
+    kwargs = dict(
+        total=policy["retries"],
+        connect=policy["retries"],
+        read=policy["retries"],
+        status=policy["retries"],
+        backoff_factor=policy["backoff_factor"],
+        status_forcelist=tuple(policy["retry_statuses"]),
+        # Only requests that are safe to repeat
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        return Retry(backoff_max=policy["backoff_max"], **kwargs)
+    except TypeError:  # urllib3 < 2 caps the backoff at its own default
+        return Retry(**kwargs)
+
+
+class TransportAdapter(HTTPAdapter):
+    """HTTPAdapter with default timeouts, retries and a shared request budget.
+
+    Every request waits for a token from ``budget`` so bursts of
+    concurrent lookups stay under the server's throttling; urllib3's
+    retries back off on their own. The time spent waiting is kept per
+    thread (``take_wait``) so callers timing a request can leave it out.
+    """
+
+    def __init__(self, policy: dict, budget: RateBudget = None):
+        self.timeout = (policy["connect_timeout"], policy["read_timeout"])
+        self.budget = budget
+        self._waited = threading.local()
+        super().__init__(pool_connections=2, pool_maxsize=policy["pool_maxsize"], max_retries=_retry(policy))
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        if self.budget:
+            self._waited.seconds = getattr(self._waited, "seconds", 0.0) + self.budget.acquire()
+        return super().send(request, **kwargs)
+
+    def take_wait(self) -> float:
+        """Seconds this thread waited for the budget since the last call."""
+        seconds = getattr(self._waited, "seconds", 0.0)
+        self._waited.seconds = 0.0
+        return seconds
+
+    def has_token(self) -> bool:
+        """True if a request sent now would not wait for the budget."""
+        return self.budget is None or self.budget.available() >= 1
+
+
+def create_session(overrides: dict = None) -> requests.Session:
+    """A requests session for the public Fenix API and pages, configured by API_TRANSPORT."""
+    policy = load_transport(overrides)
+    budget = None
+    if policy["rate_per_second"]:
+        budget = RateBudget(policy["rate_per_second"] * 60, policy["burst"])
+    adapter = TransportAdapter(policy, budget)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
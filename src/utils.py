@@ -175,3 +175,45 @@ def get_degree_type_name(d):
         return "Diploma de Estudos Avançados"
 
     return "Licenciatura"
+
+
+def shift_type_of(shift):
+    for t in shift.get("types") or []:
+        norm = normalize_shift_type(t)
+        if norm:
+            return norm
+    return ""
+
+
+def rank_alternate_shifts(shifts, shift_type, chosen_name, plan):
+    """Ordered fallbacks for a chosen shift.
+
+    ``shifts`` are the course's shifts from the API and ``plan`` the other
+    shifts the student picked (any course). Candidates are the course's
+    other shifts of the same type that do not clash with the plan, with
+    free seats first, then shifts on the chosen shift's campus, then by
+    name.
+    """
+    chosen = next((s for s in shifts if s.get("name") == chosen_name), None)
+    chosen_campus = get_shift_campus(chosen) if chosen else set()
+
+    candidates = []
+    for shift in shifts:
+        name = shift.get("name") or ""
+        if not name or name == chosen_name or shift_type_of(shift) != shift_type:
+            continue
+        if not shift.get("lessons"):
+            continue
+        if not all(shifts_compatible(shift, other) for other in plan):
+            continue
+        occupation = shift.get("occupation") or {}
+        try:
+            free = int(occupation.get("max")) - int(occupation.get("current"))
+        except (TypeError, ValueError):
+            free = None
+        candidates.append((
+            0 if free is None or free > 0 else 1,
+            0 if not chosen_campus or get_shift_campus(shift) & chosen_campus else 1,
+            name,
+        ))
+    return [name for _full, _campus, name in sorted(candidates)]
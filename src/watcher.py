@@ -0,0 +1,172 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+from .config import BASE_URL, DEFAULT_LANG, HTTP_ENROLL_TIMEOUT, PARALLEL_ENROLL_WORKERS, SEAT_WATCHER
+from .outcome import EnrollmentOutcome, is_success
+
+
+def shift_occupancy(shift: dict):
+    """(current, max) from a Fenix API shift, or None when it is not published."""
+    occupation = shift.get("occupation") or {}
+    current, capacity = occupation.get("current"), occupation.get("max")
+    if current is None or capacity is None:
+        return None
+    try:
+        return int(current), int(capacity)
+    except (TypeError, ValueError):
+        return None
+
+
+class WatchedShift:
+    def __init__(self, key, course_id: str, shift_name: str, job):
+        self.key = key
+        self.course_id = course_id
+        self.shift_name = shift_name
+        self.url, self.label = job
+        self.occupancy = None
+        self.last_probe = 0.0
+        self.attempts = 0
+        self.outcome = None
+
+
+class SeatWatcher:
+    """Watch full shifts and request them the moment a seat frees up.
+
+    Occupancy is polled from the public course schedule endpoint, one
+    request per course no matter how many of its shifts are watched, with
+    ``If-None-Match``/``If-Modified-Since`` so an unchanged schedule costs
+    a 304. Enrollment URLs are resolved before watching starts, so firing
+    is a single HTTP request through the ``ParallelEnroller`` that shares
+    the browser session. Shifts whose occupancy is not published are
+    probed blindly every ``blind_probe_seconds`` instead.
+    """
+
+    def __init__(self, enroller, policy: dict = None, lang: str = DEFAULT_LANG, on_event=None):
+        self.enroller = enroller
+        self.policy = dict(SEAT_WATCHER)
+        self.policy.update(policy or {})
+        self.lang = lang
+        self.on_event = on_event or (lambda key, message, level: print(f"[WATCH] {message}"))
+        self.session = requests.Session()
+        self.watched = {}
+        self.stop_reason = ""
+        self._validators = {}
+        self._schedules = {}
+        self._lock = threading.Lock()
+
+    def watch(self, key, course_id: str, shift_name: str, job):
+        """Add a shift; ``job`` is the pre-built ``(url, label)`` from prepare_http_jobs."""
+        self.watched[key] = WatchedShift(key, course_id, shift_name, job)
+
+    def pending(self) -> list:
+        return [w for w in self.watched.values() if w.outcome is None]
+
+    def _fetch_schedule(self, course_id: str):
+        """Shifts of a course, reusing the cached copy when the server answers 304."""
+        headers = {}
+        etag, modified = self._validators.get(course_id, (None, None))
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+        try:
+            resp = self.session.get(
+                f"{BASE_URL}/courses/{course_id}/schedule",
+                params={"lang": self.lang},
+                headers=headers,
+                timeout=HTTP_ENROLL_TIMEOUT,
+            )
+        except Exception as e:
+            print(f"[WATCH] Error polling course {course_id}: {e}")
+            return None
+        if resp.status_code == 304:
+            return self._schedules.get(course_id)
+        if not resp.ok:
+            print(f"[WATCH] HTTP {resp.status_code} polling course {course_id}")
+            return None
+        try:
+            schedule = resp.json() or {}
+        except ValueError as e:
+            # A 200 HTML or maintenance page, common under enrollment load
+            print(f"[WATCH] Non-JSON response polling course {course_id}: {e}")
+            return None
+        if not isinstance(schedule, dict):
+            print(f"[WATCH] Unexpected schedule payload for course {course_id}")
+            return None
+        shifts = schedule.get("shifts") or []
+        with self._lock:
+            self._validators[course_id] = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+            self._schedules[course_id] = shifts
+        return shifts
+
+    def _fire(self, watched: WatchedShift, dry_run: bool) -> EnrollmentOutcome:
+        watched.attempts += 1
+        watched.last_probe = time.monotonic()
+        if dry_run:
+            print(f"[DRY-RUN] Would request {watched.label} -> {watched.url[:80]}...")
+            return EnrollmentOutcome.ENROLLED
+        return self.enroller.enroll_one(watched.url, watched.label)
+
+    def poll_once(self, dry_run: bool = False) -> list:
+        """Poll every watched course once and fire requests for freed seats.
+
+        Returns the keys that were enrolled in this round.
+        """
+        pending = self.pending()
+        course_ids = sorted({w.course_id for w in pending})
+        with ThreadPoolExecutor(max_workers=min(PARALLEL_ENROLL_WORKERS, max(1, len(course_ids)))) as pool:
+            schedules = dict(zip(course_ids, pool.map(self._fetch_schedule, course_ids)))
+
+        now = time.monotonic()
+        to_fire = []
+        for watched in pending:
+            shifts = schedules.get(watched.course_id) or []
+            shift = next((s for s in shifts if s.get("name") == watched.shift_name), None)
+            occupancy = shift_occupancy(shift) if shift else None
+            if occupancy is not None:
+                if occupancy != watched.occupancy:
+                    self.on_event(watched.key, f"{watched.label}: {occupancy[0]}/{occupancy[1]}", "DEBUG")
+                watched.occupancy = occupancy
+                if occupancy[0] < occupancy[1]:
+                    to_fire.append(watched)
+            elif now - watched.last_probe >= self.policy["blind_probe_seconds"]:
+                to_fire.append(watched)
+
+        if not to_fire:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.enroller.max_workers, len(to_fire))) as pool:
+            outcomes = list(pool.map(lambda w: self._fire(w, dry_run), to_fire))
+
+        enrolled = []
+        for watched, outcome in zip(to_fire, outcomes):
+            if is_success(outcome):
+                watched.outcome = outcome
+                enrolled.append(watched.key)
+                self.on_event(watched.key, f"Seat freed up, enrolled in {watched.label}", "SUCCESS")
+            elif outcome == EnrollmentOutcome.SESSION_EXPIRED:
+                self.stop_reason = "session expired"
+            else:
+                # Someone else took the seat first, keep watching
+                self.on_event(watched.key, f"{watched.label}: {outcome.value}, still watching", "WARNING")
+        return enrolled
+
+    def run(self, should_stop=None, dry_run: bool = False) -> list:
+        """Poll until every shift is enrolled, ``should_stop()`` is true or time runs out."""
+        deadline = time.monotonic() + self.policy["max_hours"] * 3600
+        enrolled = []
+        while self.pending() and not self.stop_reason:
+            if should_stop and should_stop():
+                self.stop_reason = "cancelled"
+                break
+            if time.monotonic() >= deadline:
+                self.stop_reason = "time limit reached"
+                break
+            enrolled.extend(self.poll_once(dry_run=dry_run))
+            # Sleep in short steps so cancellation is noticed quickly
+            wake = time.monotonic() + self.policy["poll_seconds"]
+            while time.monotonic() < wake and not (should_stop and should_stop()):
+                time.sleep(0.5)
+        return enrolled